@@ -17,83 +17,61 @@ Usage:
                    values and ranges (e.g. "1,2,4-6"). If omitted, a limited package table (as per -l)
                    will be displayed before prompting.
     
+    Reclaim mode:
+        ./list_installed_packages_descending_by_size.py -r [-l LIMIT] [-d ...]
+        - ranks the packages nothing depends on by the space `pacman -Rs`
+          would free (the package plus dependencies no longer needed);
+          indices given to -d then refer to this ranking.
+    
+    Selected packages are removed in a single `pacman -Rs` transaction.
+    Packages still needed by something outside the selection are skipped
+    and reported instead of making the whole transaction fail.
+    
 Requirements:
     - Python 3.x
     - Arch Linux with pacman available
+    - pacman_localdb.py (next to this script)
 """
 
 import subprocess
 import sys
-import re
 import argparse
 
-def parse_installed_size(size_str):
+from pacman_localdb import DepGraph, read_local_db
+
+def get_dependency_graph():
     """
-    Parse the 'Installed Size' string from pacman -Qi output.
-    
-    Parameters
-    ----------
-    size_str : str
-        A string containing a numeric value followed by a unit (e.g., '41.99 MiB', '256.00 KiB', '1024 B').
+    Build the dependency graph of all installed packages straight from
+    pacman's local database (/var/lib/pacman/local, via pacman_localdb.py).
     
     Returns
     -------
-    float
-        The size in bytes.
+    DepGraph
     """
-    parts = size_str.split()
-    if len(parts) < 2:
-        try:
-            return float(parts[0])
-        except:
-            return 0.0
-    number_str, unit = parts[0], parts[1]
     try:
-        size_value = float(number_str)
-    except ValueError:
-        size_value = 0.0
-    # Unit conversion to bytes
-    unit_multipliers = {
-        'B':   1,
-        'KiB': 1024,
-        'MiB': 1024**2,
-        'GiB': 1024**3
-    }
-    multiplier = unit_multipliers.get(unit, 1)
-    return size_value * multiplier
+        return DepGraph(read_local_db())
+    except OSError as e:
+        print("Error reading the pacman database:", e)
+        sys.exit(1)
 
-def get_installed_packages_info():
+def get_installed_packages_info(graph):
     """
-    Retrieve installed package information using pacman -Qi.
-    
     Returns
     -------
     list of tuples
         Each tuple is (package_name, size_in_bytes).
     """
-    try:
-        # Force pacman output to English by setting LC_ALL
-        pacman_output = subprocess.check_output(
-            ["env", "LC_ALL=C", "pacman", "-Qi"],
-            text=True
-        )
-    except subprocess.CalledProcessError as e:
-        print("Error calling pacman:", e)
-        sys.exit(1)
-    
-    # Split output into chunks (each chunk corresponds to one package)
-    package_chunks = pacman_output.strip().split("\n\n")
-    packages_info = []
-    for chunk in package_chunks:
-        # Extract package name and installed size using regex (case-insensitive)
-        name_match = re.search(r'^Name\s*:\s*(.*)$', chunk, re.MULTILINE | re.IGNORECASE)
-        size_match = re.search(r'^Installed Size\s*:\s*(.*)$', chunk, re.MULTILINE | re.IGNORECASE)
-        if name_match and size_match:
-            pkg_name = name_match.group(1).strip()
-            raw_size = size_match.group(1).strip()  # e.g., "41.99 MiB"
-            size_bytes = parse_installed_size(raw_size)
-            packages_info.append((pkg_name, size_bytes))
-    return packages_info
+    return [(pkg.name, pkg.size) for pkg in graph.packages.values()]
+
+def get_reclaimable_packages_info(graph):
+    """
+    Returns
+    -------
+    list of tuples
+        (package_name, bytes_freed_by_pacman_Rs) for every package nothing
+        else depends on, largest saving first.
+    """
+    return [(pkg.name, freed) for pkg, freed, _count in graph.reclaimable()]
 
 def parse_indices(indices_str):
     """
@@ -137,7 +115,7 @@ def parse_indices(indices_str):
                 continue
     return sorted(indices_set)
 
-def print_packages_table(packages, limit=None):
+def print_packages_table(packages, limit=None, size_header="Size (bytes)"):
     """
     Print a formatted table of packages.
     
@@ -148,19 +126,23 @@ def print_packages_table(packages, limit=None):
     limit : int or None
         If provided, only the top 'limit' packages are printed.
         If None, all packages are printed.
+    size_header : str
+        Title of the size column.
     """
-    print(f"{'Rank':>4} | {'Package':<40} | {'Size (bytes)':>15}")
+    print(f"{'Rank':>4} | {'Package':<40} | {size_header:>15}")
     print("-" * 65)
     display_list = packages if limit is None else packages[:limit]
     for i, (pkg_name, size_bytes) in enumerate(display_list, start=1):
         print(f"{i:4d} | {pkg_name:<40} | {int(size_bytes):>15d}")
 
-def delete_packages(packages, indices):
+def delete_packages(graph, packages, indices):
     """
     Delete the packages corresponding to the provided indices from the sorted package list.
     
     Parameters
     ----------
+    graph : DepGraph
+        Dependency graph used to plan the removal.
     packages : list of tuples
         Sorted package list (each tuple is (package_name, size_in_bytes)).
     indices : list of int
@@ -178,10 +160,21 @@ def delete_packages(packages, indices):
         print("No valid packages selected for deletion.")
         return
     
+    # Plan the whole selection at once, as pacman -Rs would
+    plan = graph.plan_removal(packages_to_delete)
+    for pkg, needed_by in plan.blocked.items():
+        print(f"Skipping {pkg}: required by {', '.join(needed_by)}")
+    if not plan.targets:
+        print("None of the selected packages can be removed.")
+        return
+    
     # Display the packages selected for deletion
     print("\nThe following packages will be removed:")
-    for pkg in packages_to_delete:
+    for pkg in plan.targets:
         print(f"  - {pkg}")
+    for pkg in plan.removes[len(plan.targets):]:
+        print(f"  - {pkg} (dependency no longer needed)")
+    print(f"Space freed: {plan.freed} bytes")
     
     # Confirmation prompt
     response = input("Are you sure you want to delete these packages? (y/n): ")
@@ -189,14 +182,12 @@ def delete_packages(packages, indices):
         print("Deletion cancelled.")
         return
     
-    # Proceed to remove each package using pacman
-    for pkg in packages_to_delete:
-        print(f"Removing package: {pkg}")
-        try:
-            # Using sudo to ensure proper permissions
-            subprocess.run(["sudo", "pacman", "-R", pkg], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to remove package {pkg}: {e}")
+    # Remove everything in one pacman transaction
+    try:
+        # Using sudo to ensure proper permissions
+        subprocess.run(["sudo", "pacman", "-Rs", *plan.targets], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to remove packages: {e}")
 
 def main():
     """
@@ -219,12 +210,22 @@ def main():
         "-d", "--delete", type=str, nargs='?', const='', default=None,
         help="Indices of packages to delete. Accepts comma/space-separated values and ranges (e.g. '1,2,4-6'). If omitted, a limited package table will be displayed before prompting."
     )
+    parser.add_argument(
+        "-r", "--reclaim", action="store_true",
+        help="Rank packages by the space removing them (with their orphaned dependencies) would free."
+    )
     
     args = parser.parse_args()
     
     # Retrieve and sort package information
-    packages_info = get_installed_packages_info()
-    packages_info.sort(key=lambda x: x[1], reverse=True)
+    graph = get_dependency_graph()
+    if args.reclaim:
+        packages_info = get_reclaimable_packages_info(graph)
+        size_header = "Frees (bytes)"
+    else:
+        packages_info = get_installed_packages_info(graph)
+        packages_info.sort(key=lambda x: x[1], reverse=True)
+        size_header = "Size (bytes)"
     
     if args.delete is not None:
         if args.delete.strip() == "":
@@ -232,13 +233,13 @@ def main():
             display_limit = args.limit
             print(f"Interactive delete mode. Here are the top {display_limit} packages:\n")
             displayed_packages = packages_info[:display_limit]
-            print_packages_table(displayed_packages)
+            print_packages_table(displayed_packages, size_header=size_header)
             indices_input = input("\nPlease enter package indices to delete (based on above list): ")
             indices = parse_indices(indices_input)
             if not indices:
                 print("No valid indices provided for deletion.")
                 sys.exit(1)
-            delete_packages(displayed_packages, indices)
+            delete_packages(graph, displayed_packages, indices)
         else:
             # Non-interactive delete mode: use the full package list.
             indices_input = args.delete
@@ -246,10 +247,10 @@ def main():
             if not indices:
                 print("No valid indices provided for deletion.")
                 sys.exit(1)
-            delete_packages(packages_info, indices)
+            delete_packages(graph, packages_info, indices)
     else:
         # Listing mode: Display only the top packages up to the provided limit.
-        print_packages_table(packages_info, limit=args.limit)
+        print_packages_table(packages_info, limit=args.limit, size_header=size_header)
 
 if __name__ == "__main__":
     main()
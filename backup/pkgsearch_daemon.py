@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+pkgsearch_daemon.py – Optional warm daemon for the package search scripts
+(find-py-pkg.py, python-search.py, pypi.py, npm-search-pkg.py,
+search-cargo-pkg.py, backup/yay_wrapper_popularity.py).
+
+Every one of those scripts pays the same start-up bill on each run:
+importing rich, rapidfuzz, requests and dateutil, then reloading name
+indexes and multi-MB JSON caches (the Top-PyPI dump, conda-forge names, the
+PyPI simple index). The daemon pays it once.
+
+How it works
+------------
+`pkgsearch_daemon.py start` launches a background process listening on a
+Unix socket (mode 0600, in $XDG_RUNTIME_DIR, else in a private 0700
+/tmp/pkgsearch-<uid> directory). The daemon imports each known
+script once, which pulls in the heavy libraries, and calls the script's
+loader functions listed in SCRIPTS, keeping their results in memory.
+A result older than WARM_TTL is refreshed by the next request for that
+script. An idle daemon downloads nothing.
+
+Each script starts with a tiny stub that calls `delegate(__file__)` before
+any heavy import. If the socket answers, the stub sends its argv, working
+directory and environment together with its stdin/stdout/stderr file
+descriptors (SCM_RIGHTS). The daemon forks; the child re-executes the
+script's module body (cheap now that every import is cached), substitutes
+the warm loader results, and runs main() directly on the caller's
+terminal. Interactive prompts, colours and the terminal width work as
+usual. Ctrl-C is forwarded to the child, and its exit status becomes the
+stub's.
+
+Without a daemon (or with PKGSEARCH_NO_DAEMON=1) the stub returns
+immediately and the script runs as before.
+
+Usage:
+  ./pkgsearch_daemon.py start [--idle SECONDS]   # background daemon
+  ./pkgsearch_daemon.py serve [--idle SECONDS]   # foreground (systemd --user)
+  ./pkgsearch_daemon.py status
+  ./pkgsearch_daemon.py stop
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+
+# Script basename -> zero-argument loaders whose results are kept warm.
+SCRIPTS = {
+    "find-py-pkg.py": ("fetch_pypi_index", "load_top_dump", "load_conda_names"),
+    "python-search.py": ("fetch_pypi_index", "load_top_dump", "load_conda_names"),
+    "pypi.py": ("fetch_pypi_index", "load_conda_names"),
+    "npm-search-pkg.py": (),
+    "search-cargo-pkg.py": (),
+    "yay_wrapper_popularity.py": (),
+}
+WARM_TTL = 15 * 60       # seconds a warm loader result is served
+POLL = 30.0              # accept() timeout: reap children, idle check
+NO_DAEMON_ENV = "PKGSEARCH_NO_DAEMON"
+
+
+def socket_path() -> str:
+    """
+    $PKGSEARCH_SOCKET, else $XDG_RUNTIME_DIR/pkgsearch.sock, else
+    /tmp/pkgsearch-<uid>/pkgsearch.sock (the daemon creates that directory
+    with mode 0700).
+    """
+    explicit = os.environ.get("PKGSEARCH_SOCKET")
+    if explicit:
+        return explicit
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "pkgsearch.sock")
+    return os.path.join(f"/tmp/pkgsearch-{os.getuid()}", "pkgsearch.sock")
+
+
+def _private_dir(path: str) -> bool:
+    """True if `path` is a real directory owned by us that nobody else can use."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid()
+            and not st.st_mode & 0o077)
+
+
+def _own_socket(path: str) -> bool:
+    """True if `path` is a socket owned by us (not a symlink or a squatter's)."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """uid of the process at the other end of a Unix socket, if the OS says."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid
+
+
+def _send(sock: socket.socket, msg: dict) -> None:
+    sock.sendall(json.dumps(msg).encode("utf-8") + b"\n")
+
+
+def _connect(timeout: float = 0.5) -> socket.socket | None:
+    """
+    Connect to our own daemon. The environment and the terminal are sent
+    over this socket, so anything listening there under another uid is
+    ignored.
+    """
+    path = socket_path()
+    if not _own_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        if _peer_uid(sock) not in (None, os.getuid()):
+            raise PermissionError(f"{path} is served by another user")
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+# ---------------------------------------------------------------------------#
+# Client side (stdlib only: this runs before the scripts' heavy imports)     #
+# ---------------------------------------------------------------------------#
+def delegate(script: str) -> None:
+    """
+    Run this invocation of `script` in the daemon and exit with its status.
+    Returns (so the script runs locally) when no daemon is reachable or the
+    daemon declines the request.
+    """
+    if os.environ.get(NO_DAEMON_ENV) or not hasattr(socket, "send_fds"):
+        return
+    sock = _connect()
+    if sock is None:
+        return
+    header = {
+        "script": os.path.abspath(script),
+        "argv": sys.argv[1:],
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+    }
+    try:
+        socket.send_fds(sock, [json.dumps(header).encode("utf-8") + b"\n"], [0, 1, 2])
+        reply = sock.makefile("rb")
+        first = json.loads(reply.readline() or b"{}")
+    except (OSError, ValueError):
+        sock.close()
+        return
+    pid = first.get("pid")
+    if not pid:
+        sock.close()
+        return
+
+    status = 1
+    while True:
+        try:
+            line = reply.readline()
+            status = int(json.loads(line).get("exit", 1)) if line else 1
+            break
+        except KeyboardInterrupt:
+            try:
+                os.kill(pid, signal.SIGINT)
+            except ProcessLookupError:
+                break
+        except (OSError, ValueError):
+            break
+    sock.close()
+    sys.exit(status)
+
+
+# ---------------------------------------------------------------------------#
+# Daemon side                                                                #
+# ---------------------------------------------------------------------------#
+class Daemon:
+    def __init__(self, path: str, idle: float = 0.0):
+        self.path = path
+        self.idle = idle
+        self.last_request = time.monotonic()
+        self.modules: dict[str, tuple[float, object]] = {}   # path -> (mtime, module)
+        self.warm: dict[tuple[str, str], tuple[float, object]] = {}
+        self.children: set[int] = set()
+        self.served = 0
+        self._loads = 0     # unique module names for the warm copies
+
+    # -- script modules and warm loaders ----------------------------------
+    def _exec_script(self, path: str, name: str):
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        # dataclasses (with string annotations) look the module up by name.
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(name, None)
+            raise
+        return module
+
+    def _module(self, path: str):
+        """The daemon's own copy of a script module, reloaded when edited."""
+        mtime = os.stat(path).st_mtime
+        hit = self.modules.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        script_dir = os.path.dirname(path)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        self._loads += 1
+        module = self._exec_script(path, f"_pkgsearch_warm_{self._loads}")
+        self.modules[path] = (mtime, module)
+        for key in [k for k in self.warm if k[0] == path]:
+            del self.warm[key]
+        return module
+
+    def warm_up(self, path: str, force: bool = False) -> None:
+        """Import a script and (re)run its stale warm loaders."""
+        try:
+            module = self._module(path)
+        except (Exception, SystemExit):   # e.g. a script exiting on a missing dependency
+            return
+        now = time.time()
+        for fn in SCRIPTS.get(os.path.basename(path), ()):
+            hit = self.warm.get((path, fn))
+            if hit is not None and now - hit[0] < WARM_TTL and not force:
+                continue
+            try:
+                self.warm[(path, fn)] = (now, getattr(module, fn)())
+            except Exception:
+                self.warm.pop((path, fn), None)
+
+    def warm_known(self) -> None:
+        """Re-warm every script seen so far (and the ones shipped next to us)."""
+        here = os.path.dirname(os.path.abspath(__file__))
+        paths = set(self.modules) | {
+            os.path.join(here, name) for name in SCRIPTS
+            if os.path.exists(os.path.join(here, name))
+        }
+        for path in sorted(paths):
+            self.warm_up(path)
+
+    # -- request handling ---------------------------------------------------
+    def _read_header(self, conn: socket.socket) -> tuple[dict, list[int]]:
+        data, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+        while data and not data.endswith(b"\n"):
+            more = conn.recv(65536)
+            if not more:
+                break
+            data += more
+        return json.loads(data or b"{}"), list(fds)
+
+    def _peer_ok(self, conn: socket.socket) -> bool:
+        return _peer_uid(conn) in (None, os.getuid())
+
+    def handle(self, conn: socket.socket) -> bool:
+        """Serve one connection. Returns False when asked to stop."""
+        fds: list[int] = []
+        try:
+            if not self._peer_ok(conn):
+                return True
+            header, fds = self._read_header(conn)
+            op = header.get("op")
+            if op == "stop":
+                _send(conn, {"ok": True})
+                return False
+            if op == "status":
+                _send(conn, {"pid": os.getpid(), "served": self.served,
+                             "scripts": sorted(self.modules),
+                             "warm": sorted(f"{os.path.basename(p)}:{fn}" for p, fn in self.warm)})
+                return True
+            path = header.get("script", "")
+            if os.path.basename(path) not in SCRIPTS or len(fds) != 3 or not os.path.isfile(path):
+                _send(conn, {"error": "not served"})
+                return True
+            self.warm_up(path)
+            pid = os.fork()
+            if pid == 0:
+                self._run_child(conn, header, fds)   # never returns
+            self.children.add(pid)
+            self.served += 1
+            _send(conn, {"pid": pid})
+            return True
+        except (OSError, ValueError):
+            return True
+        finally:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            self.last_request = time.monotonic()
+
+    def _run_child(self, conn: socket.socket, header: dict, fds: list[int]) -> None:
+        code = 1
+        try:
+            for target, fd in zip((0, 1, 2), fds):
+                os.dup2(fd, target)
+            sys.stdin = sys.__stdin__ = open(0, "r", closefd=False)
+            sys.stdout = sys.__stdout__ = open(1, "w", buffering=1, closefd=False)
+            sys.stderr = sys.__stderr__ = open(2, "w", buffering=1, closefd=False)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            for sig in (signal.SIGTERM, signal.SIGHUP, signal.SIGPIPE):
+                signal.signal(sig, signal.SIG_DFL)
+            os.environ.clear()
+            os.environ.update(header.get("env") or {})
+            os.chdir(header.get("cwd") or "/")
+
+            path = header["script"]
+            sys.argv = [path, *header.get("argv", [])]
+            module = self._exec_script(path, "__pkgsearch_main__")
+            now = time.time()
+            for fn in SCRIPTS.get(os.path.basename(path), ()):
+                hit = self.warm.get((path, fn))
+                if hit is not None and now - hit[0] < WARM_TTL:
+                    setattr(module, fn, _served(getattr(module, fn), hit[1]))
+            module.main()
+            code = 0
+        except SystemExit as ex:
+            code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+            if ex.code is not None and not isinstance(ex.code, int):
+                print(ex.code, file=sys.stderr)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                _send(conn, {"exit": code})
+            except Exception:
+                pass
+            os._exit(code)
+
+    # -- main loop ------------------------------------------------------------
+    def reap(self) -> None:
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+
+    def _prepare_path(self) -> None:
+        """Create the private fallback directory and clear our own stale socket."""
+        parent = os.path.dirname(self.path)
+        if parent.startswith("/tmp/pkgsearch-"):
+            try:
+                os.mkdir(parent, 0o700)
+            except FileExistsError:
+                pass
+            if not _private_dir(parent):
+                raise SystemExit(f"{parent} is not a private directory owned by you; "
+                                 f"remove it or set XDG_RUNTIME_DIR / PKGSEARCH_SOCKET")
+        if os.path.lexists(self.path):
+            if not _own_socket(self.path):
+                raise SystemExit(f"{self.path} exists and is not your socket; not replacing it")
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def serve(self) -> None:
+        self._prepare_path()
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            srv.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        srv.listen(16)
+        srv.settimeout(POLL)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
+        try:
+            self.warm_known()
+            while True:
+                self.reap()
+                try:
+                    conn, _ = srv.accept()
+                except socket.timeout:
+                    if self.idle and not self.children and \
+                            time.monotonic() - self.last_request > self.idle:
+                        break
+                    continue
+                conn.settimeout(5.0)
+                if not self.handle(conn):
+                    break
+        finally:
+            srv.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def _served(fn, value):
+    """Return the warm value for a plain call; anything else goes to fn."""
+    def wrapper(*args, **kwargs):
+        if not any(args) and not any(kwargs.values()):
+            return value
+        return fn(*args, **kwargs)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _daemonize() -> None:
+    if os.fork():
+        os._exit(0)
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    os.chdir("/")
+
+
+def _request(op: str) -> dict | None:
+    sock = _connect()
+    if sock is None:
+        return None
+    try:
+        _send(sock, {"op": op})
+        line = sock.makefile("rb").readline()
+        return json.loads(line) if line else {}
+    finally:
+        sock.close()
+
+
+def main() -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description="Warm daemon for the package search scripts.")
+    ap.add_argument("command", choices=("start", "serve", "stop", "status"))
+    ap.add_argument("--idle", type=float, default=0.0, metavar="SECONDS",
+                    help="exit after this long without requests (0 = never)")
+    args = ap.parse_args()
+
+    if args.command in ("stop", "status"):
+        reply = _request(args.command)
+        if reply is None:
+            print(f"not running ({socket_path()})")
+            sys.exit(1)
+        if args.command == "status":
+            print(f"pid {reply.get('pid')} on {socket_path()}, {reply.get('served', 0)} runs served")
+            for item in reply.get("warm", []):
+                print(f"  warm  {item}")
+        else:
+            print("stopped")
+        return
+
+    if _request("status") is not None:
+        print(f"already running ({socket_path()})")
+        sys.exit(1)
+    if args.command == "start":
+        print(f"starting on {socket_path()}")
+        sys.stdout.flush()
+        _daemonize()
+    Daemon(socket_path(), idle=args.idle).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,15 @@ Requirements:
     - requests (install via pip if necessary: pip install requests)
 """
 
+# Hand the run to a warm pkgsearch_daemon.py if one is listening (no-op otherwise).
+if __name__ == "__main__":
+    try:
+        from pkgsearch_daemon import delegate
+    except ImportError:
+        pass
+    else:
+        delegate(__file__)
+
 import requests  # For making HTTP requests to the AUR RPC API
 import json      # For parsing JSON responses
 
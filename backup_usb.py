@@ -3,17 +3,39 @@
 backup_usb.py
 
 A script to archive and compress all contents of a given directory
-(e.g. USB partition mount point) into a .tar.gz or .zip file, showing
-an ETA progress bar using Rich, and saving the archive to
-/home/heini/Documents.
+(e.g. USB partition mount point) into a tar archive (gzip, zstd, xz or
+uncompressed) or a .zip file, showing a byte-accurate ETA progress bar
+using Rich, and saving the archive to /home/heini/Documents.
+
+Compression backends are picked per codec, preferring multi-threaded ones:
+    tar.zst  python-zstandard (threaded) or the `zstd -T` binary
+    tar.gz   `pigz` when installed, otherwise Python's gzip module
+    tar.xz   the `xz -T` binary when installed, otherwise Python's lzma
+    tar      no compression (also selected with --store)
+
+Incremental mode (--incremental) keeps a chain index next to the archives
+(<name>.chain.json) plus one manifest per run recording (relpath, size,
+mtime, hash) for every file. Later runs only pack new or changed files;
+files whose content hash is already stored somewhere in the chain (moved,
+copied or merely touched) are referenced instead of packed again, as long
+as they are at least --dedup-min-size bytes. --restore rebuilds the tree
+of any run in the chain.
 
 Usage:
     python3 backup_usb.py /path/to/usb --format tar.gz
-    python3 backup_usb.py /path/to/usb --format zip
+    python3 backup_usb.py /path/to/usb --format tar.zst --incremental
+    python3 backup_usb.py --restore ~/Documents/usb.chain.json --restore-to /tmp/usb
+    python3 backup_usb.py /path/to/usb --format tar.zst --level 9 --threads 8
+    python3 backup_usb.py /path/to/usb --format zip --store
 
 Arguments:
     source_dir   Path to the directory you want to back up.
-    --format     Compression format: 'tar.gz' or 'zip'.
+    --format     Archive format: 'tar.gz', 'tar.zst', 'tar.xz', 'tar' or 'zip'.
+    --level      (optional) Compression level; defaults depend on the codec.
+    --threads    (optional) Compressor threads. Defaults to all CPUs.
+    --store      (optional) Do not compress (for already-compressed media).
+    --incremental (optional) Only pack files changed since the previous run.
+    --restore    (optional) Chain index to restore from (with --restore-to, --at).
     --output-dir (optional) Where to store the archive. Defaults to /home/heini/Documents.
 
 Example:
@@ -23,10 +45,61 @@ Example:
 import os
 import sys
 import argparse
+import gzip
+import hashlib
+import json
+import lzma
+import shutil
+import stat
+import subprocess
 import tarfile
 import zipfile
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from rich.progress import Progress
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+
+# Read/write chunk size used when copying file data into the archive.
+COPY_BUFSIZE = 1024 * 1024
+
+# Default compression level per codec.
+DEFAULT_LEVELS = {"gz": 6, "zst": 3, "xz": 6}
+
+# Valid --level range per compressed format.
+LEVEL_RANGES = {"tar.gz": (0, 9), "tar.zst": (1, 22), "tar.xz": (0, 9), "zip": (0, 9)}
+
+# Content hash used by incremental manifests, and the on-disk format version.
+HASH_NAME = "blake2b"
+MANIFEST_VERSION = 1
+
+
+class ProgressReader:
+    """
+    Wrap a binary file object so every read() advances a Rich task by the
+    number of bytes returned.
+    """
+
+    def __init__(self, fh, progress, task_id, digest=None):
+        self._fh = fh
+        self._progress = progress
+        self._task_id = task_id
+        self._digest = digest
+
+    def read(self, size=-1):
+        chunk = self._fh.read(size)
+        if chunk:
+            self._progress.update(self._task_id, advance=len(chunk))
+            if self._digest is not None:
+                self._digest.update(chunk)
+        return chunk
+
 
 def gather_files(source_dir):
     """
@@ -39,43 +112,527 @@ def gather_files(source_dir):
             file_list.append(os.path.join(root, name))
     return file_list
 
-def compress_to_tar_gz(files, source_dir, output_path, progress, task_id):
+
+def total_bytes(files, follow_symlinks=False):
     """
-    Create a .tar.gz archive at output_path, adding each file one by one,
-    and advancing the Rich progress bar per file.
+    Sum the sizes of the regular files in `files`. Symlinks count as 0
+    unless follow_symlinks is set (zip stores the link target's data).
     """
-    with tarfile.open(output_path, mode="w:gz") as tar:
-        for fpath in files:
-            # store paths relative to the source_dir so the archive has a clean tree
-            arcname = os.path.relpath(fpath, start=source_dir)
-            tar.add(fpath, arcname=arcname)
-            progress.update(task_id, advance=1)
+    total = 0
+    for fpath in files:
+        try:
+            st = os.stat(fpath, follow_symlinks=follow_symlinks)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            total += st.st_size
+    return total
+
+
+@contextmanager
+def _pipe_sink(cmd, output_path):
+    """
+    Yield the stdin of an external compressor whose stdout is output_path.
+    A compressor that dies early shows up as a RuntimeError with its exit
+    status rather than a BrokenPipeError.
+    """
+    with open(output_path, "wb") as out:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=out)
+        broken = False
+        try:
+            yield proc.stdin
+        except BrokenPipeError:
+            broken = True
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                broken = True
+            rc = proc.wait()
+        if rc != 0 or broken:
+            raise RuntimeError(f"{cmd[0]} exited with status {rc}")
+
+
+@contextmanager
+def open_compressed_sink(codec, output_path, level, threads):
+    """
+    Open output_path for writing through the fastest available backend for
+    `codec` ('gz', 'zst', 'xz' or 'store') and yield a (stream, backend)
+    tuple, where backend is a short human-readable description.
+    """
+    if codec == "store":
+        with open(output_path, "wb") as out:
+            yield out, "none"
+        return
+
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+
+    if codec == "zst":
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        if zstandard is not None:
+            cctx = zstandard.ZstdCompressor(level=level, threads=threads)
+            with open(output_path, "wb") as out, cctx.stream_writer(out) as writer:
+                yield writer, f"python-zstandard ({threads} threads)"
+            return
+        if shutil.which("zstd"):
+            cmd = ["zstd", "-q", "-c", f"-{level}", f"-T{threads}"]
+            if level > 19:
+                cmd.insert(1, "--ultra")
+            with _pipe_sink(cmd, output_path) as sink:
+                yield sink, f"zstd ({threads} threads)"
+            return
+        raise RuntimeError("tar.zst needs the 'zstandard' module or the 'zstd' binary.")
+
+    if codec == "gz":
+        if shutil.which("pigz"):
+            with _pipe_sink(["pigz", "-c", f"-{level}", "-p", str(threads)], output_path) as sink:
+                yield sink, f"pigz ({threads} threads)"
+            return
+        with open(output_path, "wb") as out, gzip.GzipFile(
+            fileobj=out, mode="wb", compresslevel=level
+        ) as writer:
+            yield writer, "gzip (single thread)"
+        return
+
+    if codec == "xz":
+        if shutil.which("xz"):
+            with _pipe_sink(["xz", "-c", f"-{level}", f"-T{threads}"], output_path) as sink:
+                yield sink, f"xz ({threads} threads)"
+            return
+        with lzma.open(output_path, "wb", preset=level) as writer:
+            yield writer, "lzma (single thread)"
+        return
+
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def compress_to_tar(files, source_dir, output_path, progress, task_id,
+                    codec="gz", level=None, threads=1, digests=None):
+    """
+    Stream a tar archive through the chosen codec into output_path,
+    advancing the Rich progress bar by the bytes read from each file.
+    If `digests` is a dict, the content hash of every regular file is
+    stored in it (keyed by path) as a side effect of reading it.
+    Returns the name of the compression backend that was used.
+    """
+    with open_compressed_sink(codec, output_path, level, threads) as (sink, backend):
+        progress.update(task_id, description=f"[green]Archiving ({backend})...")
+        with tarfile.open(fileobj=sink, mode="w|", copybufsize=COPY_BUFSIZE) as tar:
+            for fpath in files:
+                # store paths relative to the source_dir so the archive has a clean tree
+                arcname = os.path.relpath(fpath, start=source_dir)
+                tarinfo = tar.gettarinfo(fpath, arcname=arcname)
+                if tarinfo.isreg():
+                    digest = hashlib.new(HASH_NAME) if digests is not None else None
+                    with open(fpath, "rb") as fh:
+                        tar.addfile(tarinfo, ProgressReader(fh, progress, task_id, digest))
+                    if digest is not None:
+                        digests[fpath] = digest.hexdigest()
+                else:
+                    tar.addfile(tarinfo)
+    return backend
+
 
-def compress_to_zip(files, source_dir, output_path, progress, task_id):
+def compress_to_zip(files, source_dir, output_path, progress, task_id,
+                    store=False, level=None):
     """
     Create a .zip archive at output_path, adding each file one by one,
-    and advancing the Rich progress bar per file.
+    and advancing the Rich progress bar by the bytes written.
     """
-    with zipfile.ZipFile(output_path, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+    compression = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(
+        output_path, mode="w", compression=compression, compresslevel=level
+    ) as zf:
         for fpath in files:
             arcname = os.path.relpath(fpath, start=source_dir)
-            zf.write(fpath, arcname=arcname)
-            progress.update(task_id, advance=1)
+            zinfo = zipfile.ZipInfo.from_file(fpath, arcname=arcname)
+            zinfo.compress_type = compression
+            if level is not None:
+                # same attribute ZipFile.write() fills in from compresslevel
+                zinfo._compresslevel = level
+            with open(fpath, "rb") as src, zf.open(zinfo, "w") as dst:
+                shutil.copyfileobj(ProgressReader(src, progress, task_id), dst, COPY_BUFSIZE)
+
+
+def write_json_atomic(path, data):
+    """
+    Write `data` as JSON to path via a temporary file and rename, so an
+    interrupted run never leaves a truncated manifest or chain index.
+    """
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_chain(chain_path):
+    """
+    Load a chain index, or return an empty one if it does not exist yet.
+    """
+    if not chain_path.exists():
+        return {"version": MANIFEST_VERSION, "archives": []}
+    chain = json.loads(chain_path.read_text(encoding="utf-8"))
+    if chain.get("version") != MANIFEST_VERSION:
+        raise RuntimeError(f"Unsupported chain index version in {chain_path}")
+    return chain
+
+
+def load_manifest(manifest_path):
+    """
+    Load one run's manifest: {relpath: [size, mtime_ns, hash, archive, member]}.
+    """
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("hash") != HASH_NAME:
+        raise RuntimeError(f"Unsupported manifest format in {manifest_path}")
+    return manifest["files"]
+
+
+def file_digest(fpath, progress, task_id):
+    """
+    Hash a file's content in COPY_BUFSIZE chunks, advancing the progress bar.
+    """
+    digest = hashlib.new(HASH_NAME)
+    with open(fpath, "rb") as fh:
+        reader = ProgressReader(fh, progress, task_id, digest)
+        while reader.read(COPY_BUFSIZE):
+            pass
+    return digest.hexdigest()
+
+
+def plan_incremental(files, source_dir, previous, archive_name, dedup_min_size,
+                     progress, task_id):
+    """
+    Compare the current tree against the previous manifest.
+
+    Unchanged files (same size and mtime) keep their previous entry without
+    being read. Changed files of at least dedup_min_size bytes are hashed
+    first and, if that content already lives somewhere in the chain (or
+    earlier in this run), are recorded as a reference instead of packed.
+
+    Returns (entries, to_pack): the new manifest entries, with hashes of
+    small packed files left as None, and the list of paths to archive.
+    """
+    known = {}
+    for size, _, digest, archive, member in previous.values():
+        if digest and size >= dedup_min_size:
+            known.setdefault(digest, (archive, member))
+
+    entries = {}
+    to_pack = []
+    for fpath in files:
+        relpath = os.path.relpath(fpath, start=source_dir)
+        st = os.lstat(fpath)
+        old = previous.get(relpath)
+        if old is not None and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            entries[relpath] = old
+            continue
+
+        digest = None
+        if stat.S_ISREG(st.st_mode) and st.st_size >= dedup_min_size:
+            digest = file_digest(fpath, progress, task_id)
+            if digest in known:
+                archive, member = known[digest]
+                entries[relpath] = [st.st_size, st.st_mtime_ns, digest, archive, member]
+                continue
+            known[digest] = (archive_name, relpath)
+        entries[relpath] = [st.st_size, st.st_mtime_ns, digest, archive_name, relpath]
+        to_pack.append(fpath)
+    return entries, to_pack
+
+
+def run_incremental(args, src, files, progress_columns):
+    """
+    Pack only new/changed files into a timestamped archive, then record the
+    run's manifest and append it to the chain index.
+    """
+    base_name = args.source_dir.name
+    chain_path = args.output_dir / f"{base_name}.chain.json"
+    chain = load_chain(chain_path)
+    previous = {}
+    if chain["archives"]:
+        previous = load_manifest(args.output_dir / chain["archives"][-1]["manifest"])
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    archive_name = f"{base_name}.{stamp}.{args.format}"
+    outfile = args.output_dir / archive_name
+    codec = "store" if args.format == "tar" else args.format.split(".", 1)[-1]
+
+    with Progress(*progress_columns) as progress:
+        scan_id = progress.add_task("[cyan]Hashing changed files...", total=None)
+        entries, to_pack = plan_incremental(
+            files, src, previous, archive_name, args.dedup_min_size, progress, scan_id
+        )
+        progress.update(scan_id, visible=False)
+
+        digests = {}
+        pack_id = progress.add_task("[green]Compressing...", total=total_bytes(to_pack))
+        compress_to_tar(to_pack, src, str(outfile), progress, pack_id,
+                        codec=codec, level=args.level, threads=args.threads,
+                        digests=digests)
+
+    for fpath, digest in digests.items():
+        entry = entries[os.path.relpath(fpath, start=src)]
+        if entry[2] is None:
+            entry[2] = digest
+
+    manifest_name = f"{archive_name}.manifest.json"
+    write_json_atomic(args.output_dir / manifest_name, {
+        "version": MANIFEST_VERSION,
+        "hash": HASH_NAME,
+        "archive": archive_name,
+        "files": entries,
+    })
+    chain["source"] = src
+    chain["archives"].append({
+        "archive": archive_name,
+        "manifest": manifest_name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "total_files": len(entries),
+        "packed_files": len(to_pack),
+        "packed_bytes": total_bytes(to_pack),
+    })
+    write_json_atomic(chain_path, chain)
+
+    print(f"Packed {len(to_pack)} of {len(entries)} files "
+          f"({len(entries) - len(to_pack)} unchanged or deduplicated).")
+    return outfile
+
+
+@contextmanager
+def open_archive_source(archive_path):
+    """
+    Open a (possibly compressed) tar archive for sequential reading.
+    zstd needs python-zstandard or the `zstd` binary; the rest is handled
+    by tarfile's own transparent decompression.
+    """
+    if not str(archive_path).endswith(".zst"):
+        with tarfile.open(archive_path, mode="r|*", copybufsize=COPY_BUFSIZE) as tar:
+            yield tar
+        return
+
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+    if zstandard is not None:
+        with open(archive_path, "rb") as fh, \
+                zstandard.ZstdDecompressor().stream_reader(fh) as reader, \
+                tarfile.open(fileobj=reader, mode="r|", copybufsize=COPY_BUFSIZE) as tar:
+            yield tar
+        return
+    if not shutil.which("zstd"):
+        raise RuntimeError("Reading .zst archives needs the 'zstandard' module or 'zstd'.")
+    proc = subprocess.Popen(["zstd", "-q", "-dc", str(archive_path)], stdout=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|", copybufsize=COPY_BUFSIZE) as tar:
+            yield tar
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def _restore_target(dest, relpath):
+    """
+    Resolve relpath under dest, refusing anything that escapes it.
+    """
+    target = (dest / relpath).resolve()
+    if target != dest and dest not in target.parents:
+        raise RuntimeError(f"Refusing to restore outside {dest}: {relpath}")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+def _link_or_copy(source, target):
+    """
+    Recreate a tar hard link: link target to the already-restored source,
+    or copy it where the destination filesystem has no hard links.
+    """
+    if target.is_symlink() or target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target, follow_symlinks=False)
+
+
+def _extract_member_data(archive_path, member, target):
+    """
+    Write the data of one regular member to target by reading the archive
+    again. Used for hard links whose data member was not restored itself.
+    """
+    with open_archive_source(archive_path) as tar:
+        for tarinfo in tar:
+            if tarinfo.name == member and tarinfo.isreg():
+                with tar.extractfile(tarinfo) as src, open(target, "wb") as out:
+                    shutil.copyfileobj(src, out, COPY_BUFSIZE)
+                os.chmod(target, tarinfo.mode & 0o7777)
+                return
+    raise RuntimeError(f"{archive_path.name}: hard link target {member} not found")
+
+
+def restore_chain(chain_path, dest, at=None):
+    """
+    Rebuild the tree recorded by one run of the chain (default: the latest)
+    into dest, reading each referenced archive once, in chain order.
+
+    Hard-link members (tarfile stores every further link to an inode as a
+    data-less LNKTYPE entry) are linked to the restored copy of the member
+    they name; if that member was not needed for this run, its data is
+    read in a second pass over the archive. Member types that cannot be
+    restored (devices, FIFOs, ...) are reported.
+    """
+    chain = load_chain(chain_path)
+    runs = chain["archives"]
+    if not runs:
+        raise RuntimeError(f"{chain_path} does not list any archives.")
+    if at is None:
+        run = runs[-1]
+    else:
+        matches = [r for r in runs if at in (r["archive"], r["manifest"])]
+        if not matches:
+            raise RuntimeError(f"No run named {at} in {chain_path}.")
+        run = matches[0]
+
+    archive_dir = chain_path.parent
+    entries = load_manifest(archive_dir / run["manifest"])
+
+    # archive -> member -> [(relpath, mtime_ns), ...]
+    wanted = {}
+    for relpath, (_, mtime_ns, _, archive, member) in entries.items():
+        wanted.setdefault(archive, {}).setdefault(member, []).append((relpath, mtime_ns))
+
+    dest = dest.resolve()
+    dest.mkdir(parents=True, exist_ok=True)
+
+    def place(first, targets):
+        """Copy first to the other paths sharing its content; set mtimes."""
+        for relpath, mtime_ns in targets:
+            target = first
+            if relpath != targets[0][0]:
+                target = _restore_target(dest, relpath)
+                shutil.copy2(first, target, follow_symlinks=False)
+            os.utime(target, ns=(mtime_ns, mtime_ns), follow_symlinks=False)
+        return len(targets)
+
+    restored = 0
+    placed = {}     # (archive, member) -> restored path, for hard links
+    skipped = []
+    for archive in (r["archive"] for r in runs):
+        members = wanted.pop(archive, None)
+        if not members:
+            continue
+        unresolved = []     # (link target member, first path, targets)
+        with open_archive_source(archive_dir / archive) as tar:
+            for tarinfo in tar:
+                targets = members.pop(tarinfo.name, None)
+                if targets is None:
+                    continue
+                first = _restore_target(dest, targets[0][0])
+                if tarinfo.issym():
+                    if first.is_symlink() or first.exists():
+                        first.unlink()
+                    os.symlink(tarinfo.linkname, first)
+                elif tarinfo.isreg():
+                    with tar.extractfile(tarinfo) as src, open(first, "wb") as out:
+                        shutil.copyfileobj(src, out, COPY_BUFSIZE)
+                    os.chmod(first, tarinfo.mode & 0o7777)
+                elif tarinfo.islnk():
+                    source = placed.get((archive, tarinfo.linkname))
+                    if source is None:
+                        unresolved.append((tarinfo.linkname, first, targets))
+                        continue
+                    _link_or_copy(source, first)
+                else:
+                    skipped.append(tarinfo.name)
+                    continue
+                placed[(archive, tarinfo.name)] = first
+                restored += place(first, targets)
+                if not members:
+                    break
+        if members:
+            missing = ", ".join(sorted(members)[:5])
+            raise RuntimeError(f"{archive} is missing members: {missing}")
+
+        for linkname, first, targets in unresolved:
+            source = placed.get((archive, linkname))
+            if source is not None:
+                _link_or_copy(source, first)
+            else:
+                _extract_member_data(archive_dir / archive, linkname, first)
+            placed[(archive, linkname)] = first
+            restored += place(first, targets)
+    if wanted:
+        raise RuntimeError(f"Archives not listed in the chain: {', '.join(sorted(wanted))}")
+    if skipped:
+        shown = ", ".join(sorted(skipped)[:5])
+        more = f" and {len(skipped) - 5} more" if len(skipped) > 5 else ""
+        print(f"Warning: skipped {len(skipped)} special files (not regular files, "
+              f"symlinks or hard links): {shown}{more}", file=sys.stderr)
+    return restored
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
-        description="Archive and compress a directory to .tar.gz or .zip with progress."
+        description="Archive and compress a directory to a tar or .zip archive with progress."
     )
     parser.add_argument(
         "source_dir",
         type=Path,
+        nargs="?",
         help="Path to the directory (e.g. USB mount point) to back up."
     )
     parser.add_argument(
         "--format",
-        choices=["tar.gz", "zip"],
-        required=True,
-        help="Compression format to use."
+        choices=["tar.gz", "tar.zst", "tar.xz", "tar", "zip"],
+        help="Archive format to use (required unless --restore)."
+    )
+    parser.add_argument(
+        "--level",
+        type=int,
+        default=None,
+        help="Compression level: zst 1-22, others 0-9 (default: gz 6, zst 3, xz 6, zip 6)."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Compressor threads for zstd/pigz/xz (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="Do not compress; useful for already-compressed media (tar or stored zip)."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only pack files that changed since the previous run (tar formats only)."
+    )
+    parser.add_argument(
+        "--dedup-min-size",
+        type=int,
+        default=1024 * 1024,
+        help="Changed files at least this many bytes are hashed and deduplicated "
+             "against the chain (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--restore",
+        type=Path,
+        metavar="CHAIN",
+        help="Restore from an incremental chain index (<name>.chain.json)."
+    )
+    parser.add_argument(
+        "--restore-to",
+        type=Path,
+        help="Directory to restore into (required with --restore)."
+    )
+    parser.add_argument(
+        "--at",
+        metavar="ARCHIVE",
+        help="Restore the state recorded by this archive (default: latest run)."
     )
     parser.add_argument(
         "--output-dir",
@@ -86,18 +643,59 @@ def parse_args():
 
     args = parser.parse_args()
 
+    if args.restore is not None:
+        if args.restore_to is None:
+            parser.error("--restore needs --restore-to")
+        if not args.restore.is_file():
+            print(f"Error: {args.restore!s} is not a chain index.", file=sys.stderr)
+            sys.exit(1)
+        return args
+
+    if args.source_dir is None or args.format is None:
+        parser.error("source_dir and --format are required unless --restore is given")
+
+    if args.incremental and args.format == "zip":
+        parser.error("--incremental needs a tar format")
+
     # Validate source_dir
     if not args.source_dir.is_dir():
         print(f"Error: {args.source_dir!s} is not a valid directory.", file=sys.stderr)
         sys.exit(1)
 
+    if args.threads < 1:
+        print("Error: --threads must be at least 1.", file=sys.stderr)
+        sys.exit(1)
+
+    # --store turns every tar format into a plain tar
+    if args.store and args.format.startswith("tar"):
+        args.format = "tar"
+
     # Ensure output directory exists
     args.output_dir.mkdir(parents=True, exist_ok=True)
 
     return args
 
+
 def main():
     args = parse_args()
+
+    if args.restore is not None:
+        try:
+            count = restore_chain(args.restore, args.restore_to, args.at)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Restored {count} files into: {args.restore_to!s}")
+        return
+
+    level_range = LEVEL_RANGES.get(args.format)
+    if args.level is not None and level_range is not None and not args.store:
+        low, high = level_range
+        if not low <= args.level <= high:
+            print(f"Error: --level for {args.format} must be between {low} and {high}.",
+                  file=sys.stderr)
+            sys.exit(1)
+
     src = str(args.source_dir.resolve())
     files = gather_files(src)
     total = len(files)
@@ -106,24 +704,45 @@ def main():
         print(f"No files found in {src!s}. Nothing to archive.")
         sys.exit(0)
 
-    # Build an output filename with timestamp
-    timestamp = Path().stat().st_mtime  # just to illustrate; replace with datetime if desired
+    progress_columns = (
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+    )
+
+    if args.incremental:
+        try:
+            outfile = run_incremental(args, src, files, progress_columns)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Archive created at: {outfile!s}")
+        return
+
     base_name = args.source_dir.name
-    if args.format == "tar.gz":
-        outfile = args.output_dir / f"{base_name}.tar.gz"
-    else:
-        outfile = args.output_dir / f"{base_name}.zip"
+    outfile = args.output_dir / f"{base_name}.{args.format}"
+    codec = "store" if args.format == "tar" else args.format.split(".", 1)[-1]
 
     # Run the chosen compression inside a Rich progress context
-    with Progress() as progress:
-        task_id = progress.add_task("[green]Compressing...", total=total)
-        if args.format == "tar.gz":
-            compress_to_tar_gz(files, src, str(outfile), progress, task_id)
-        else:
-            compress_to_zip(files, src, str(outfile), progress, task_id)
+    with Progress(*progress_columns) as progress:
+        task_id = progress.add_task(
+            "[green]Compressing...", total=total_bytes(files, follow_symlinks=args.format == "zip")
+        )
+        try:
+            if args.format == "zip":
+                compress_to_zip(files, src, str(outfile), progress, task_id,
+                                store=args.store, level=args.level)
+            else:
+                compress_to_tar(files, src, str(outfile), progress, task_id,
+                                codec=codec, level=args.level, threads=args.threads)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
 
     print(f"✅ Archive created at: {outfile!s}")
 
+
 if __name__ == "__main__":
     main()
-
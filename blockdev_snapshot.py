@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+blockdev_snapshot.py – Cached block-device snapshot shared by the storage
+scripts (lsblk_textual_inspector.py, rich-lsblk.py, device-mapper.py,
+lvm-check-space.py).
+
+Keep it next to the scripts; Python puts a script's own directory on
+sys.path, so `from blockdev_snapshot import snapshot` just works.
+
+Sources
+-------
+The device tree is read straight from the kernel and udev instead of
+spawning lsblk / blkid:
+
+  /sys/block, /sys/class/block   devices, partitions, holders (dm, md),
+                                 size, ro, removable, rotational, model
+  /run/udev/data/b<maj>:<min>    filesystem type/version/label/UUID,
+                                 PARTUUID, PARTLABEL, serial, LVM names
+  /proc/self/mountinfo, /proc/swaps
+                                 mountpoints (by device number, or by
+                                 source path for btrfs subvolumes)
+
+Nodes come out as lsblk-JSON-shaped dicts (`lsblk -J -b` column names:
+name, kname, pkname, path, size, type, fstype, ..., mountpoints,
+mountpoint, children), so callers that used to parse lsblk keep working.
+LVM nodes also carry vg_name / lv_name. Like lsblk without -a, empty
+devices and RAM disks are left out.
+
+When /sys/block is not available (non-Linux), or the udev database is
+missing or empty (containers, chroots, mdev systems), a single `lsblk -J -b`
+call with all columns is used instead: without udev data, sysfs alone
+cannot name filesystems, and lsblk probes them through libblkid. Only if
+lsblk cannot run either does the sysfs tree come back without
+filesystem fields.
+
+Caching
+-------
+`snapshot()` returns the cached tree until something changes. Changes are
+detected without polling the devices: mountinfo signals POLLPRI on every
+mount or unmount, and a NETLINK_KOBJECT_UEVENT socket (kernel and udev
+groups) reports block uevents. When neither watcher can be set up, the
+cache expires after FALLBACK_TTL seconds instead. A snapshot is also
+rebuilt after MAX_AGE seconds, because filesystem usage changes without
+any event.
+
+`DeviceSnapshot.usage(mountpoint)` is statvfs() with a short per-mount
+cache, so redrawing a usage table does not re-stat every mountpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import select
+import socket
+import subprocess
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+SYS_BLOCK = "/sys/block"
+SYS_CLASS_BLOCK = "/sys/class/block"
+UDEV_DATA = "/run/udev/data"
+MOUNTINFO = "/proc/self/mountinfo"
+SWAPS = "/proc/swaps"
+
+LSBLK_COLUMNS = (
+    "NAME,KNAME,PKNAME,PATH,SIZE,TYPE,FSTYPE,FSVER,LABEL,PARTLABEL,UUID,"
+    "PARTUUID,MOUNTPOINTS,FSAVAIL,FSUSE%,MODEL,SERIAL,TRAN,ROTA,RM,RO,"
+    "HOTPLUG"
+)
+
+FALLBACK_TTL = 2.0     # seconds, when no change watcher is available
+MAX_AGE = 30.0         # seconds, upper bound for any snapshot
+USAGE_TTL = 2.0        # seconds, per-mountpoint statvfs cache
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_GROUPS = (3, 1)  # kernel|udev, then kernel only
+
+RAM_MAJOR = 1
+
+
+class MountUsage(NamedTuple):
+    total: int
+    used: int
+    free: int
+
+    @property
+    def used_pct(self) -> float:
+        return 100.0 * self.used / self.total if self.total else 0.0
+
+
+# ---------------------------------------------------------------------------#
+# Small readers                                                              #
+# ---------------------------------------------------------------------------#
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _unescape_mount(field: str) -> str:
+    """mountinfo escapes space, tab, newline and backslash as \\ooo."""
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _unescape_udev(value: str) -> str:
+    """udev *_ENC values escape bytes as \\xNN."""
+    if "\\x" not in value:
+        return value
+    raw = re.sub(rb"\\x([0-9a-fA-F]{2})",
+                 lambda m: bytes([int(m.group(1), 16)]),
+                 value.encode("utf-8", "surrogateescape"))
+    return raw.decode("utf-8", "replace")
+
+
+def _udev_props(devnum: str) -> Dict[str, str]:
+    props: Dict[str, str] = {}
+    try:
+        with open(f"{UDEV_DATA}/b{devnum}", "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("E:"):
+                    key, _, value = line[2:].rstrip("\n").partition("=")
+                    props[key] = value
+    except OSError:
+        pass
+    return props
+
+
+def _devnum_of(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_rdev == 0:
+        return None
+    return f"{os.major(st.st_rdev)}:{os.minor(st.st_rdev)}"
+
+
+def read_mounts() -> Dict[str, List[str]]:
+    """Device number "maj:min" → mountpoints, in mount order ([SWAP] last)."""
+    mounts: Dict[str, List[str]] = {}
+
+    def add(devnum: Optional[str], target: str) -> None:
+        if devnum:
+            targets = mounts.setdefault(devnum, [])
+            if target not in targets:
+                targets.append(target)
+
+    try:
+        with open(MOUNTINFO, "r", encoding="utf-8", errors="surrogateescape") as f:
+            lines = f.readlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        fields = line.split()
+        try:
+            sep = fields.index("-")
+        except ValueError:
+            continue
+        if len(fields) < sep + 3:
+            continue
+        devnum, target = fields[2], _unescape_mount(fields[4])
+        source = _unescape_mount(fields[sep + 2])
+        if devnum.startswith("0:") and source.startswith("/dev/"):
+            # btrfs and friends report an anonymous device number.
+            devnum = _devnum_of(source) or devnum
+        add(devnum, target)
+
+    for line in _read(SWAPS).splitlines()[1:]:
+        name = line.split()[0] if line.split() else ""
+        if name.startswith("/dev/"):
+            add(_devnum_of(_unescape_mount(name)), "[SWAP]")
+    return mounts
+
+
+def statvfs_usage(mountpoint: str) -> Optional[MountUsage]:
+    """Usage as df / shutil.disk_usage report it; None if unavailable."""
+    try:
+        st = os.statvfs(mountpoint)
+    except OSError:
+        return None
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    return MountUsage(total, used, free)
+
+
+def human_size(nbytes: Optional[int]) -> str:
+    """Size the way lsblk prints it without -b: 512M, 931.5G, 0B."""
+    if nbytes is None:
+        return ""
+    value = float(nbytes)
+    for unit in "BKMGTPE":
+        if value < 1024.0 or unit == "E":
+            text = f"{value:.1f}"
+            if unit == "B" or text.endswith(".0"):
+                text = text[:-2] if "." in text else text
+            return f"{text}{unit}"
+        value /= 1024.0
+    return f"{nbytes}B"
+
+
+# ---------------------------------------------------------------------------#
+# sysfs tree                                                                 #
+# ---------------------------------------------------------------------------#
+def _natural(name: str) -> list:
+    return [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", name)]
+
+
+def _dm_type(sysdir: str) -> str:
+    prefix = _read(f"{sysdir}/dm/uuid").split("-", 1)[0].upper()
+    return {
+        "CRYPT": "crypt",
+        "LVM": "lvm",
+        "MPATH": "mpath",
+        "PART": "part",
+    }.get(prefix, "dm")
+
+
+def _split_lvm_name(dm_name: str) -> Tuple[str, str]:
+    """vg-lv (with '-' doubled inside names) → (vg, lv)."""
+    parts = re.split(r"(?<!-)-(?!-)", dm_name, maxsplit=1)
+    if len(parts) != 2:
+        return "", dm_name.replace("--", "-")
+    return parts[0].replace("--", "-"), parts[1].replace("--", "-")
+
+
+def _transport(kname: str, disk_real: str, props: Dict[str, str]) -> str:
+    if kname.startswith("nvme"):
+        return "nvme"
+    if "/usb" in disk_real:
+        return "usb"
+    if kname.startswith("mmcblk"):
+        return "mmc"
+    bus = props.get("ID_BUS", "")
+    if bus == "ata" or "/ata" in disk_real:
+        return "sata"
+    if bus == "scsi":
+        return "sas" if "/sas" in disk_real else ""
+    return ""
+
+
+class _SysfsReader:
+    def __init__(self) -> None:
+        self.mounts = read_mounts()
+        self.usage_cache: Dict[str, Optional[MountUsage]] = {}
+
+    def _usage(self, mountpoint: str) -> Optional[MountUsage]:
+        if mountpoint not in self.usage_cache:
+            self.usage_cache[mountpoint] = statvfs_usage(mountpoint)
+        return self.usage_cache[mountpoint]
+
+    def node(self, kname: str, parent: Optional[Dict[str, Any]],
+             seen: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+        sysdir = f"{SYS_CLASS_BLOCK}/{kname}"
+        devnum = _read(f"{sysdir}/dev")
+        if not devnum or kname in seen:
+            return None
+        size = int(_read(f"{sysdir}/size") or 0) * 512
+        if size == 0 or devnum.split(":")[0] == str(RAM_MAJOR):
+            return None
+
+        real = os.path.realpath(sysdir)
+        is_part = os.path.exists(f"{sysdir}/partition")
+        disk_dir = os.path.dirname(real) if is_part else real
+        props = _udev_props(devnum)
+
+        name, path = kname, f"/dev/{kname}"
+        extra: Dict[str, Any] = {}
+        if is_part:
+            devtype = "part"
+        elif kname.startswith("dm-"):
+            devtype = _dm_type(sysdir)
+            name = _read(f"{sysdir}/dm/name") or kname
+            path = f"/dev/mapper/{name}"
+            if devtype == "lvm":
+                vg, lv = _split_lvm_name(name)
+                extra["vg_name"] = props.get("DM_VG_NAME", vg)
+                extra["lv_name"] = props.get("DM_LV_NAME", lv)
+        elif kname.startswith("md"):
+            devtype = _read(f"{sysdir}/md/level") or "md"
+        elif kname.startswith("loop"):
+            devtype = "loop"
+        elif kname.startswith("sr") or _read(f"{sysdir}/device/type") == "5":
+            devtype = "rom"
+        else:
+            devtype = "disk"
+
+        mountpoints = list(self.mounts.get(devnum, []))
+        fsavail = fsuse = None
+        real_mounts = [m for m in mountpoints if m.startswith("/")]
+        if real_mounts:
+            usage = self._usage(real_mounts[0])
+            if usage is not None:
+                fsavail = usage.free
+                fsuse = f"{round(usage.used_pct)}%"
+
+        removable = _read(f"{disk_dir}/removable") == "1"
+        tran = "" if is_part or devtype != "disk" else _transport(kname, disk_dir, props)
+        model = _read(f"{disk_dir}/device/model") or _unescape_udev(
+            props.get("ID_MODEL_ENC", "")).strip() or None
+
+        dev: Dict[str, Any] = {
+            "name": name,
+            "kname": kname,
+            "pkname": parent["kname"] if parent else None,
+            "path": path,
+            "size": size,
+            "type": devtype,
+            "fstype": props.get("ID_FS_TYPE") or None,
+            "fsver": props.get("ID_FS_VERSION") or None,
+            "label": _unescape_udev(props.get("ID_FS_LABEL_ENC", "")) or props.get("ID_FS_LABEL") or None,
+            "partlabel": _unescape_udev(props.get("ID_PART_ENTRY_NAME", "")) or None,
+            "uuid": props.get("ID_FS_UUID") or None,
+            "partuuid": props.get("ID_PART_ENTRY_UUID") or None,
+            "mountpoints": mountpoints or [None],
+            "mountpoint": mountpoints[0] if mountpoints else None,
+            "fsavail": fsavail,
+            "fsuse%": fsuse,
+            "model": model if not is_part else None,
+            "serial": (props.get("ID_SERIAL_SHORT") or _read(f"{disk_dir}/device/serial") or None)
+                      if not is_part else None,
+            "tran": tran or None,
+            "rota": _read(f"{disk_dir}/queue/rotational") == "1",
+            "rm": removable,
+            "ro": _read(f"{sysdir}/ro") == "1",
+            "hotplug": removable or tran == "usb",
+        }
+        dev.update(extra)
+
+        children: List[Dict[str, Any]] = []
+        if not is_part:
+            parts = [p for p in os.listdir(real)
+                     if p.startswith(kname) and os.path.exists(f"{real}/{p}/partition")] \
+                if os.path.isdir(real) else []
+            for part in sorted(parts, key=_natural):
+                child = self.node(part, dev, seen + (kname,))
+                if child is not None:
+                    children.append(child)
+        try:
+            holders = sorted(os.listdir(f"{sysdir}/holders"), key=_natural)
+        except OSError:
+            holders = []
+        for holder in holders:
+            child = self.node(holder, dev, seen + (kname,))
+            if child is not None:
+                children.append(child)
+        if children:
+            dev["children"] = children
+        return dev
+
+    def tree(self) -> List[Dict[str, Any]]:
+        tops = []
+        for kname in os.listdir(SYS_BLOCK):
+            try:
+                slaves = os.listdir(f"{SYS_BLOCK}/{kname}/slaves")
+            except OSError:
+                slaves = []
+            if slaves:
+                continue  # shown under the devices it is built on
+            devnum = _read(f"{SYS_BLOCK}/{kname}/dev")
+            if not devnum:
+                continue
+            major, _, minor = devnum.partition(":")
+            tops.append((int(major), int(minor or 0), kname))
+        devices = []
+        for _, _, kname in sorted(tops):
+            dev = self.node(kname, None)
+            if dev is not None:
+                devices.append(dev)
+        return devices
+
+
+def _lsblk_tree() -> List[Dict[str, Any]]:
+    columns = LSBLK_COLUMNS
+    for attempt in range(2):
+        result = subprocess.run(
+            ["lsblk", "--json", "--bytes", "--output", columns],
+            capture_output=True, text=True, check=False,
+        )
+        if result.returncode == 0:
+            break
+        # util-linux < 2.37 has no MOUNTPOINTS column
+        columns = columns.replace("MOUNTPOINTS", "MOUNTPOINT")
+    else:
+        raise RuntimeError(result.stderr.strip() or "lsblk failed")
+    try:
+        payload = json.loads(result.stdout)
+    except json.JSONDecodeError as exc:
+        raise RuntimeError(f"Failed to parse lsblk JSON: {exc}") from exc
+
+    def fix(nodes: List[Dict[str, Any]]) -> None:
+        for node in nodes:
+            mounts = node.get("mountpoints")
+            if mounts is None:
+                mounts = node["mountpoints"] = [node.get("mountpoint")]
+            node["mountpoint"] = next((m for m in mounts if m), None)
+            fix(node.get("children") or [])
+
+    devices = payload.get("blockdevices", [])
+    fix(devices)
+    return devices
+
+
+# ---------------------------------------------------------------------------#
+# Snapshot + invalidation                                                    #
+# ---------------------------------------------------------------------------#
+class DeviceSnapshot:
+    """One consistent view of the block devices."""
+
+    def __init__(self, devices: List[Dict[str, Any]], source: str):
+        self.devices = devices
+        self.source = source
+        self.created = time.monotonic()
+        self._usage: Dict[str, Tuple[float, Optional[MountUsage]]] = {}
+
+    def walk(self) -> Iterator[Dict[str, Any]]:
+        """Every node, depth first (holders built on several devices repeat)."""
+        stack = list(reversed(self.devices))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.get("children") or []))
+
+    def as_lsblk_json(self) -> Dict[str, Any]:
+        return {"blockdevices": self.devices}
+
+    def usage(self, mountpoint: str) -> Optional[MountUsage]:
+        """statvfs() of a mountpoint, reused for USAGE_TTL seconds."""
+        now = time.monotonic()
+        hit = self._usage.get(mountpoint)
+        if hit is not None and now - hit[0] < USAGE_TTL:
+            return hit[1]
+        usage = statvfs_usage(mountpoint)
+        self._usage[mountpoint] = (now, usage)
+        return usage
+
+
+class _ChangeWatcher:
+    """Mount-table and block-uevent change detection without blocking."""
+
+    def __init__(self) -> None:
+        self.reliable = True
+        self._mountinfo = None
+        self._poll = None
+        self._sock = None
+        try:
+            self._mountinfo = open(MOUNTINFO, "rb")
+            self._mountinfo.read()
+            self._poll = select.poll()
+            self._poll.register(self._mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self._mountinfo = self._poll = None
+            self.reliable = False
+        for groups in UEVENT_GROUPS:
+            try:
+                sock = socket.socket(socket.AF_NETLINK,
+                                     socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                                     NETLINK_KOBJECT_UEVENT)
+                sock.bind((0, groups))
+            except (OSError, AttributeError):
+                continue
+            self._sock = sock
+            break
+        else:
+            self.reliable = False
+
+    def changed(self) -> bool:
+        """True if mounts or block devices changed since the last call."""
+        changed = False
+        if self._poll is not None and self._poll.poll(0):
+            # Re-reading the file acknowledges the event.
+            self._mountinfo.seek(0)
+            self._mountinfo.read()
+            changed = True
+        if self._sock is not None:
+            while True:
+                try:
+                    msg = self._sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    # ENOBUFS: events were dropped, so assume a change.
+                    changed = True
+                    break
+                if b"SUBSYSTEM=block" in msg:
+                    changed = True
+        return changed
+
+
+_cached: Optional[DeviceSnapshot] = None
+_watcher: Optional[_ChangeWatcher] = None
+
+
+def _has_entries(path: str) -> bool:
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
+
+
+def build_snapshot(source: str = "auto") -> DeviceSnapshot:
+    """Read the devices now. source: "auto", "sysfs" or "lsblk"."""
+    have_sysfs = _has_entries(SYS_BLOCK)
+    if source == "sysfs" or (source == "auto" and have_sysfs and _has_entries(UDEV_DATA)):
+        if not have_sysfs:
+            raise RuntimeError(f"{SYS_BLOCK} is not available")
+        return DeviceSnapshot(_SysfsReader().tree(), "sysfs")
+    try:
+        return DeviceSnapshot(_lsblk_tree(), "lsblk")
+    except (OSError, RuntimeError):
+        if source == "lsblk" or not have_sysfs:
+            raise
+    # No udev database and no working lsblk: sysfs without filesystem fields
+    return DeviceSnapshot(_SysfsReader().tree(), "sysfs")
+
+
+def snapshot(force: bool = False, source: str = "auto") -> DeviceSnapshot:
+    """
+    The current device snapshot, rebuilt only when a mount or block uevent
+    was seen since the last call (or it is older than MAX_AGE, or
+    FALLBACK_TTL when no watcher could be set up).
+    """
+    global _cached, _watcher
+    if _watcher is None:
+        _watcher = _ChangeWatcher()
+    changed = _watcher.changed()
+    if _cached is not None and not force and not changed and _cached.source == (
+            "lsblk" if source == "lsblk" else _cached.source):
+        age = time.monotonic() - _cached.created
+        if age < (MAX_AGE if _watcher.reliable else FALLBACK_TTL):
+            return _cached
+    _cached = build_snapshot(source)
+    return _cached
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Print the block-device snapshot as lsblk-style JSON.")
+    ap.add_argument("--source", choices=["auto", "sysfs", "lsblk"], default="auto")
+    args = ap.parse_args()
+    print(json.dumps(build_snapshot(args.source).as_lsblk_json(), indent=2))
@@ -2,9 +2,11 @@
 """
 device_report.py - Display detailed block device information with syntax highlighting.
 
-This script gathers information from lsblk and blkid, computes usage
-via Python's shutil.disk_usage, and presents a colored table using the
-Rich library. It now safely skips pseudo-mountpoints like "[SWAP]".
+This script reads the device tree from blockdev_snapshot.py (sysfs, the
+udev database and mountinfo, with a single lsblk call as fallback),
+computes usage via Python's shutil.disk_usage, and presents a colored
+table using the Rich library. It safely skips pseudo-mountpoints like
+"[SWAP]".
 
 Usage:
   device_report.py [--json]
@@ -16,48 +18,41 @@ Options:
 Dependencies:
   - Python 3.6+
   - rich (install via `pip install rich`)
-  - lsblk, blkid (standard on most Linux distributions)
+  - blockdev_snapshot.py (next to this script)
 """
 
 import argparse
-import subprocess
 import json
 import shutil
 import os                                    # ← New: for ismount()
 from rich.table import Table
 from rich.console import Console
 
+from blockdev_snapshot import snapshot
 
-def get_lsblk_data():
+JSON_FIELDS = ("name", "fstype", "uuid", "size", "mountpoint")
+
+
+def get_device_data():
     """
-    Invoke lsblk to get block device details in JSON format.
-    Returns a list of block devices with selected fields.
+    Read the block devices from the shared snapshot.
+    Returns the lsblk-style device tree (sizes in bytes).
     """
-    output = subprocess.check_output([
-        "lsblk",
-        "-J",            # JSON output
-        "-b",            # sizes in bytes
-        "-o", "NAME,FSTYPE,UUID,SIZE,MOUNTPOINT"
-    ], text=True)
-    data = json.loads(output)
-    return data.get("blockdevices", [])
+    return snapshot().devices
 
 
-def get_uuid(device_name):
+def project(devices):
     """
-    Retrieve the UUID of a given device via blkid.
-    Returns an empty string on failure.
+    Reduce each device to the fields this report has always printed
+    with --json, keeping the children nesting.
     """
-    try:
-        uuid = subprocess.check_output([
-            "blkid",
-            "-s", "UUID",
-            "-o", "value",
-            f"/dev/{device_name}"
-        ], text=True).strip()
-        return uuid
-    except subprocess.CalledProcessError:
-        return ""
+    out = []
+    for d in devices:
+        item = {key: d.get(key) for key in JSON_FIELDS}
+        if d.get("children"):
+            item["children"] = project(d["children"])
+        out.append(item)
+    return out
 
 
 def format_size(num_bytes):
@@ -90,7 +85,8 @@ def build_table(devices, console):
         for d in dev_list:
             name     = d.get("name", "")
             fstype   = d.get("fstype") or ""
-            uuid     = d.get("uuid") or get_uuid(name)
+            path     = d.get("path") or f"/dev/{name}"
+            uuid     = d.get("uuid") or ""
             size     = format_size(int(d.get("size", 0)))
             mount    = d.get("mountpoint") or ""
 
@@ -110,7 +106,7 @@ def build_table(devices, console):
             # ----------------------------------------------------------------------------
 
             table.add_row(
-                f"/dev/{name}",
+                path,
                 fstype,
                 uuid,
                 size,
@@ -137,10 +133,10 @@ def main():
     )
     args = parser.parse_args()
 
-    devices = get_lsblk_data()
+    devices = get_device_data()
     if args.json:
         # Pretty-print JSON and exit
-        print(json.dumps(devices, indent=2))
+        print(json.dumps(project(devices), indent=2))
         return
 
     console = Console()
@@ -6,25 +6,31 @@ Fetch the top-N most-downloaded Python packages (past month) from the
 “A monthly dump of the 15 000 most-downloaded packages” JSON maintained at
 https://hugovk.github.io/top-pypi-packages/top-pypi-packages-30-days.min.json
 then:
-  1. Determine which packages are available on conda-forge via `micromamba search`.
+  1. Determine which packages are available on conda-forge, using the cached
+     conda-forge name set shared with the search scripts (pkgsearch_cache.py,
+     refreshed daily from current_repodata.json) — one set lookup per package,
+     with PEP 503 name normalisation and known pip→conda renames
+     (e.g. torch → pytorch).
   2. Print two install commands:
      * `micromamba install -c conda-forge <conda_pkg1> <conda_pkg2> …`
      * `pip install <pip_pkgA> <pip_pkgB> …`
 
 Usage:
-    ./get_top_python_packages.py [--number N]
+    ./get_top_python_packages.py [--number N] [--refresh-conda]
 
 Options:
-    -n, --number N   Number of top packages to fetch (default: 80).
+    -n, --number N    Number of top packages to fetch (default: 80).
+    --refresh-conda   Re-download the conda-forge name set now.
 """
 
 import argparse
-import subprocess
 import sys
 from typing import List
 
 import requests
 
+from pkgsearch_cache import conda_lookup, load_conda_forge_names, pip_to_conda
+
 # URL of the monthly minified JSON (last ~30 days)
 TOP_PYPI_URL = (
     "https://hugovk.github.io/top-pypi-packages/"
@@ -43,6 +49,11 @@ def parse_args() -> argparse.Namespace:
         default=80,
         help="How many of the top packages to process (default: 80).",
     )
+    parser.add_argument(
+        "--refresh-conda",
+        action="store_true",
+        help="Re-download the conda-forge name set instead of using the daily cache.",
+    )
     return parser.parse_args()
 
 
@@ -75,21 +86,15 @@ def fetch_top_packages(n: int) -> List[str]:
     return pkgs
 
 
-def is_on_conda(pkg: str) -> bool:
+def conda_forge_lookup(refresh: bool = False) -> dict:
     """
-    Return True if `micromamba search <pkg> -c conda-forge` returns any hits.
+    Canonical name -> conda-forge name for every conda-forge package.
     """
+    table = load_conda_forge_names(force=refresh)
     try:
-        proc = subprocess.run(
-            ["micromamba", "search", pkg, "-c", "conda-forge"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            check=True,
-            text=True,
-        )
-        return pkg.lower() in proc.stdout.lower()
-    except subprocess.CalledProcessError:
-        return False
+        return conda_lookup(table)
+    finally:
+        table.close()
 
 
 def main():
@@ -97,12 +102,19 @@ def main():
     print(f"🔍 Fetching top {args.number} PyPI packages (past ~30 days)…")
     packages = fetch_top_packages(args.number)
 
-    conda_pkgs, pip_pkgs = [], []
     print("🔄 Checking availability on conda-forge…")
+    lookup = conda_forge_lookup(args.refresh_conda)
+    if not lookup:
+        print("  ⚠ conda-forge name set unavailable; everything goes to pip.")
+
+    conda_pkgs, pip_pkgs = [], []
     for pkg in packages:
-        if is_on_conda(pkg):
-            conda_pkgs.append(pkg)
-            print(f"  ✔ {pkg}")
+        conda_name = pip_to_conda(pkg, lookup)
+        if conda_name:
+            if conda_name not in conda_pkgs:
+                conda_pkgs.append(conda_name)
+            shown = pkg if conda_name == pkg else f"{pkg} → {conda_name}"
+            print(f"  ✔ {shown}")
         else:
             pip_pkgs.append(pkg)
             print(f"  ✘ {pkg} (will use pip)")
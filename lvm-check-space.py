@@ -4,9 +4,10 @@ lvm_check_space — LVM logical volume usage in a Rich-styled table.
 
 What it does
   • Reads LV metadata via `lvs --reportformat json` (no sudo needed on many hosts).
-  • Resolves mount points via `lsblk -J` (robust to schema quirks).
+  • Resolves mount points from the shared blockdev_snapshot.py device tree
+    (sysfs + udev + mountinfo; one `lsblk -J` call only where /sys is missing).
   • Computes USED/FREE/%USED with shutil.disk_usage for mounted LVs.
-  • Falls back to lsblk-only discovery if `lvs` is unavailable or restricted.
+  • Falls back to snapshot-only discovery if `lvs` is unavailable or restricted.
   • Matches the visual style of your device-mapper table (bold cyan header, heavy box).
 
 Usage
@@ -20,7 +21,7 @@ Examples
 
 Dependencies
   • lvm2 (for `lvs`) — optional but preferred
-  • util-linux (for `lsblk`)
+  • blockdev_snapshot.py next to this script (util-linux `lsblk` only without /sys)
   • Python package: rich  (Arch: pacman -S python-rich  |  pip: pip install rich)
 """
 
@@ -35,6 +36,8 @@ from rich.console import Console
 from rich.table import Table
 from rich import box
 
+from blockdev_snapshot import snapshot
+
 # ───────────────────────────────────────────
 # Helpers (robust JSON, traversal, parsing)
 # ───────────────────────────────────────────
@@ -119,25 +122,23 @@ def _aliases_for_dev(path: str):
             paths.add(f"/dev/mapper/{vg}-{lv}")
     return paths
 
-def _mount_map() -> Dict[str, str]:
-    """PATH → MOUNTPOINT (only real mounts). Robust to lsblk JSON quirks."""
-    lsblk = _run_json(["lsblk", "-J", "-o", "NAME,PATH,MOUNTPOINT,CHILDREN"])
-    m: Dict[str, str] = {}
+def _device_nodes() -> List[dict]:
+    """Every node of the block-device snapshot; empty if it cannot be read."""
+    try:
+        return list(snapshot().walk())
+    except (OSError, RuntimeError):
+        return []
 
-    def walk(nodes):
-        for n in _iter_nodes(nodes):
-            path = n.get("path") or n.get("name")
-            mp = (n.get("mountpoint") or "").strip()
-            if path and mp and os.path.ismount(mp):
-                # Record all aliases so later lookups succeed regardless of form.
-                for alias in _aliases_for_dev(path):
-                    m[alias] = mp
-            ch = n.get("children")
-            if ch:
-                walk(ch)
-
-    if lsblk:
-        walk(lsblk.get("blockdevices"))
+def _mount_map(nodes: List[dict]) -> Dict[str, str]:
+    """PATH → MOUNTPOINT (only real mounts)."""
+    m: Dict[str, str] = {}
+    for n in _iter_nodes(nodes):
+        path = n.get("path") or n.get("name")
+        mp = (n.get("mountpoint") or "").strip()
+        if path and mp and os.path.ismount(mp):
+            # Record all aliases so later lookups succeed regardless of form.
+            for alias in _aliases_for_dev(path):
+                m[alias] = mp
     return m
 
 def _disk_usage_safe(mount: str):
@@ -165,53 +166,50 @@ def _read_lvs() -> Optional[List[dict]]:
     except Exception:
         return None
 
-def _fallback_lvs_from_lsblk() -> List[dict]:
+def _fallback_lvs_from_snapshot(nodes: List[dict]) -> List[dict]:
     """
-    Approximate LVs from lsblk when lvs is unavailable/restricted.
+    Approximate LVs from the device snapshot when lvs is unavailable/restricted.
     Identify LVs via type='lvm'/'dm', mapper paths, or udev /dev/<vg>/<lv> forms.
     """
-    j = _run_json(["lsblk", "-J", "-b", "-o", "NAME,TYPE,PATH,SIZE,CHILDREN"])
     rows: List[dict] = []
+    seen = set()
+
+    for n in _iter_nodes(nodes):
+        typ  = (n.get("type") or "").lower()
+        path = n.get("path") or n.get("name") or ""
+        size_raw = n.get("size")
+        try:
+            size_b = int(size_raw) if size_raw not in (None, "") else 0
+        except (TypeError, ValueError):
+            size_b = 0
+
+        is_lv = (
+            typ in ("lvm", "dm") or
+            path.startswith("/dev/mapper/") or
+            (path.startswith("/dev/") and "-" in os.path.basename(os.path.realpath(path)))
+        )
 
-    def walk(nodes):
-        for n in _iter_nodes(nodes):
-            typ  = (n.get("type") or "").lower()
-            path = n.get("path") or n.get("name") or ""
-            size_raw = n.get("size")
-            try:
-                size_b = int(size_raw) if size_raw not in (None, "") else 0
-            except (TypeError, ValueError):
-                size_b = 0
-
-            is_lv = (
-                typ in ("lvm", "dm") or
-                path.startswith("/dev/mapper/") or
-                (path.startswith("/dev/") and "-" in os.path.basename(os.path.realpath(path)))
-            )
-
-            if is_lv:
-                # Derive best-effort VG/LV from name when possible
+        # An LV spanning several PVs appears under each of them.
+        if is_lv and path not in seen:
+            seen.add(path)
+            # Prefer the names udev recorded; else derive them from the path
+            vg_name, lv_name = n.get("vg_name") or "", n.get("lv_name") or ""
+            if not lv_name:
                 base = os.path.basename(os.path.realpath(path))
                 if "-" in base:
                     vg_name, lv_name = base.split("-", 1)
                 else:
                     vg_name, lv_name = "", base
 
-                rows.append({
-                    "lv_name": lv_name,
-                    "vg_name": vg_name,
-                    "lv_path": path,
-                    "lv_size": str(size_b),
-                    "lv_attr": "",
-                    "data_percent": ""
-                })
-
-            ch = n.get("children")
-            if ch:
-                walk(ch)
-
-    if j:
-        walk(j.get("blockdevices"))
+            rows.append({
+                "lv_name": lv_name,
+                "vg_name": vg_name,
+                "lv_path": path,
+                "lv_size": str(size_b),
+                "lv_attr": "",
+                "data_percent": ""
+            })
+
     return rows
 
 # ───────────────────────────────────────────
@@ -219,11 +217,12 @@ def _fallback_lvs_from_lsblk() -> List[dict]:
 # ───────────────────────────────────────────
 
 def gather(args) -> List[dict]:
+    nodes = _device_nodes()
     lvs = _read_lvs()
     if lvs is None:
-        lvs = _fallback_lvs_from_lsblk()
+        lvs = _fallback_lvs_from_snapshot(nodes)
 
-    mounts = _mount_map()
+    mounts = _mount_map(nodes)
     out = []
     for row in lvs:
         lv = {
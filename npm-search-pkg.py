@@ -23,9 +23,31 @@ Usage examples
 
 # JSON dump of the search result rows
 ./search-npm-enumerated-install.py astro --json out.json
+
+# Ignore cached rows and refetch everything
+./search-npm-enumerated-install.py react --refresh
+
+Caching
+-------
+~/.cache/npm_rank/cache.json keeps, each with its own TTL:
+- enriched result rows per (query, size) → a repeated search costs nothing;
+- packument summaries (version, release date, description) per package,
+  instead of the multi-MB packuments themselves;
+- last-month download counts, fetched with the bulk downloads endpoint in
+  chunks of up to 128 unscoped names (scoped names are looked up one by one,
+  since the bulk endpoint does not accept them).
 """
 from __future__ import annotations
 
+# Hand the run to a warm pkgsearch_daemon.py if one is listening (no-op otherwise).
+if __name__ == "__main__":
+    try:
+        from pkgsearch_daemon import delegate
+    except ImportError:
+        pass
+    else:
+        delegate(__file__)
+
 import argparse
 import csv
 import html
@@ -38,7 +60,6 @@ import sys
 import shlex
 import time
 from collections import namedtuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Iterable, List, Optional
@@ -57,20 +78,29 @@ except ModuleNotFoundError:
 
 try:
     from rich.console import Console
+    from rich.live import Live
     from rich.table import Table
     RICH_OK = True
 except ModuleNotFoundError:
     RICH_OK = False
 
+from pkgsearch_fetch import run_streaming
+
 # ---------------------------------------------------------------------
 # Endpoints & constants
 # ---------------------------------------------------------------------
 SEARCH_URL = "https://registry.npmjs.org/-/v1/search"
 PKG_META_URL = "https://registry.npmjs.org/{name}"
 DOWNLOADS_URL = "https://api.npmjs.org/downloads/point/last-month/{name}"
+BULK_CHUNK = 128  # max names per bulk downloads query
 
 CACHE_DIR = pathlib.Path.home() / ".cache" / "npm_rank"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_FILE = CACHE_DIR / "cache.json"
+CACHE_VERSION = 1
+ROWS_TTL = 3600              # enriched rows per (query, size)
+META_TTL = 24 * 3600         # packument summaries
+DOWNLOADS_TTL = 12 * 3600    # last-month counts
 HEADERS = {"Accept": "application/json", "User-Agent": "npm-enum/1.0"}
 
 console = Console() if RICH_OK else None
@@ -121,6 +151,68 @@ def _safe_get(url: str, timeout: int = 20) -> Optional[requests.Response]:
     except Exception:
         return None
 
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+class NpmCache:
+    """
+    TTL cache in ~/.cache/npm_rank/cache.json. Every entry is
+    [fetched_at, *payload]:
+      rows       "query|size" -> [t, [row, ...]]                  (ROWS_TTL)
+      meta       name         -> [t, version, released, description] (META_TTL)
+      downloads  name         -> [t, count]                       (DOWNLOADS_TTL)
+    """
+    TTLS = {"rows": ROWS_TTL, "meta": META_TTL, "downloads": DOWNLOADS_TTL}
+
+    def __init__(self, path: pathlib.Path = CACHE_FILE, refresh: bool = False):
+        self.path = path
+        self.refresh = refresh  # write-only: fetch everything, still store it
+        self.dirty = False
+        self.data: dict = {k: {} for k in self.TTLS}
+        try:
+            loaded = json.loads(path.read_text(encoding="utf-8"))
+            if loaded.get("version") == CACHE_VERSION:
+                for k in self.TTLS:
+                    self.data[k] = loaded.get(k) or {}
+        except (OSError, ValueError):
+            pass
+
+    def get(self, section: str, key: str) -> Optional[list]:
+        """Payload of a fresh entry, or None."""
+        if self.refresh:
+            return None
+        hit = self.data[section].get(key)
+        if hit is not None and time.time() - hit[0] < self.TTLS[section]:
+            return hit[1:]
+        return None
+
+    def put(self, section: str, key: str, *payload) -> None:
+        self.data[section][key] = [time.time(), *payload]
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        now = time.time()
+        for section, ttl in self.TTLS.items():
+            self.data[section] = {k: v for k, v in self.data[section].items()
+                                  if now - v[0] < ttl}
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": CACHE_VERSION, **self.data},
+                                      separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only cache must not break the search
+        self.dirty = False
+
+def row_to_cache(p: NpmPkg) -> list:
+    return [p.name, p.version, p.released.isoformat(), p.downloads, p.score, p.description]
+
+def row_from_cache(row: list) -> NpmPkg:
+    name, version, released, downloads, score, description = row
+    return NpmPkg(name, version, isoparse(released), downloads, score, description)
+
 # ---------------------------------------------------------------------
 # npm helpers
 # ---------------------------------------------------------------------
@@ -138,26 +230,67 @@ def npm_search(query: str, size: int = 200) -> list[dict]:
     except Exception:
         return []
 
-def npm_package_meta(name: str) -> dict:
+async def npm_package_meta(fx, name: str) -> dict:
     """Fetch the full package metadata document."""
-    r = _safe_get(PKG_META_URL.format(name=name), timeout=25)
-    return r.json() if r else {}
-
-def npm_downloads_last_month(name: str) -> int:
-    """Return last-month download count (int)."""
-    r = _safe_get(DOWNLOADS_URL.format(name=name), timeout=20)
-    if not r:
-        return 0
     try:
-        return int(r.json().get("downloads", 0))
+        return await fx.get_json(PKG_META_URL.format(name=name.replace("/", "%2F")))
+    except Exception:
+        return {}
+
+async def npm_downloads_chunk(fx, names: list[str]) -> dict[str, int]:
+    """
+    Last-month downloads for a chunk of names. Several unscoped names go in
+    one bulk query; a single (or scoped) name uses the point endpoint.
+    Names the API does not know are reported as 0.
+    """
+    try:
+        data = await fx.get_json(DOWNLOADS_URL.format(name=",".join(names)))
     except Exception:
-        return 0
+        return {}
+    if len(names) == 1:
+        return {names[0]: int(data.get("downloads", 0) or 0)}
+    return {n: int((data.get(n) or {}).get("downloads", 0) or 0) for n in names}
+
+def fetch_downloads(names: list[str], cache: NpmCache, threads: int) -> dict[str, int]:
+    """
+    Last-month downloads for every name: cached counts first, then bulk
+    chunks of unscoped names and single lookups for scoped ones.
+    """
+    counts: dict[str, int] = {}
+    missing: list[str] = []
+    for n in names:
+        hit = cache.get("downloads", n)
+        if hit is None:
+            missing.append(n)
+        else:
+            counts[n] = hit[0]
+    unscoped = [n for n in missing if not n.startswith("@")]
+    jobs = [unscoped[i:i + BULK_CHUNK] for i in range(0, len(unscoped), BULK_CHUNK)]
+    jobs += [[n] for n in missing if n.startswith("@")]
+    if jobs:
+        for chunk in run_streaming(jobs, npm_downloads_chunk,
+                                   concurrency=threads, headers=HEADERS):
+            for n, c in (chunk or {}).items():
+                counts[n] = c
+                cache.put("downloads", n, c)
+    return counts
+
+def release_from_meta(meta: dict, version: str) -> Optional[str]:
+    """
+    Release timestamp of `version` from a packument's 'time' map, falling
+    back to 'time.modified'.
+    """
+    times = meta.get("time", {}) if isinstance(meta.get("time", {}), dict) else {}
+    if version and version in times:
+        return times[version]
+    return times.get("modified")
 
-def normalize_row(obj: dict) -> NpmPkg | None:
+async def normalize_row(fx, obj: dict, downloads: dict[str, int], cache: NpmCache) -> NpmPkg | None:
     """
     Build a NpmPkg row from a search object, enriching with:
-    - definitive release timestamp (from metadata 'time' field)
-    - last-month downloads (npm downloads API)
+    - definitive release timestamp (packument 'time' field, via the cached
+      summary when it describes the same version)
+    - last-month downloads (looked up beforehand in bulk)
     """
     pkg = obj.get("package") or {}
     name = pkg.get("name")
@@ -168,19 +301,21 @@ def normalize_row(obj: dict) -> NpmPkg | None:
     if not name:
         return None
 
-    # Fetch metadata + downloads
-    meta = npm_package_meta(name)
-    downloads = npm_downloads_last_month(name)
+    # Release date: prefer time[version], then 'time.modified', then search 'date'
+    hit = cache.get("meta", name)
+    if hit is not None and hit[0] == version:
+        released_raw = hit[1]
+        description = description or hit[2]
+    else:
+        meta = await npm_package_meta(fx, name)
+        released_raw = release_from_meta(meta, version)
+        if meta:
+            cache.put("meta", name, version, released_raw,
+                      (meta.get("description") or "")[:80])
 
-    # Determine release date:
-    # prefer time[version], then 'time.modified', then search 'date'
     released_dt = None
     try:
-        times = meta.get("time", {}) if isinstance(meta.get("time", {}), dict) else {}
-        if version and version in times:
-            released_dt = isoparse(times[version])
-        elif "modified" in times:
-            released_dt = isoparse(times["modified"])
+        released_dt = isoparse(released_raw) if released_raw else None
     except Exception:
         released_dt = None
 
@@ -196,11 +331,41 @@ def normalize_row(obj: dict) -> NpmPkg | None:
         name=name,
         version=version,
         released=released_dt.astimezone(timezone.utc),
-        downloads=downloads,
+        downloads=downloads.get(name, 0),
         score=score,
         description=description,
     )
 
+def sort_records(records: list[NpmPkg], criterion: str) -> list[NpmPkg]:
+    if criterion == "latest":
+        key = lambda p: p.released
+    elif criterion == "downloads":
+        key = lambda p: p.downloads
+    else:
+        key = lambda p: p.score
+    return sorted(records, key=key, reverse=True)
+
+def render_table(records: list[NpmPkg], query: str, caption: str | None = None) -> "Table":
+    table = Table(title=f"npm search: “{query}”", caption=caption)
+    table.add_column("#", justify="right")
+    table.add_column("Package")
+    table.add_column("Version", justify="center")
+    table.add_column("Released (UTC)", justify="center")
+    table.add_column("30-day DLs", justify="right")
+    table.add_column("Score", justify="right")
+    table.add_column("Summary")
+    for idx, p in enumerate(records, 1):
+        table.add_row(
+            str(idx),
+            f"[bold]{p.name}[/]",
+            p.version,
+            p.released.strftime("%Y-%m-%d"),
+            f"{p.downloads:,}",
+            f"{p.score:.3f}",
+            p.description,
+        )
+    return table
+
 # ---------------------------------------------------------------------
 # Writers
 # ---------------------------------------------------------------------
@@ -312,6 +477,54 @@ def build_install_cmd(manager: str, pkgs: list[str], global_flag: bool, dev_flag
     else:
         raise ValueError(f"Unsupported manager: {manager}")
 
+# ---------------------------------------------------------------------
+# Search + enrichment
+# ---------------------------------------------------------------------
+def search_and_enrich(args, cache: NpmCache) -> tuple[list[NpmPkg], bool]:
+    """
+    Run the registry search, then add downloads (bulk) and release dates
+    (packuments, concurrently). With rich, rows stream into a live top
+    --limit table. Exits when the search has no matches. Returns the rows
+    and whether every download count was actually looked up (failed
+    lookups show as 0).
+    """
+    if RICH_OK:
+        console.print("[green]Searching npm registry…[/green]")
+    objs = npm_search(args.query, size=args.size)
+    if not objs:
+        if RICH_OK:
+            console.print("[red]No matches.[/red]")
+        else:
+            print("No matches.", file=sys.stderr)
+        sys.exit(1)
+
+    names = [(o.get("package") or {}).get("name") for o in objs]
+    downloads = fetch_downloads([n for n in names if n], cache, args.threads)
+    complete = all(n in downloads for n in names if n)
+
+    async def enrich(fx, obj: dict) -> NpmPkg | None:
+        return await normalize_row(fx, obj, downloads, cache)
+
+    records: list[NpmPkg] = []
+    if RICH_OK:
+        with Live(render_table([], args.query), console=console,
+                  refresh_per_second=8, transient=True) as live:
+            def on_result(obj: dict, row: NpmPkg | None) -> None:
+                if row:
+                    records.append(row)
+                live.update(render_table(
+                    sort_records(records, args.sort)[: args.limit], args.query,
+                    caption=f"enriched {len(records)} of {len(objs)} matches…"))
+
+            run_streaming(objs, enrich, on_result,
+                          concurrency=args.threads, headers=HEADERS)
+    else:
+        print("Gathering metadata and download stats…", file=sys.stderr)
+        records = [r for r in run_streaming(objs, enrich,
+                                            concurrency=args.threads,
+                                            headers=HEADERS) if r]
+    return records, complete
+
 # ---------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------
@@ -334,7 +547,7 @@ Install:
     ag.add_argument("query", help="search term for npm packages")
     ag.add_argument("--sort", choices=("latest", "downloads", "score"), default="latest", help="sorting criterion for results")
     ag.add_argument("--limit", type=int, default=20, help="maximum number of packages to display")
-    ag.add_argument("--threads", type=int, default=16, help="number of parallel threads for per-package enrichment")
+    ag.add_argument("--threads", type=int, default=16, help="initial parallel requests per host for per-package enrichment (adapts to rate limits)")
     ag.add_argument("--size", type=int, default=200, help="how many matches to request from the search API before ranking/trim")
     ag.add_argument("--csv", metavar="FILE", help="export results to CSV file")
     ag.add_argument("--pdf", metavar="FILE", help="export results to PDF file (requires reportlab)")
@@ -344,59 +557,28 @@ Install:
     ag.add_argument("--global","-g", dest="global_install", action="store_true", help="perform a global installation")
     ag.add_argument("--dev", action="store_true", help="add as a dev dependency (where supported)")
     ag.add_argument("--dry-run", action="store_true", help="print the install command without executing it")
+    ag.add_argument("--refresh", action="store_true", help="refetch instead of using cached rows, packument summaries and download counts")
     args = ag.parse_args()
 
-    if RICH_OK:
-        console.print("[green]Searching npm registry…[/green]")
-    objs = npm_search(args.query, size=args.size)
-    if not objs:
+    cache = NpmCache(refresh=args.refresh)
+    rows_key = f"{args.query}|{args.size}"
+    cached_rows = cache.get("rows", rows_key)
+    if cached_rows is not None:
+        records = [row_from_cache(r) for r in cached_rows[0]]
         if RICH_OK:
-            console.print("[red]No matches.[/red]")
-        else:
-            print("No matches.", file=sys.stderr)
-        sys.exit(1)
-
-    # Enrich in parallel
-    if RICH_OK:
-        console.print("[green]Gathering metadata and download stats…[/green]")
-    records: list[NpmPkg] = []
-    with ThreadPoolExecutor(max_workers=args.threads) as ex:
-        futs = [ex.submit(normalize_row, obj) for obj in objs]
-        for fut in as_completed(futs):
-            row = fut.result()
-            if row:
-                records.append(row)
+            console.print("[green]Using cached results (--refresh to refetch).[/green]")
+    else:
+        records, complete = search_and_enrich(args, cache)
+        if complete:  # don't pin 0 downloads from failed lookups for ROWS_TTL
+            cache.put("rows", rows_key, [row_to_cache(p) for p in records])
+    cache.save()
 
     # Sort & trim
-    if args.sort == "latest":
-        records.sort(key=lambda p: p.released, reverse=True)
-    elif args.sort == "downloads":
-        records.sort(key=lambda p: p.downloads, reverse=True)
-    else:
-        records.sort(key=lambda p: p.score, reverse=True)
-    records = records[: args.limit]
+    records = sort_records(records, args.sort)[: args.limit]
 
     # Display
     if RICH_OK:
-        table = Table(title=f"npm search: “{args.query}”")
-        table.add_column("#", justify="right")
-        table.add_column("Package")
-        table.add_column("Version", justify="center")
-        table.add_column("Released (UTC)", justify="center")
-        table.add_column("30-day DLs", justify="right")
-        table.add_column("Score", justify="right")
-        table.add_column("Summary")
-        for idx, p in enumerate(records, 1):
-            table.add_row(
-                str(idx),
-                f"[bold]{p.name}[/]",
-                p.version,
-                p.released.strftime("%Y-%m-%d"),
-                f"{p.downloads:,}",
-                f"{p.score:.3f}",
-                p.description,
-            )
-        console.print(table)
+        console.print(render_table(records, args.query))
     else:
         print(f"npm search: \"{args.query}\"")
         for idx, p in enumerate(records, 1):
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+pacman_localdb.py – Read pacman's package databases directly, without
+spawning `pacman -Qi` / `pacman -Si` and parsing their text output.
+
+Shared by the package-size scripts (sort_pkg_by_size_v3.py,
+sort-pkg-by-size-report.py, sort_installed_package_sizes.py,
+query_pkg_size.py, backup/list_installed_packages_descending_by_size.py).
+Keep it next to them; Python puts a script's own directory on sys.path.
+
+Local database
+--------------
+Every installed package has a `/var/lib/pacman/local/<name>-<ver>/desc`
+file made of `%FIELD%` headers followed by value lines. The files are read
+in parallel, and the parsed rows are cached in
+~/.cache/pacman_localdb/local.json keyed by each desc file's mtime and
+size, so a warm run only stat()s the database.
+
+Sync databases
+--------------
+`/var/lib/pacman/sync/<repo>.db` are compressed tarballs of the same desc
+files; they are read in one pass each (cached by the .db file's mtime).
+
+Dependency graph
+----------------
+`DepGraph` resolves every installed package's depends (through provides)
+into forward and reverse edges. `plan_removal()` computes what
+`pacman -Rs <targets>` would remove: the targets plus, repeatedly, every
+dependency installed as a dependency whose dependants are all being removed
+already. It also reports targets that other installed packages still need
+(pacman would refuse those) and the total size freed. `reclaimable()` ranks
+every package by what removing it alone would free.
+
+Usage as a script (quick check):
+  ./pacman_localdb.py            # 20 largest installed packages
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+DEFAULT_DBPATH = Path("/var/lib/pacman")
+CACHE_DIR = Path.home() / ".cache" / "pacman_localdb"
+CACHE_VERSION = 1
+
+# Install reasons as stored in %REASON% (absent means explicit).
+REASON_EXPLICIT = 0
+REASON_DEPEND = 1
+
+
+class Package(NamedTuple):
+    """One row of the package table. `size` is the installed size in bytes."""
+    name: str
+    version: str
+    size: int
+    reason: int
+    installdate: int
+    depends: Tuple[str, ...]
+    optdepends: Tuple[str, ...]
+    provides: Tuple[str, ...]
+    repo: str = "local"
+
+
+# ---------------------------------------------------------------------------#
+# Parsing                                                                    #
+# ---------------------------------------------------------------------------#
+def parse_desc(text: str) -> Dict[str, List[str]]:
+    """
+    Split a desc file into {FIELD: [value lines]}.
+    """
+    fields: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        if not line:
+            current = None
+        elif current is None:
+            if line.startswith("%") and line.endswith("%") and len(line) > 2:
+                current = fields.setdefault(line[1:-1], [])
+        else:
+            current.append(line)
+    return fields
+
+
+def strip_constraint(dep: str) -> str:
+    """
+    Reduce a dependency string such as 'glibc>=2.38' or 'python: for X'
+    to the bare package/provision name.
+    """
+    dep = dep.split(":", 1)[0]
+    for op in (">=", "<=", "=", ">", "<"):
+        dep = dep.split(op, 1)[0]
+    return dep.strip()
+
+
+def package_from_desc(fields: Dict[str, List[str]], repo: str = "local") -> Package:
+    """
+    Build a Package row from parsed desc fields. Installed size is %SIZE%
+    in the local database and %ISIZE% in sync databases.
+    """
+    def first(key: str, default: str = "") -> str:
+        vals = fields.get(key)
+        return vals[0] if vals else default
+
+    size = first("SIZE") or first("ISIZE") or "0"
+    return Package(
+        name=first("NAME"),
+        version=first("VERSION"),
+        size=int(size),
+        reason=int(first("REASON", "0")),
+        installdate=int(first("INSTALLDATE", "0")),
+        depends=tuple(strip_constraint(d) for d in fields.get("DEPENDS", ())),
+        optdepends=tuple(strip_constraint(d) for d in fields.get("OPTDEPENDS", ())),
+        provides=tuple(strip_constraint(p) for p in fields.get("PROVIDES", ())),
+        repo=repo,
+    )
+
+
+# ---------------------------------------------------------------------------#
+# Cache helpers                                                              #
+# ---------------------------------------------------------------------------#
+def _load_cache(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(path: Path, data: dict) -> None:
+    data["version"] = CACHE_VERSION
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a read-only home must not break listing
+
+
+# ---------------------------------------------------------------------------#
+# Local database                                                             #
+# ---------------------------------------------------------------------------#
+def _read_local_entry(desc: Path) -> Package:
+    return package_from_desc(parse_desc(desc.read_text(encoding="utf-8", errors="replace")))
+
+
+def read_local_db(
+    dbpath: Path = DEFAULT_DBPATH,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+) -> List[Package]:
+    """
+    Return one Package per installed package, sorted by name.
+
+    Raises FileNotFoundError if <dbpath>/local does not exist.
+    """
+    local = Path(dbpath) / "local"
+    if not local.is_dir():
+        raise FileNotFoundError(f"pacman local database not found: {local}")
+
+    cache_path = CACHE_DIR / "local.json"
+    cache = _load_cache(cache_path) if use_cache else {}
+    cached = cache.get("entries", {}) if cache.get("dbpath") == str(local) else {}
+
+    rows: Dict[str, Package] = {}
+    keys: Dict[str, List[int]] = {}
+    todo: List[str] = []
+    with os.scandir(local) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            try:
+                st = os.stat(os.path.join(entry.path, "desc"))
+            except FileNotFoundError:
+                continue
+            key = [st.st_mtime_ns, st.st_size]
+            keys[entry.name] = key
+            hit = cached.get(entry.name)
+            if hit is not None and hit[0] == key:
+                rows[entry.name] = Package(*hit[1][:5], *map(tuple, hit[1][5:8]), "local")
+            else:
+                todo.append(entry.name)
+
+    if todo:
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            descs = (local / name / "desc" for name in todo)
+            rows.update(zip(todo, pool.map(_read_local_entry, descs)))
+
+    if use_cache and (todo or len(rows) != len(cached)):
+        _save_cache(cache_path, {
+            "dbpath": str(local),
+            "entries": {name: [keys[name], list(pkg[:8])] for name, pkg in rows.items()},
+        })
+
+    return sorted(rows.values(), key=lambda p: p.name)
+
+
+# ---------------------------------------------------------------------------#
+# Sync databases                                                             #
+# ---------------------------------------------------------------------------#
+def _read_sync_file(db: Path) -> List[Package]:
+    repo = db.name[: -len(".db")]
+    pkgs: List[Package] = []
+    with tarfile.open(db, mode="r:*") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.endswith("/desc"):
+                continue
+            fh = tar.extractfile(member)
+            if fh is None:
+                continue
+            text = fh.read().decode("utf-8", errors="replace")
+            pkgs.append(package_from_desc(parse_desc(text), repo=repo))
+    return pkgs
+
+
+def read_sync_db(
+    dbpath: Path = DEFAULT_DBPATH,
+    repos: Optional[Iterable[str]] = None,
+    use_cache: bool = True,
+) -> Dict[str, Package]:
+    """
+    Return {name: Package} over the sync databases (first repo wins, like
+    pacman's repository order when `repos` is given; alphabetical otherwise).
+    Databases that cannot be read (e.g. zstd without support) are skipped.
+    """
+    sync = Path(dbpath) / "sync"
+    dbs = [sync / f"{r}.db" for r in repos] if repos else sorted(sync.glob("*.db"))
+
+    cache_path = CACHE_DIR / "sync.json"
+    cache = _load_cache(cache_path) if use_cache else {}
+    cached = cache.get("repos", {})
+    fresh: Dict[str, list] = {}
+
+    result: Dict[str, Package] = {}
+    for db in dbs:
+        try:
+            mtime = db.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+        hit = cached.get(str(db))
+        if hit is not None and hit[0] == mtime:
+            pkgs = [Package(*row[:5], *map(tuple, row[5:8]), row[8]) for row in hit[1]]
+        else:
+            try:
+                pkgs = _read_sync_file(db)
+            except (tarfile.TarError, OSError):
+                continue
+        fresh[str(db)] = [mtime, [list(p) for p in pkgs]]
+        for pkg in pkgs:
+            result.setdefault(pkg.name, pkg)
+
+    if use_cache and fresh != cached:
+        _save_cache(cache_path, {"repos": fresh})
+    return result
+
+
+# ---------------------------------------------------------------------------#
+# Dependency graph                                                           #
+# ---------------------------------------------------------------------------#
+class RemovalPlan(NamedTuple):
+    """Outcome of DepGraph.plan_removal()."""
+    targets: Tuple[str, ...]          # requested packages pacman will accept
+    removes: Tuple[str, ...]          # targets + dependencies freed with them
+    blocked: Dict[str, Tuple[str, ...]]  # target -> installed packages needing it
+    freed: int                        # bytes
+
+
+class DepGraph:
+    """
+    Forward and reverse dependency edges between installed packages.
+    A dependency satisfied by several providers links to all of them, which
+    keeps removal plans on the safe side.
+    """
+
+    def __init__(self, packages: Iterable[Package]):
+        self.packages: Dict[str, Package] = {p.name: p for p in packages}
+        providers: Dict[str, Set[str]] = {}
+        for pkg in self.packages.values():
+            providers.setdefault(pkg.name, set()).add(pkg.name)
+            for prov in pkg.provides:
+                providers.setdefault(prov, set()).add(pkg.name)
+
+        self.depends: Dict[str, Set[str]] = {name: set() for name in self.packages}
+        self.required_by: Dict[str, Set[str]] = {name: set() for name in self.packages}
+        for pkg in self.packages.values():
+            for dep in pkg.depends:
+                for target in providers.get(dep, ()):
+                    if target != pkg.name:
+                        self.depends[pkg.name].add(target)
+                        self.required_by[target].add(pkg.name)
+
+    def closure(self, targets: Iterable[str]) -> Set[str]:
+        """
+        Targets plus every dependency that `pacman -Rs` would take with them:
+        installed as a dependency and required only by packages in the set.
+        """
+        removing = {t for t in targets if t in self.packages}
+        while True:
+            # Re-scan the whole set: a new member can free a dependency of
+            # an older one that was still needed in the previous round.
+            candidates = {d for name in removing for d in self.depends[name]} - removing
+            freed = {
+                d for d in candidates
+                if self.packages[d].reason == REASON_DEPEND
+                and self.required_by[d] <= removing
+            }
+            if not freed:
+                return removing
+            removing |= freed
+
+    def plan_removal(self, targets: Iterable[str]) -> RemovalPlan:
+        """
+        Plan one `pacman -Rs` transaction. Targets that packages outside the
+        selection still depend on are moved to `blocked`, and the plan is
+        recomputed without them until nothing is blocked.
+        """
+        wanted = [t for t in dict.fromkeys(targets) if t in self.packages]
+        blocked: Dict[str, Tuple[str, ...]] = {}
+        while True:
+            removing = self.closure(wanted)
+            newly = {
+                t: tuple(sorted(self.required_by[t] - removing))
+                for t in wanted if self.required_by[t] - removing
+            }
+            if not newly:
+                break
+            blocked.update(newly)
+            wanted = [t for t in wanted if t not in newly]
+        extra = sorted(removing - set(wanted), key=lambda n: -self.packages[n].size)
+        return RemovalPlan(
+            targets=tuple(wanted),
+            removes=tuple(wanted) + tuple(extra),
+            blocked=blocked,
+            freed=sum(self.packages[n].size for n in removing),
+        )
+
+    def freed(self, name: str) -> Optional[int]:
+        """Bytes `pacman -Rs name` would free, or None if something needs it."""
+        if self.required_by.get(name):
+            return None
+        return sum(self.packages[n].size for n in self.closure([name]))
+
+    def reclaimable(self, limit: Optional[int] = None) -> List[Tuple[Package, int, int]]:
+        """
+        (package, bytes freed, packages removed) for every package nothing
+        else depends on, largest saving first.
+        """
+        ranking = []
+        for name in self.packages:
+            if self.required_by[name]:
+                continue
+            removing = self.closure([name])
+            ranking.append((self.packages[name],
+                            sum(self.packages[n].size for n in removing),
+                            len(removing)))
+        ranking.sort(key=lambda row: row[1], reverse=True)
+        return ranking if limit is None else ranking[:limit]
+
+
+# ---------------------------------------------------------------------------#
+# Formatting                                                                 #
+# ---------------------------------------------------------------------------#
+def human_size(num_bytes: float) -> str:
+    """Format bytes as KiB, MiB or GiB with two decimals."""
+    kib = num_bytes / 1024
+    if kib < 1024:
+        return f"{kib:.2f} KiB"
+    if kib < 1024 * 1024:
+        return f"{kib / 1024:.2f} MiB"
+    return f"{kib / (1024 * 1024):.2f} GiB"
+
+
+if __name__ == "__main__":
+    for pkg in sorted(read_local_db(), key=lambda p: p.size, reverse=True)[:20]:
+        print(f"{pkg.name:<40} {human_size(pkg.size):>12}")
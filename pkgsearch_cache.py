@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+"""
+pkgsearch_cache.py – Shared on-disk caches for the package search scripts
+(find-py-pkg.py, python-search.py and friends).
+
+Keep it next to the scripts; Python puts a script's own directory on
+sys.path, so `from pkgsearch_cache import ...` just works.
+
+String tables
+-------------
+Large name lists are stored as a sorted string table: a small header, an
+array of uint64 offsets and one UTF-8 blob. The file is memory-mapped on
+load, so opening it costs the same for 500 names as for 500 000; names are
+only decoded when they are actually touched.
+
+A count table is a string table with two more arrays: a uint64 value per
+name and the name ids ordered by descending value. It backs name ->
+downloads maps such as the Top-PyPI dump (`most_common(n)` reads the first
+n ranks, `get(name)` is a binary search).
+
+PyPI name index
+---------------
+`load_pypi_index()` keeps every PyPI project name in
+~/.cache/pypi_rank/pypi_names.strtab. It is refreshed from the JSON simple
+API (PEP 691) with conditional requests (ETag / Last-Modified), so a stale
+index costs one small 304 round trip and a fresh one none at all.
+
+conda-forge names
+-----------------
+`load_conda_forge_names()` keeps the conda-forge package names (noarch and
+linux-64 current_repodata.json) in conda_names.strtab, refreshed daily.
+`pip_to_conda()` maps a PyPI project onto it with PEP 503 normalisation and
+a table of known renames (torch -> pytorch, tables -> pytables, ...).
+
+N-gram index
+------------
+Fuzzy scoring every PyPI name (or every conda-forge name per result row)
+takes seconds. For each name universe a trigram index (`<name>.tri`) maps
+every trigram of the canonical name to the sorted list of name ids that
+contain it. A query only scores the few thousand names that share the most
+trigrams with it. Indexes are rebuilt in a detached background process
+whenever their name table changes; until then callers fall back to a full
+scan.
+
+HTTP metadata cache
+-------------------
+`HttpCache` keeps per-URL JSON results in ~/.cache/pypi_rank/http_cache.sqlite.
+Only the fields a caller extracts are stored (not the multi-MB PyPI JSON
+documents), together with the ETag / Last-Modified validators. Entries
+younger than their TTL are served without network access; older ones are
+revalidated with a conditional GET. All worker threads share one pooled
+requests.Session.
+
+Usage as a script:
+  ./pkgsearch_cache.py --refresh              # force a PyPI index refresh
+  ./pkgsearch_cache.py --build-ngrams pypi    # (re)build an n-gram index
+"""
+
+from __future__ import annotations
+
+import heapq
+import html
+import json
+import mmap
+import os
+import pathlib
+import re
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = pathlib.Path.home() / ".cache" / "pypi_rank"
+
+SIMPLE_URL = "https://pypi.org/simple/"
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+USER_AGENT = "python-search/1.0"
+
+PYPI_INDEX = CACHE_DIR / "pypi_names.strtab"
+PYPI_INDEX_META = CACHE_DIR / "pypi_names.meta.json"
+# How long an index is trusted before asking PyPI whether it changed.
+PYPI_STALE = 6 * 3600
+
+CONDA_NAMES = CACHE_DIR / "conda_names.strtab"
+CONDA_SUBDIRS = ("noarch", "linux-64")
+CONDA_TMPL = "https://conda.anaconda.org/conda-forge/{subdir}/current_repodata.json"
+CONDA_STALE = 24 * 3600
+
+# PyPI projects published on conda-forge under another name (canonical keys).
+PIP_TO_CONDA = {
+    "torch": "pytorch",
+    "opencv-python": "opencv",
+    "opencv-python-headless": "opencv",
+    "opencv-contrib-python": "opencv",
+    "tensorflow-cpu": "tensorflow",
+    "tables": "pytables",
+    "msgpack": "msgpack-python",
+    "graphviz": "python-graphviz",
+    "psycopg2-binary": "psycopg2",
+    "psycopg-binary": "psycopg",
+    "docker": "docker-py",
+    "duckdb": "python-duckdb",
+    "build": "python-build",
+    "xxhash": "python-xxhash",
+    "tzdata": "python-tzdata",
+    "fastjsonschema": "python-fastjsonschema",
+    "flatbuffers": "python-flatbuffers",
+    "kaleido": "python-kaleido",
+    "pyqt5": "pyqt",
+    "antlr4-python3-runtime": "antlr-python-runtime",
+}
+
+HTTP_CACHE_DB = CACHE_DIR / "http_cache.sqlite"
+# Entries not refreshed for this long are purged when the cache is opened.
+HTTP_CACHE_MAX_AGE = 30 * 24 * 3600
+
+# name universe -> string table it indexes
+UNIVERSES = {
+    "pypi": PYPI_INDEX,
+    "conda": CONDA_NAMES,
+}
+
+STRTAB_MAGIC = b"STRTAB\x00\x01"
+COUNTS_MAGIC = b"CNTTAB\x00\x01"
+_HEADER = struct.Struct("<8sQ")
+
+NGRAM_MAGIC = b"NGRAM\x00\x00\x01"
+# magic | source mtime_ns | source size | n keys | n postings
+_NGRAM_HEADER = struct.Struct("<8sQQQQ")
+# Default number of names handed to the exact scorer.
+PREFILTER = 3000
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Atomic writes
+# ──────────────────────────────────────────────────────────────────────────────
+def write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write bytes to path via a temporary file + rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def read_json(path: pathlib.Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json(path: pathlib.Path, data: dict) -> None:
+    write_atomic(path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Sorted, memory-mapped string tables
+# ──────────────────────────────────────────────────────────────────────────────
+def write_string_table(path: pathlib.Path, strings: Iterable[str]) -> int:
+    """
+    Store the unique strings sorted by their UTF-8 bytes. Returns the count.
+    Layout: magic (8) | count (u64) | offsets (u64 × count+1) | blob.
+    """
+    encoded = sorted({s.encode("utf-8") for s in strings})
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    data = b"".join((
+        _HEADER.pack(STRTAB_MAGIC, len(encoded)),
+        struct.pack(f"<{len(offsets)}Q", *offsets),
+        *encoded,
+    ))
+    write_atomic(path, data)
+    return len(encoded)
+
+
+class StringTable(Sequence[str]):
+    """
+    Read-only, memory-mapped view of a file written by write_string_table().
+    Supports len(), indexing, iteration, `in` (binary search) and prefix
+    ranges.
+    """
+
+    MAGIC = STRTAB_MAGIC
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a {type(self).__name__} (or an old version)")
+        self._count = count
+        start = _HEADER.size
+        self._offsets = memoryview(self._mm)[start:start + 8 * (count + 1)].cast("Q")
+        self._blob = self._open_columns(start + 8 * (count + 1))
+
+    def _open_columns(self, pos: int) -> int:
+        """Map any per-entry arrays stored after the offsets; returns the blob start."""
+        return pos
+
+    def __len__(self) -> int:
+        return self._count
+
+    def size(self, i: int) -> int:
+        """Length in bytes of entry i (without decoding it)."""
+        return self._offsets[i + 1] - self._offsets[i]
+
+    def raw(self, i: int) -> bytes:
+        return self._mm[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1]]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self.raw(i).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self.raw(i).decode("utf-8")
+
+    def _bisect(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.raw(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        key = name.encode("utf-8")
+        i = self._bisect(key)
+        return i < self._count and self.raw(i) == key
+
+    def prefix(self, prefix: str) -> list[str]:
+        """All strings starting with prefix (byte-wise), in sorted order."""
+        key = prefix.encode("utf-8")
+        out = []
+        i = self._bisect(key)
+        while i < self._count:
+            item = self.raw(i)
+            if not item.startswith(key):
+                break
+            out.append(item.decode("utf-8"))
+            i += 1
+        return out
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._mm.close()
+
+
+def write_count_table(path: pathlib.Path, counts: dict[str, int]) -> int:
+    """
+    Store a {name: count} map sorted by the names' UTF-8 bytes. Returns the
+    number of entries. Layout: magic (8) | count (u64) | offsets (u64 ×
+    count+1) | values (u64 × count) | ids by descending value (u32 × count)
+    | blob.
+    """
+    pairs = sorted((k.encode("utf-8"), max(0, int(v))) for k, v in counts.items())
+    offsets = [0]
+    for key, _ in pairs:
+        offsets.append(offsets[-1] + len(key))
+    values = [v for _, v in pairs]
+    ranks = sorted(range(len(pairs)), key=lambda i: (-values[i], i))
+    data = b"".join((
+        _HEADER.pack(COUNTS_MAGIC, len(pairs)),
+        struct.pack(f"<{len(offsets)}Q", *offsets),
+        struct.pack(f"<{len(values)}Q", *values),
+        struct.pack(f"<{len(ranks)}I", *ranks),
+        *(key for key, _ in pairs),
+    ))
+    write_atomic(path, data)
+    return len(pairs)
+
+
+class CountTable(StringTable):
+    """
+    Read-only, memory-mapped {name: count} map written by
+    write_count_table(). As a sequence it holds the names in sorted order.
+    """
+
+    MAGIC = COUNTS_MAGIC
+
+    def _open_columns(self, pos: int) -> int:
+        n = self._count
+        self._values = memoryview(self._mm)[pos:pos + 8 * n].cast("Q")
+        pos += 8 * n
+        self._ranks = memoryview(self._mm)[pos:pos + 4 * n].cast("I")
+        return pos + 4 * n
+
+    def value(self, i: int) -> int:
+        return self._values[i]
+
+    def get(self, name: str, default: int = 0) -> int:
+        key = name.encode("utf-8")
+        i = self._bisect(key)
+        if i < self._count and self.raw(i) == key:
+            return self._values[i]
+        return default
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        for i in range(self._count):
+            yield self.raw(i).decode("utf-8"), self._values[i]
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """The n largest entries (all when n is None), highest first."""
+        stop = self._count if n is None else min(max(0, n), self._count)
+        return [(self[i], self._values[i]) for i in self._ranks[:stop]]
+
+    def close(self) -> None:
+        self._values.release()
+        self._ranks.release()
+        super().close()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PyPI name index
+# ──────────────────────────────────────────────────────────────────────────────
+def _parse_simple_index(resp: requests.Response) -> list[str]:
+    """Project names from a PEP 691 JSON or legacy HTML /simple/ response."""
+    if resp.headers.get("Content-Type", "").startswith(SIMPLE_JSON):
+        return [p["name"] for p in resp.json().get("projects", [])]
+    return [html.unescape(n) for n in
+            re.findall(r'<a href="/simple/[^\"]+">([^<]+)</a>', resp.text, re.I)]
+
+
+def load_pypi_index(force: bool = False, stale: float = PYPI_STALE) -> StringTable:
+    """
+    Return the cached PyPI name index, revalidating it with PyPI when it is
+    older than `stale` seconds (or when `force` is set). If PyPI cannot be
+    reached, an existing index is used as-is.
+    """
+    meta = read_json(PYPI_INDEX_META)
+    have_index = PYPI_INDEX.exists() and meta.get("count") is not None
+    if have_index and not force and time.time() - meta.get("checked", 0) < stale:
+        return StringTable(PYPI_INDEX)
+
+    headers = {"Accept": f"{SIMPLE_JSON}, text/html;q=0.1", "User-Agent": USER_AGENT}
+    if have_index:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        resp = requests.get(SIMPLE_URL, headers=headers, timeout=60)
+        if resp.status_code != 304:
+            resp.raise_for_status()
+    except requests.RequestException:
+        if have_index:
+            return StringTable(PYPI_INDEX)
+        raise
+
+    if resp.status_code == 304:
+        meta["checked"] = time.time()
+        write_json(PYPI_INDEX_META, meta)
+        return StringTable(PYPI_INDEX)
+
+    count = write_string_table(PYPI_INDEX, _parse_simple_index(resp))
+    schedule_ngram_build("pypi")
+    write_json(PYPI_INDEX_META, {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "serial": resp.headers.get("X-PyPI-Last-Serial"),
+        "checked": time.time(),
+        "count": count,
+    })
+    return StringTable(PYPI_INDEX)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# conda-forge name set
+# ──────────────────────────────────────────────────────────────────────────────
+def load_conda_forge_names(force: bool = False, stale: float = CONDA_STALE) -> StringTable:
+    """
+    Return the cached conda-forge package names (conda_names.strtab),
+    downloading current_repodata.json for CONDA_SUBDIRS when the table is
+    older than `stale` seconds. If conda-forge cannot be reached, an existing
+    table is used as-is; with none at all the result is empty.
+    """
+    try:
+        age = time.time() - CONDA_NAMES.stat().st_mtime
+    except FileNotFoundError:
+        age = None
+    if age is not None and age < stale and not force:
+        return StringTable(CONDA_NAMES)
+
+    names: set[str] = set()
+    session = make_session(len(CONDA_SUBDIRS))
+    for sub in CONDA_SUBDIRS:
+        try:
+            resp = session.get(CONDA_TMPL.format(subdir=sub), timeout=60)
+            resp.raise_for_status()
+            pkgs = resp.json().get("packages", {})
+        except (requests.RequestException, ValueError):
+            continue
+        names.update(meta["name"] for meta in pkgs.values())
+    if names:
+        update_name_table("conda", names)
+    elif age is None:
+        # Empty placeholder, back-dated so the next run tries again.
+        write_string_table(CONDA_NAMES, ())
+        os.utime(CONDA_NAMES, (0, 0))
+    return StringTable(CONDA_NAMES)
+
+
+def conda_lookup(names: Iterable[str]) -> dict[str, str]:
+    """Map canonical name -> conda-forge name, for O(1) availability checks."""
+    return {canonical(n): n for n in names}
+
+
+def pip_to_conda(pip_name: str, lookup: dict[str, str]) -> str:
+    """
+    Conda-forge name for a PyPI project ("" if conda-forge does not package
+    it): known renames first, then the normalised name itself.
+    """
+    pip_c = canonical(pip_name)
+    alias = PIP_TO_CONDA.get(pip_c)
+    if alias is not None and canonical(alias) in lookup:
+        return lookup[canonical(alias)]
+    return lookup.get(pip_c, "")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Trigram index
+# ──────────────────────────────────────────────────────────────────────────────
+def canonical(name: str) -> str:
+    """Lower-case and collapse separators, like PEP 503 normalisation."""
+    return re.sub(r"[^0-9a-z]+", "-", name.lower())
+
+
+def trigrams(name: str) -> set[str]:
+    padded = f"^{canonical(name)}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def ngram_path(universe: str) -> pathlib.Path:
+    return UNIVERSES[universe].with_suffix(".tri")
+
+
+def build_ngram_index(table_path: pathlib.Path, index_path: pathlib.Path) -> None:
+    """
+    Write the trigram index for a string table.
+    Layout: header | key offsets (u64 × n+1) | posting offsets (u64 × n+1)
+            | postings (u32 name ids) | key blob (UTF-8, sorted).
+    """
+    st = table_path.stat()
+    table = StringTable(table_path)
+    postings: dict[str, array] = {}
+    try:
+        for i, name in enumerate(table):
+            for tri in trigrams(name):
+                ids = postings.get(tri)
+                if ids is None:
+                    ids = postings[tri] = array("I")
+                ids.append(i)
+    finally:
+        table.close()
+
+    keys = sorted(postings, key=lambda k: k.encode("utf-8"))
+    blobs = [k.encode("utf-8") for k in keys]
+    key_offsets = array("Q", [0])
+    post_offsets = array("Q", [0])
+    all_ids = array("I")
+    for key, blob in zip(keys, blobs):
+        key_offsets.append(key_offsets[-1] + len(blob))
+        all_ids.extend(postings[key])
+        post_offsets.append(len(all_ids))
+    if sys.byteorder != "little":
+        for arr in (key_offsets, post_offsets, all_ids):
+            arr.byteswap()
+    write_atomic(index_path, b"".join((
+        _NGRAM_HEADER.pack(NGRAM_MAGIC, st.st_mtime_ns, st.st_size, len(keys), len(all_ids)),
+        key_offsets.tobytes(), post_offsets.tobytes(), all_ids.tobytes(), *blobs,
+    )))
+
+
+class NgramIndex:
+    """Memory-mapped trigram index over one StringTable."""
+
+    def __init__(self, index_path: pathlib.Path, table: StringTable):
+        self.table = table
+        with open(index_path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.src_mtime, self.src_size, nkeys, npost = \
+            _NGRAM_HEADER.unpack_from(self._mm, 0)
+        if magic != NGRAM_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{index_path} is not an n-gram index")
+        view = memoryview(self._mm)
+        pos = _NGRAM_HEADER.size
+        self._key_off = view[pos:pos + 8 * (nkeys + 1)].cast("Q")
+        pos += 8 * (nkeys + 1)
+        self._post_off = view[pos:pos + 8 * (nkeys + 1)].cast("Q")
+        pos += 8 * (nkeys + 1)
+        self._ids = view[pos:pos + 4 * npost].cast("I")
+        self._keys = pos + 4 * npost
+        self._nkeys = nkeys
+
+    def _key(self, i: int) -> bytes:
+        return self._mm[self._keys + self._key_off[i]:self._keys + self._key_off[i + 1]]
+
+    def postings(self, tri: str):
+        """Name ids containing trigram `tri` (empty if none)."""
+        key = tri.encode("utf-8")
+        lo, hi = 0, self._nkeys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._nkeys and self._key(lo) == key:
+            return self._ids[self._post_off[lo]:self._post_off[lo + 1]]
+        return ()
+
+    def candidates(self, query: str, limit: int = PREFILTER) -> list[str]:
+        """
+        Names sharing the most trigrams with query, ranked by Dice
+        similarity 2·shared / (|q| + |name|), best first.
+        """
+        grams = trigrams(query)
+        counts: Counter = Counter()
+        for tri in grams:
+            counts.update(self.postings(tri))
+        nq = len(grams)
+        size = self.table.size
+        best = heapq.nlargest(limit, counts.items(),
+                              key=lambda kv: 2 * kv[1] / (nq + size(kv[0])))
+        return [self.table[i] for i, _ in best]
+
+    def close(self) -> None:
+        for view in (self._key_off, self._post_off, self._ids):
+            view.release()
+        self._mm.close()
+
+
+def open_ngram_index(universe: str, table: StringTable | None = None) -> NgramIndex | None:
+    """
+    Open the n-gram index for a universe ('pypi', 'conda'). Returns None
+    (and starts a background rebuild) when it is missing or older than its
+    name table, so callers can fall back to a full scan.
+    """
+    table_path = UNIVERSES[universe]
+    index_path = ngram_path(universe)
+    if not table_path.exists():
+        return None
+    try:
+        idx = NgramIndex(index_path, table or StringTable(table_path))
+    except (OSError, ValueError):
+        schedule_ngram_build(universe)
+        return None
+    st = table_path.stat()
+    if (idx.src_mtime, idx.src_size) != (st.st_mtime_ns, st.st_size):
+        idx.close()
+        schedule_ngram_build(universe)
+        return None
+    return idx
+
+
+def schedule_ngram_build(universe: str) -> None:
+    """
+    Rebuild a universe's n-gram index in a detached process, unless a
+    build is already running (lock file younger than ten minutes).
+    """
+    lock = ngram_path(universe).with_suffix(".tri.lock")
+    try:
+        if time.time() - lock.stat().st_mtime < 600:
+            return
+        lock.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError:
+        return
+    os.close(fd)
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--build-ngrams", universe],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def update_name_table(universe: str, names: Iterable[str]) -> None:
+    """Rewrite a universe's string table and refresh its n-gram index."""
+    write_string_table(UNIVERSES[universe], names)
+    schedule_ngram_build(universe)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP metadata cache
+# ──────────────────────────────────────────────────────────────────────────────
+def make_session(pool_size: int = 16) -> requests.Session:
+    """A requests.Session whose connection pool fits pool_size threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class HttpCache:
+    """
+    SQLite-backed cache of extracted JSON fields with ETag revalidation.
+    Safe to use from many threads (one SQLite connection per thread).
+    """
+
+    def __init__(self, path: pathlib.Path = HTTP_CACHE_DB, pool_size: int = 16):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.session = make_session(pool_size)
+        self._local = threading.local()
+        db = self._db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+            " fetched REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        db.execute("DELETE FROM cache WHERE fetched < ?", (time.time() - HTTP_CACHE_MAX_AGE,))
+        db.commit()
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _store(self, url: str, resp: requests.Response | None, data: str) -> None:
+        db = self._db()
+        if resp is None:
+            db.execute("UPDATE cache SET fetched = ? WHERE url = ?", (time.time(), url))
+        else:
+            db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                 time.time(), data),
+            )
+        db.commit()
+
+    def get_json(self, url: str, extract: Callable[[Any], Any], ttl: float,
+                 timeout: float = 15.0, tries: int = 2) -> Any:
+        """
+        Return extract(response JSON) for url, served from the cache while
+        younger than ttl seconds and revalidated (If-None-Match /
+        If-Modified-Since) afterwards. Raises RuntimeError when the request
+        fails and nothing is cached.
+        """
+        row = self._db().execute(
+            "SELECT etag, last_modified, fetched, data FROM cache WHERE url = ?", (url,)
+        ).fetchone()
+        if row is not None and time.time() - row[2] < ttl:
+            return json.loads(row[3])
+
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+
+        last = None
+        for _ in range(max(1, tries)):
+            try:
+                resp = self.session.get(url, headers=headers, timeout=timeout)
+                if resp.status_code == 304 and row is not None:
+                    self._store(url, None, row[3])
+                    return json.loads(row[3])
+                resp.raise_for_status()
+                value = extract(resp.json())
+                self._store(url, resp, json.dumps(value, separators=(",", ":")))
+                return value
+            except (requests.RequestException, ValueError) as ex:
+                last = ex
+                time.sleep(0.4)
+        if row is not None:
+            return json.loads(row[3])
+        raise RuntimeError(f"GET {url} failed: {last}")
+
+
+_http_cache: HttpCache | None = None
+_http_cache_lock = threading.Lock()
+
+
+def http_cache(pool_size: int = 16) -> HttpCache:
+    """Process-wide HttpCache, created on first use (pool_size applies then)."""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(pool_size=pool_size)
+    return _http_cache
+
+
+def _forget_http_cache() -> None:
+    # A forked child (pkgsearch_daemon.py) must not share the parent's
+    # SQLite connection or pooled sockets.
+    global _http_cache, _http_cache_lock
+    _http_cache = None
+    _http_cache_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_http_cache)
+
+
+if __name__ == "__main__":
+    if "--build-ngrams" in sys.argv[1:]:
+        universe = sys.argv[sys.argv.index("--build-ngrams") + 1]
+        try:
+            build_ngram_index(UNIVERSES[universe], ngram_path(universe))
+        finally:
+            ngram_path(universe).with_suffix(".tri.lock").unlink(missing_ok=True)
+        sys.exit(0)
+    idx = load_pypi_index(force="--refresh" in sys.argv[1:])
+    print(f"{len(idx):,} PyPI names in {idx.path}")
@@ -8,15 +8,28 @@ words by the first suggestion hunspell returns.
 Example:
   echo "Det her er en teskt" | hunspell_autocorrect.py -d da_DK
   echo "Bu bir sınav cümlesi" | hunspell_autocorrect.py -d tr_TR
+  hunspell_autocorrect.py -d da_DK -j 4 < book.txt > book.fixed.txt
+
+Input is processed in chunks of lines (--chunk-lines). The unique words of
+a chunk that are not in the LRU suggestion cache are written to hunspell in
+one go (one word per line, so every answer block maps back to its word)
+while a second thread reads the answers, instead of one pipe round trip
+per token. With -j N the new words of each chunk are split across N
+hunspell processes. Use --chunk-lines 1 for interactive use.
 """
 
 import argparse
+import itertools
 import re
 import subprocess
 import sys
-from typing import Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 
 WORD_RE = re.compile(r"\w+", re.UNICODE)
+TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]", re.UNICODE)
 
 
 def parse_suggestion_line(line: str) -> Optional[str]:
@@ -64,20 +77,12 @@ class HunspellSession:
             stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
             text=True,
-            bufsize=1,
         )
         # First line is a header like "Hunspell 1.7.2"
         _ = self.proc.stdout.readline()
 
-    def suggest(self, word: str) -> Optional[str]:
-        """Return best suggestion for $(word), or None if hunspell is happy."""
-        if not self.proc or not self.proc.stdin or not self.proc.stdout:
-            return None
-
-        # Send word to hunspell
-        self.proc.stdin.write(word + "\n")
-        self.proc.stdin.flush()
-
+    def _read_block(self) -> Optional[str]:
+        """Read one word's answer block; returns its best suggestion."""
         suggestion = None
 
         # -a protocol: responses for each word end with a blank line
@@ -98,6 +103,34 @@ class HunspellSession:
                     suggestion = cand
         return suggestion
 
+    def suggest_many(self, words: List[str]) -> List[Optional[str]]:
+        """
+        Best suggestion (or None) for each word, in order. All words are
+        sent at once from a writer thread while this thread reads the
+        answers, so a full pipe in either direction cannot deadlock.
+        """
+        if not words:
+            return []
+        if not self.proc or not self.proc.stdin or not self.proc.stdout:
+            return [None] * len(words)
+
+        def send() -> None:
+            try:
+                self.proc.stdin.write("\n".join(words) + "\n")
+                self.proc.stdin.flush()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        writer = threading.Thread(target=send, daemon=True)
+        writer.start()
+        results = [self._read_block() for _ in words]
+        writer.join()
+        return results
+
+    def suggest(self, word: str) -> Optional[str]:
+        """Return best suggestion for $(word), or None if hunspell is happy."""
+        return self.suggest_many([word])[0]
+
     def close(self) -> None:
         try:
             if self.proc and self.proc.stdin:
@@ -110,27 +143,83 @@ class HunspellSession:
             self.proc.terminate()
 
 
-def process_line(line: str, session: HunspellSession) -> str:
+class Corrector:
     """
-    Tokenize line into words / whitespace / punctuation, auto-correct words.
+    One or more HunspellSessions behind an LRU cache of suggestions.
+    lookup() answers a batch of words with at most one pipelined round trip
+    per session.
     """
-    tokens = re.findall(r"\w+|\s+|[^\w\s]", line, flags=re.UNICODE)
+
+    def __init__(self, dictionary: str, workers: int = 1, cache_size: int = 100_000):
+        self.sessions = [HunspellSession(dictionary) for _ in range(max(1, workers))]
+        self.pool = ThreadPoolExecutor(len(self.sessions)) if len(self.sessions) > 1 else None
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    def lookup(self, words: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Suggestion (or None) for every distinct word."""
+        found: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+        for word in dict.fromkeys(words):
+            if word in self.cache:
+                self.cache.move_to_end(word)
+                found[word] = self.cache[word]
+            else:
+                missing.append(word)
+
+        if missing:
+            n = len(self.sessions)
+            if self.pool is None or len(missing) < 2 * n:
+                answers = self.sessions[0].suggest_many(missing)
+            else:
+                # Contiguous slices keep each session's answers in order.
+                step = -(-len(missing) // n)
+                slices = [missing[i:i + step] for i in range(0, len(missing), step)]
+                answers = list(itertools.chain.from_iterable(
+                    self.pool.map(lambda pair: pair[0].suggest_many(pair[1]),
+                                  zip(self.sessions, slices))))
+            for word, suggestion in zip(missing, answers):
+                found[word] = suggestion
+                self.cache[word] = suggestion
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return found
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+        for session in self.sessions:
+            session.close()
+
+
+def correct_tokens(tokens: List[str], suggestions: Dict[str, Optional[str]]) -> str:
     out_tokens = []
 
     for tok in tokens:
-        if WORD_RE.fullmatch(tok):
-            suggestion = session.suggest(tok)
-            if suggestion:
-                suggestion = match_case(suggestion, tok)
-                out_tokens.append(suggestion)
-            else:
-                out_tokens.append(tok)
+        suggestion = suggestions.get(tok) if WORD_RE.fullmatch(tok) else None
+        if suggestion:
+            out_tokens.append(match_case(suggestion, tok))
         else:
             out_tokens.append(tok)
 
     return "".join(out_tokens)
 
 
+def process_lines(lines: List[str], corrector: Corrector) -> List[str]:
+    """
+    Tokenize lines into words / whitespace / punctuation, auto-correct words.
+    """
+    token_lines = [TOKEN_RE.findall(line) for line in lines]
+    words = (tok for tokens in token_lines for tok in tokens if WORD_RE.fullmatch(tok))
+    suggestions = corrector.lookup(words)
+    return [correct_tokens(tokens, suggestions) for tokens in token_lines]
+
+
+def process_line(line: str, corrector: Corrector) -> str:
+    """Auto-correct a single line."""
+    return process_lines([line], corrector)[0]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Naive autocorrect wrapper around hunspell."
@@ -141,19 +230,43 @@ def main() -> int:
         default="en_GB",
         help="Hunspell dictionary name (e.g. da_DK, tr_TR, en_GB)",
     )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of hunspell processes to spread new words over (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-lines",
+        type=int,
+        default=1000,
+        help="Lines read per batch (default: 1000; use 1 for interactive input)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=100_000,
+        help="Distinct words kept in the suggestion cache (default: 100000)",
+    )
     args = parser.parse_args()
 
-    session = HunspellSession(args.dict)
+    corrector = Corrector(args.dict, workers=args.workers, cache_size=args.cache_size)
+    chunk = max(1, args.chunk_lines)
 
     try:
-        for line in sys.stdin:
-            corrected = process_line(line, session)
-            sys.stdout.write(corrected)
+        while True:
+            lines = list(itertools.islice(sys.stdin, chunk))
+            if not lines:
+                break
+            sys.stdout.writelines(process_lines(lines, corrector))
+            if chunk == 1:
+                sys.stdout.flush()
     except BrokenPipeError:
         # Allow use in pipelines without ugly traceback.
         pass
     finally:
-        session.close()
+        corrector.close()
     return 0
 
 
@@ -12,6 +12,12 @@ Highlights
 - By default, downloads come from the Top-PyPI dump (fast, reliable).
 - Optional PyPIStats lookups for {day, week, month} after filtering.
 - Filter by latest release recency: --released-since DAYS.
+- The PyPI name index is cached memory-mapped in ~/.cache/pypi_rank and only
+  revalidated (ETag / Last-Modified) every few hours; --refresh-index forces it.
+- Fuzzy matching is prefiltered by trigram indexes over PyPI and conda-forge
+  names, rebuilt in the background whenever those name lists change.
+- The Top-PyPI dump and the conda-forge names are cached as versioned binary
+  tables (top_pypi.counts, conda_names.strtab) and memory-mapped on load.
 
 Usage examples
 --------------
@@ -34,10 +40,17 @@ Usage examples
 """
 from __future__ import annotations
 
+# Hand the run to a warm pkgsearch_daemon.py if one is listening (no-op otherwise).
+if __name__ == "__main__":
+  try:
+    from pkgsearch_daemon import delegate
+  except ImportError:
+    pass
+  else:
+    delegate(__file__)
+
 import argparse
 import csv
-import html
-import json
 import pathlib
 import re
 import subprocess
@@ -45,7 +58,7 @@ import sys
 import time
 from collections import namedtuple
 from datetime import datetime, timedelta, timezone
-from typing import Iterable
+from typing import Iterable, Sequence
 
 import requests
 from dateutil.parser import isoparse
@@ -53,10 +66,13 @@ from rapidfuzz import fuzz, process
 from rich.console import Console
 from rich.table import Table
 
+from pkgsearch_cache import (CountTable, NgramIndex, StringTable, http_cache,
+                             load_conda_forge_names, load_pypi_index,
+                             open_ngram_index, write_count_table)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Constants & endpoints
 # ──────────────────────────────────────────────────────────────────────────────
-SIMPLE_URL   = "https://pypi.org/simple/"
 JSON_URL     = "https://pypi.org/pypi/{name}/json"
 PSTAT_URL    = "https://pypistats.org/api/packages/{name}/recent"
 
@@ -66,17 +82,14 @@ TOP_URLS = (
   "https://hugovk.github.io/top-pypi-packages/top-pypi-packages-30-days.min.json",
 )
 
-CONDA_SUBDIRS = ("noarch", "linux-64")
-CONDA_TMPL    = "https://conda.anaconda.org/conda-forge/{subdir}/current_repodata.json"
-
 CACHE_DIR   = pathlib.Path.home() / ".cache" / "pypi_rank"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
-CONDA_CACHE = CACHE_DIR / "conda_names.json"
-TOP_CACHE   = CACHE_DIR / "top_pypi.json"
+TOP_CACHE   = CACHE_DIR / "top_pypi.counts"   # name -> downloads, CountTable
 
 # cache staleness (seconds)
-CONDA_STALE = 24 * 3600
 TOP_STALE   = 24 * 3600
+META_TTL    = 12 * 3600   # PyPI JSON summaries, revalidated by ETag after this
+PSTAT_TTL   = 12 * 3600   # pypistats updates once a day
 
 console = Console()
 PKG = namedtuple("PKG", "name summary released downloads conda")
@@ -128,41 +141,58 @@ def parse_selection(selection: str, max_index: int) -> list[int]:
 # ──────────────────────────────────────────────────────────────────────────────
 # PyPI index + metadata
 # ──────────────────────────────────────────────────────────────────────────────
-def fetch_pypi_index() -> list[str]:
-  r = requests.get(SIMPLE_URL, timeout=30)
-  r.raise_for_status()
-  return [html.unescape(n) for n in
-          re.findall(r'<a href="/simple/[^\"]+">([^<]+)</a>', r.text, re.I)]
+def fetch_pypi_index(refresh: bool = False) -> Sequence[str]:
+  """
+  All PyPI project names, from the memory-mapped index in CACHE_DIR.
+  Revalidated with a conditional request only when older than PYPI_STALE.
+  """
+  return load_pypi_index(force=refresh)
 
-def best_pypi_matches(query: str, candidates: list[str], k: int = 400) -> list[str]:
+def best_pypi_matches(query: str, candidates: Sequence[str], k: int = 400,
+                      index: NgramIndex | None = None) -> list[str]:
+  """
+  Fuzzy-rank PyPI names against query. With a trigram index only its best
+  few thousand candidates are scored; otherwise every name is.
+  """
+  if index is not None:
+    candidates = index.candidates(query, limit=max(3000, k * 10))
   scored = process.extract(query, candidates, scorer=fuzz.QRatio, limit=k)
   return [n for n, s, _ in scored if s >= 30]
 
+def _extract_meta(meta: dict) -> dict:
+  """
+  Keep only what the table needs from a /pypi/{name}/json document.
+  """
+  info = meta.get("info", {})
+  releases = meta.get("releases", {}) or {}
+  dates = []
+  for files in releases.values():
+    for f in files or []:
+      ts = f.get("upload_time_iso_8601")
+      if ts:
+        try:
+          dates.append(isoparse(ts))
+        except Exception:
+          pass
+  latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
+  return {"summary": (info.get("summary") or "")[:80],
+          "released": latest.isoformat()}
+
 def pypi_meta(name: str) -> PKG | None:
   """
   Summary + latest release timestamp. Downloads are filled later.
+  Served from the shared HTTP cache (ETag-revalidated after META_TTL).
   """
   try:
-    meta = get_json(JSON_URL.format(name=name), timeout=15, tries=2)
-    info = meta.get("info", {})
-    releases = meta.get("releases", {}) or {}
-    dates = []
-    for files in releases.values():
-      for f in files or []:
-        ts = f.get("upload_time_iso_8601")
-        if ts:
-          try:
-            dates.append(isoparse(ts))
-          except Exception:
-            pass
-    latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
+    meta = http_cache().get_json(JSON_URL.format(name=name), _extract_meta,
+                                 ttl=META_TTL, timeout=15, tries=2)
     return PKG(name=name,
-               summary=(info.get("summary") or "")[:80],
-               released=latest,
+               summary=meta["summary"],
+               released=isoparse(meta["released"]),
                downloads=0,
                conda="")
   except Exception:
-    return None)
+    return None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Top PyPI dump helpers
@@ -176,18 +206,29 @@ def _download_top_dump() -> dict:
       last_err = ex
   raise RuntimeError(f"Top-PyPI dump fetch failed: {last_err}")
 
-def load_top_dump() -> dict:
-  if TOP_CACHE.exists() and time.time() - TOP_CACHE.stat().st_mtime < TOP_STALE:
+def load_top_dump() -> CountTable:
+  """
+  Top-PyPI downloads as a memory-mapped {lower_name: downloads} table,
+  downloaded again when older than TOP_STALE. A stale table is used if the
+  dump cannot be fetched.
+  """
+  try:
+    age = time.time() - TOP_CACHE.stat().st_mtime
+  except FileNotFoundError:
+    age = None
+  if age is not None and age < TOP_STALE:
     try:
-      return json.loads(TOP_CACHE.read_text())
-    except Exception:
-      pass
-  data = _download_top_dump()
+      return CountTable(TOP_CACHE)
+    except (OSError, ValueError):
+      age = None
   try:
-    TOP_CACHE.write_text(json.dumps(data))
+    counts = top_dump_to_map(_download_top_dump())
   except Exception:
-    pass
-  return data
+    if age is None:
+      raise
+    return CountTable(TOP_CACHE)
+  write_count_table(TOP_CACHE, counts)
+  return CountTable(TOP_CACHE)
 
 def top_dump_to_map(doc: dict) -> dict[str, int]:
   """
@@ -217,8 +258,10 @@ def pypistats_downloads(names: list[str], recent_key: str,
   res: dict[str, int] = {}
   def task(n: str) -> tuple[str, int]:
     try:
-      data = get_json(PSTAT_URL.format(name=n), timeout=12, tries=2)
-      return (n, int(data.get("data", {}).get(recent_key, 0)))
+      data = http_cache().get_json(PSTAT_URL.format(name=n),
+                                   lambda d: d.get("data", {}),
+                                   ttl=PSTAT_TTL, timeout=12, tries=2)
+      return (n, int(data.get(recent_key, 0)))
     except Exception:
       return (n, 0)
   with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
@@ -231,36 +274,25 @@ def pypistats_downloads(names: list[str], recent_key: str,
 # ──────────────────────────────────────────────────────────────────────────────
 # conda-forge helpers
 # ──────────────────────────────────────────────────────────────────────────────
-def _download_conda_names() -> set[str]:
-  names: set[str] = set()
-  for sub in CONDA_SUBDIRS:
-    try:
-      data = get_json(CONDA_TMPL.format(subdir=sub), timeout=40, tries=2)
-      pkgs = data.get("packages", {})
-      names.update(meta["name"] for meta in pkgs.values())
-    except Exception:
-      continue
-  return names
+def load_conda_names() -> StringTable:
+  """conda-forge package names (memory-mapped, refreshed daily)."""
+  return load_conda_forge_names()
 
-def load_conda_names() -> set[str]:
-  if CONDA_CACHE.exists() and time.time() - CONDA_CACHE.stat().st_mtime < CONDA_STALE:
-    try:
-      return set(json.loads(CONDA_CACHE.read_text()))
-    except Exception:
-      pass
-  names = _download_conda_names()
-  try:
-    CONDA_CACHE.write_text(json.dumps(sorted(names)))
-  except Exception:
-    pass
-  return names
+def load_conda_index(conda_names: StringTable) -> NgramIndex | None:
+  """
+  Trigram index over conda-forge names, or None while it is (re)built in
+  the background.
+  """
+  return open_ngram_index("conda", conda_names)
 
-def map_to_conda(pip_name: str, conda_names: set[str]) -> str:
+def map_to_conda(pip_name: str, conda_names: StringTable,
+                 index: NgramIndex | None = None) -> str:
   canon = lambda s: s.lower().replace("_", "-")
   pip_c = canon(pip_name)
   if pip_c in conda_names:
     return pip_c
-  match = process.extractOne(pip_c, conda_names, scorer=fuzz.QRatio)
+  pool = index.candidates(pip_c, limit=200) if index is not None else conda_names
+  match = process.extractOne(pip_c, pool, scorer=fuzz.QRatio)
   return match[0] if match and match[1] >= 80 else ""
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -341,20 +373,25 @@ def main() -> None:
                   help="export results to PDF (requires reportlab)")
   ag.add_argument("--install", action="store_true",
                   help="prompt to install selected packages via pip")
+  ag.add_argument("--refresh-index", action="store_true",
+                  help="revalidate the cached PyPI name index now")
   args = ag.parse_args()
 
   recent_map = {"day": "last_day", "week": "last_week", "month": "last_month"}
   recent_key = recent_map[args.recent]
+  http_cache(pool_size=max(1, args.threads))  # one pooled session for all workers
 
   # Decide mode: query vs. Top list
   if args.query:
     with console.status("[green bold]Fetching PyPI index…"):
       try:
-        all_pkgs = fetch_pypi_index()
+        all_pkgs = fetch_pypi_index(refresh=args.refresh_index)
       except Exception as ex:
         console.print(f"[red]Index fetch failed:[/red] {ex}")
         sys.exit(2)
-      candidates = best_pypi_matches(args.query, all_pkgs, k=args.max_candidates)
+      ngrams = open_ngram_index("pypi", all_pkgs)
+      candidates = best_pypi_matches(args.query, all_pkgs, k=args.max_candidates,
+                                     index=ngrams)
       if not candidates:
         console.print("[red]No candidates from fuzzy search.[/red]")
         sys.exit(1)
@@ -368,13 +405,12 @@ def main() -> None:
   else:
     with console.status("[green bold]Loading Top PyPI dump…"):
       try:
-        doc = load_top_dump()
+        top_map = load_top_dump()
       except Exception as ex:
         console.print(f"[red]Top dump failed:[/red] {ex}")
         sys.exit(2)
-      top_map = top_dump_to_map(doc)
-      # Keep only top N*1.5 to allow for recency filters; clamp below for safety
-      names = list(top_map.keys())[: max(args.limit * 2, args.limit)]
+      # Keep only top N*2 to allow for recency filters; clamp below for safety
+      names = [n for n, _ in top_map.most_common(max(args.limit * 2, args.limit))]
     with console.status("[green bold]Fetching metadata for Top packages…"):
       from concurrent.futures import ThreadPoolExecutor
       with ThreadPoolExecutor(max_workers=max(1, args.threads)) as ex:
@@ -395,11 +431,10 @@ def main() -> None:
 
   # Attach downloads
   dl_source_used = "dump"
-  top_map: dict[str, int] = {}
+  top_map: CountTable | dict[str, int] = {}
   if args.downloads_source == "dump":
     try:
-      doc = load_top_dump()
-      top_map = top_dump_to_map(doc)
+      top_map = load_top_dump()
     except Exception:
       top_map = {}
     rows = [p._replace(downloads=top_map.get(p.name.lower(), 0)) for p in rows]
@@ -414,7 +449,9 @@ def main() -> None:
   if args.with_conda:
     with console.status("[green bold]Loading conda-forge names…"):
       conda_names = load_conda_names()
-    rows = [p._replace(conda=map_to_conda(p.name, conda_names)) for p in rows]
+      conda_index = load_conda_index(conda_names)
+    rows = [p._replace(conda=map_to_conda(p.name, conda_names, conda_index))
+            for p in rows]
 
   # Sort and trim
   if args.sort == "latest":
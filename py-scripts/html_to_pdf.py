@@ -4,27 +4,73 @@
 html_to_pdf_merge.py
 
 Usage:
-    python html_to_pdf_merge.py -i <input_directory> -o <output_file>
+    python html_to_pdf_merge.py -i <input_directory> -o <output_file> [-j N]
 
 Description:
     This script converts all HTML files in the specified input directory into individual PDF
-    files, each suffixed with an index (e.g., `page_1.pdf`, `page_2.pdf`, ...), and then
-    merges them into a single consolidated PDF.
+    files and merges them into a single consolidated PDF. Files are taken in natural order
+    (`page_2.html` before `page_10.html`).
+
+    Conversions run in a process pool (WeasyPrint is CPU-bound and single-threaded); the
+    results are merged in input order no matter which worker finishes first. Each PDF is
+    appended to the output as soon as it and everything before it are ready, and only one
+    input PDF is open at a time.
+
+    Converted PDFs are cached in ~/.cache/html_to_pdf, keyed by a SHA-256 of the HTML
+    content, its base URL and the WeasyPrint version, so unchanged pages are not converted
+    again. Changes to linked stylesheets or images are not part of the key; use --no-cache
+    after editing those.
 
 Requirements:
     - Python 3.7 or higher
     - WeasyPrint (for HTML to PDF conversion)
-    - PyPDF2 (for PDF merging)
+    - pypdf or PyPDF2 (for PDF merging)
 
 Install dependencies:
-    pip install weasyprint PyPDF2
+    pip install weasyprint pypdf
 
 """
 
-import os
 import argparse
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import weasyprint
 from weasyprint import HTML
-from PyPDF2 import PdfMerger
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    from PyPDF2 import PdfReader, PdfWriter
+
+CACHE_DIR = Path.home() / '.cache' / 'html_to_pdf'
+
+
+def natural_key(name: str) -> list:
+    """Sort key that orders embedded numbers numerically: page_2 < page_10."""
+    return [int(part) if part.isdigit() else part.casefold()
+            for part in re.split(r'(\d+)', name)]
+
+
+def cache_key(html_path: str) -> str:
+    """
+    Content hash for a converted page: the HTML bytes, its base URL (relative links
+    resolve against it) and the WeasyPrint version.
+    """
+    digest = hashlib.sha256()
+    with open(html_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(b'\0' + os.path.dirname(os.path.abspath(html_path)).encode())
+    digest.update(b'\0' + weasyprint.__version__.encode())
+    return digest.hexdigest()
+
 
 def convert_html_to_pdf(html_path: str, pdf_path: str) -> None:
     """
@@ -37,19 +83,70 @@ def convert_html_to_pdf(html_path: str, pdf_path: str) -> None:
     HTML(html_path).write_pdf(pdf_path)
 
 
-def merge_pdfs(pdf_paths: list, output_path: str) -> None:
+def convert_cached(job: Tuple[str, str]) -> Tuple[str, bool]:
+    """
+    Convert one HTML file unless its cached PDF already exists.
+
+    Args:
+        job: (html_path, cache_dir).
+
+    Returns:
+        (path of the cached PDF, True if it was reused).
+    """
+    html_path, cache_dir = job
+    pdf_path = os.path.join(cache_dir, cache_key(html_path) + '.pdf')
+    if os.path.exists(pdf_path):
+        return pdf_path, True
+
+    # Write to a temporary name first so an interrupted run never leaves a truncated
+    # PDF behind under a valid key.
+    fd, tmp_path = tempfile.mkstemp(suffix='.part', dir=cache_dir)
+    os.close(fd)
+    try:
+        convert_html_to_pdf(html_path, tmp_path)
+        os.replace(tmp_path, pdf_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return pdf_path, False
+
+
+def convert_all(html_paths: List[str], cache_dir: str, jobs: int) -> Iterator[Tuple[str, bool]]:
+    """
+    Yield convert_cached() results in input order while later files are still being
+    converted.
+    """
+    work = [(path, cache_dir) for path in html_paths]
+    if jobs <= 1 or len(work) <= 1:
+        yield from map(convert_cached, work)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        yield from pool.map(convert_cached, work)
+
+
+def merge_pdfs(pdf_paths: Iterable[str], output_path: str) -> int:
     """
-    Merge multiple PDF files into one.
+    Merge multiple PDF files into one, appending each as it arrives.
 
     Args:
-        pdf_paths: List of paths to PDF files to merge in order.
+        pdf_paths: Paths to PDF files to merge, in order (may be a generator).
         output_path: Path for the final merged PDF.
+
+    Returns:
+        Number of pages written.
     """
-    merger = PdfMerger()
+    writer = PdfWriter()
     for pdf in pdf_paths:
-        merger.append(pdf)
-    with open(output_path, 'wb') as f_out:
-        merger.write(f_out)
+        with open(pdf, 'rb') as f_in:
+            writer.append(PdfReader(f_in))
+    # Every WeasyPrint PDF embeds its own copy of the fonts; keep one.
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+    tmp_path = output_path + '.part'
+    with open(tmp_path, 'wb') as f_out:
+        writer.write(f_out)
+    os.replace(tmp_path, output_path)
+    return len(writer.pages)
 
 
 def main() -> None:
@@ -72,39 +169,60 @@ def main() -> None:
     parser.add_argument(
         '--keep-individual',
         action='store_true',
-        help='If set, individual PDFs will not be removed after merging.'
+        help='If set, individual PDFs (<name>_<index>.pdf) are also written to the input directory.'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of conversion processes (default: number of CPUs).'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Convert every file again instead of reusing PDFs from {CACHE_DIR}.'
     )
     args = parser.parse_args()
 
     # Gather and sort HTML files
     html_files = [f for f in os.listdir(args.input_dir) if f.lower().endswith('.html')]
-    html_files.sort()  # Ensure consistent order; adjust if natural sorting is needed
+    html_files.sort(key=natural_key)
 
     if not html_files:
         print(f"No HTML files found in {args.input_dir}.")
         return
 
-    pdf_paths = []
-    # Convert each HTML to a PDF with an index suffix
-    for idx, html_file in enumerate(html_files, start=1):
-        html_path = os.path.join(args.input_dir, html_file)
-        base_name = os.path.splitext(html_file)[0]
-        pdf_name = f"{base_name}_{idx}.pdf"
-        pdf_path = os.path.join(args.input_dir, pdf_name)
-        print(f"Converting {html_file} -> {pdf_name}...")
-        convert_html_to_pdf(html_path, pdf_path)
-        pdf_paths.append(pdf_path)
-
-    # Merge individual PDFs
-    print(f"Merging {len(pdf_paths)} PDF files into {args.output}...")
-    merge_pdfs(pdf_paths, args.output)
-    print("Merge complete.")
-
-    # Optionally clean up individual PDFs
-    if not args.keep_individual:
-        for pdf in pdf_paths:
-            os.remove(pdf)
-        print("Removed individual PDF files.")
+    html_paths = [os.path.join(args.input_dir, f) for f in html_files]
+
+    with tempfile.TemporaryDirectory(prefix='html_to_pdf-') as scratch:
+        if args.no_cache:
+            cache_dir = scratch
+        else:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_dir = str(CACHE_DIR)
+
+        reused = 0
+
+        def ready() -> Iterator[str]:
+            nonlocal reused
+            results = convert_all(html_paths, cache_dir, args.jobs)
+            for idx, (html_file, (pdf_path, cached)) in enumerate(zip(html_files, results), start=1):
+                reused += cached
+                state = 'cached' if cached else 'converted'
+                print(f"[{idx}/{len(html_files)}] {html_file} ({state})")
+                if args.keep_individual:
+                    base_name = os.path.splitext(html_file)[0]
+                    shutil.copyfile(pdf_path, os.path.join(args.input_dir, f"{base_name}_{idx}.pdf"))
+                yield pdf_path
+
+        print(f"Converting and merging {len(html_files)} HTML files into {args.output} "
+              f"({max(1, args.jobs)} jobs)...")
+        pages = merge_pdfs(ready(), args.output)
+
+    print(f"Merge complete: {pages} pages, {reused} of {len(html_files)} files from cache.")
+    if args.keep_individual:
+        print("Kept individual PDF files next to the HTML files.")
+
 
 if __name__ == '__main__':
     main()
@@ -10,7 +10,57 @@ This is educational code. It is not financial advice.
 Modes
 -----
 1) backtest: read candles from CSV (timestamp, open, high, low, close, volume).
-2) live:     poll Binance spot klines for closed candles.
+2) live:     trade closed Binance spot klines for one or more symbols
+             (--symbols BTCUSDT,ETHUSDT,...) as they appear.
+3) sweep:    backtest a grid of configs over one CSV.
+
+Live feeds
+----------
+Live mode runs on asyncio with one SymbolTrader (Kalman filter, R
+estimator, paper portfolio) per symbol. --feed poll fetches every symbol's
+latest closed kline concurrently over one pooled HTTP client (httpx if
+installed, else requests) and then sleeps until the next interval
+boundary. --feed ws subscribes to the combined websocket kline stream
+(needs `websockets`). --feed replay plays local candle CSVs instead, for
+testing without network access. Log rows are buffered and written every
+--flush-seconds; with several symbols each gets OUT_<SYMBOL>.csv.
+
+Backtest engines
+----------------
+--engine stream (the default) runs the one-candle-at-a-time path used by
+live mode. --engine batch (needs NumPy) computes log-returns and the
+trading decisions for the whole CSV as arrays, runs the scalar recursions
+(rolling moments, Kalman, portfolio) in loops and writes the log with one
+bulk write. Every value is produced by the same floating-point operations
+in the same order as the stream engine, so both engines write identical
+logs; the rolling moments still go through RollingMoments one push at a
+time, so batch is not faster than stream.
+
+Rolling R
+---------
+RollingMoments keeps the window mean and sum of squared deviations with
+Welford-style add/remove updates, so each new return costs O(1) whatever
+the window length.
+
+Candle cache
+------------
+The first backtest of a CSV stores its (timestamp_ms, close) columns in
+~/.cache/kalman_papertrader/ as a binary file (int64 + float64 columns).
+Later runs memory-map it instead of parsing the text; the cache is rebuilt
+whenever the CSV's size or mtime changes (--no-candle-cache skips it).
+
+Parameter sweep
+---------------
+--mode sweep parses the CSV once, places the closes in shared memory and
+backtests the cartesian product of --grid NAME=v1,v2,... options across a
+process pool (workers map the closes read-only; nothing is pickled per
+config). Configs sharing an R setting run in the same worker so the
+rolling variance is computed once. It prints one summary row per config
+(final equity, max drawdown, turnover, trades, fees) and can write them to
+--summary-csv instead of a full log per run.
+
+  ./kalman_papertrader.py --mode sweep --csv btc_1m.csv \
+      --grid q=1e-8,1e-7,1e-6 --grid R_window=100,200,400 --grid cost_bps=5,10
 
 Core model (local-level)
 ------------------------
@@ -47,19 +97,30 @@ Paper execution:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
+import hashlib
 import math
+import mmap
+import os
+import struct
 import sys
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
 
 try:
     import requests
 except ImportError:
     requests = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from collections import deque
 
 
@@ -114,26 +175,68 @@ class Kalman1D:
 
 
 # -----------------------------------------------------------------------------
-# Rolling variance estimator for R_t (optional, pragmatic)
+# Rolling moments estimator for R_t (optional, pragmatic)
 # -----------------------------------------------------------------------------
-class RollingVar:
-    """Rolling variance over last N samples (Welford over a window)."""
+class RollingMoments:
+    """
+    Mean and variance over the last N samples, updated in O(1) per push
+    (Welford's recurrence, with the matching removal step once the window
+    is full). Every RESYNC windows the moments are recomputed exactly from
+    the buffer, so rounding cannot accumulate (amortised O(1)).
+    """
+
+    RESYNC = 16
 
     def __init__(self, window: int, floor: float = 1e-10) -> None:
-        self.window = int(window)
+        self.window = max(1, int(window))
         self.floor = float(floor)
-        self._buf: Deque[float] = deque(maxlen=self.window)
+        self._buf: Deque[float] = deque()
+        self.mean = 0.0
+        self._m2 = 0.0   # sum of squared deviations from the mean
+        self._until_sync = self.window * self.RESYNC
+
+    def __len__(self) -> int:
+        return len(self._buf)
 
     def push(self, x: float) -> None:
-        self._buf.append(float(x))
+        x = float(x)
+        buf = self._buf
+        if len(buf) == self.window:
+            old = buf.popleft()
+            buf.append(x)
+            if self.window == 1:
+                self.mean, self._m2 = x, 0.0
+                return
+            self._until_sync -= 1
+            if self._until_sync <= 0:
+                self._resync()
+                return
+            # Replace `old` by `x` in one step: n is unchanged.
+            new_mean = self.mean + (x - old) / self.window
+            self._m2 += (x - old) * ((x - new_mean) + (old - self.mean))
+            self.mean = new_mean
+        else:
+            buf.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(buf)
+            self._m2 += delta * (x - self.mean)
+        if self._m2 < 0.0:   # rounding can push a ~0 sum slightly negative
+            self._m2 = 0.0
+
+    def _resync(self) -> None:
+        n = len(self._buf)
+        self.mean = math.fsum(self._buf) / n
+        self._m2 = math.fsum((xi - self.mean) * (xi - self.mean) for xi in self._buf)
+        self._until_sync = self.window * self.RESYNC
 
     def var(self) -> float:
         n = len(self._buf)
         if n < 2:
             return self.floor
-        mean = sum(self._buf) / n
-        v = sum((xi - mean) ** 2 for xi in self._buf) / (n - 1)
-        return max(v, self.floor)
+        return max(self._m2 / (n - 1), self.floor)
+
+    def std(self) -> float:
+        return math.sqrt(self.var())
 
 
 # -----------------------------------------------------------------------------
@@ -245,9 +348,92 @@ def read_csv_candles(path: str) -> Iterable[Tuple[int, float]]:
             yield ts_ms, close
 
 
+CANDLE_CACHE_DIR = Path.home() / ".cache" / "kalman_papertrader"
+CANDLE_MAGIC = b"KCANDLE\x01"
+# magic | rows | source mtime_ns | source size; then int64 ts[rows], float64 close[rows]
+_CANDLE_HEADER = struct.Struct("<8sQqQ")
+
+
+def candle_cache_path(csv_path: str) -> Path:
+    key = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:16]
+    return CANDLE_CACHE_DIR / f"{Path(csv_path).stem}-{key}.candles"
+
+
+def write_candle_cache(path: Path, src: os.stat_result,
+                       ts_ms: Sequence[int], closes: Sequence[float]) -> None:
+    """Store the two columns atomically; an unwritable cache is skipped."""
+    from array import array
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_CANDLE_HEADER.pack(CANDLE_MAGIC, len(closes),
+                                        src.st_mtime_ns, src.st_size))
+            col_ts, col_close = array("q", ts_ms), array("d", closes)
+            if sys.byteorder != "little":
+                col_ts.byteswap()
+                col_close.byteswap()
+            f.write(col_ts.tobytes())
+            f.write(col_close.tobytes())
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def open_candle_cache(path: Path, src: os.stat_result
+                      ) -> Optional[Tuple[Sequence[int], Sequence[float]]]:
+    """
+    Memory-mapped (timestamp_ms, close) columns, or None when the cache is
+    missing, of another format version or older than the CSV.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < _CANDLE_HEADER.size or sys.byteorder != "little":
+        mm.close()
+        return None
+    magic, n, mtime_ns, size = _CANDLE_HEADER.unpack_from(mm, 0)
+    start = _CANDLE_HEADER.size
+    if (magic != CANDLE_MAGIC or (mtime_ns, size) != (src.st_mtime_ns, src.st_size)
+            or len(mm) != start + 16 * n):
+        mm.close()
+        return None
+    view = memoryview(mm)
+    return view[start:start + 8 * n].cast("q"), view[start + 8 * n:].cast("d")
+
+
+def load_candles(path: str, use_cache: bool = True
+                 ) -> Tuple[Sequence[int], Sequence[float]]:
+    """
+    (timestamp_ms, close) columns of a candle CSV, served from the binary
+    cache when it is current. Both columns support len(), indexing,
+    slicing and the buffer protocol (np.asarray() does not copy them).
+    """
+    src = os.stat(path)
+    cache = candle_cache_path(path)
+    if use_cache:
+        hit = open_candle_cache(cache, src)
+        if hit is not None:
+            return hit
+    ts_ms: List[int] = []
+    closes: List[float] = []
+    for ts, close in read_csv_candles(path):
+        ts_ms.append(ts)
+        closes.append(close)
+    if use_cache:
+        write_candle_cache(cache, src, ts_ms, closes)
+    return ts_ms, closes
+
+
 # -----------------------------------------------------------------------------
 # Data: Binance klines polling (live)
 # -----------------------------------------------------------------------------
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_WS_URL = "wss://stream.binance.com:9443/stream?streams="
+INTERVAL_MS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
 def binance_get_latest_closed_kline(symbol: str, interval: str) -> Tuple[int, float]:
     """
     Poll Binance spot klines and return the most recent CLOSED candle:
@@ -260,13 +446,15 @@ def binance_get_latest_closed_kline(symbol: str, interval: str) -> Tuple[int, fl
     if requests is None:
         raise RuntimeError("requests not installed; cannot use --mode live.")
 
-    url = "https://api.binance.com/api/v3/klines"
     params = {"symbol": symbol.upper(), "interval": interval, "limit": 2}
 
-    r = requests.get(url, params=params, timeout=10)
+    r = requests.get(BINANCE_KLINES_URL, params=params, timeout=10)
     r.raise_for_status()
-    data = r.json()
+    return parse_closed_kline(r.json())
+
 
+def parse_closed_kline(data) -> Tuple[int, float]:
+    """(close_time_ms, close) of the last closed kline in a klines response."""
     # Each kline:
     # [ open_time, open, high, low, close, volume, close_time, ... ]
     if not isinstance(data, list) or len(data) < 2:
@@ -327,6 +515,66 @@ def decide_weight(m: float, V: float, p: float, cfg: TraderConfig) -> float:
 # -----------------------------------------------------------------------------
 # Main loops
 # -----------------------------------------------------------------------------
+class SymbolTrader:
+    """
+    Filter, R estimator and paper portfolio for one instrument. Feed it
+    closed candles in order; each one after the first yields a log row.
+    """
+
+    def __init__(self, cfg: TraderConfig, cash: float, commission: float) -> None:
+        self.cfg = cfg
+        self.kf = Kalman1D(m=0.0, P=1e-6, q=cfg.q)
+        self.rv = RollingMoments(cfg.R_window) if cfg.R_mode == "rolling" else None
+        self.port = Portfolio(cash=cash, units=0.0, commission=commission)
+        self.last_close: Optional[float] = None
+        self.cost = cfg.cost_bps / 10_000.0  # bps -> decimal return
+
+    def on_candle(self, ts_ms: int, close: float) -> Optional[list]:
+        """Process one closed candle; returns its LOG_HEADER row."""
+        port = self.port
+        if self.last_close is None:
+            self.last_close = close
+            port.mark_to_market(close)
+            return None
+
+        r = safe_log(close / self.last_close)
+        self.last_close = close
+
+        if self.rv is not None:
+            self.rv.push(r)
+            R = self.rv.var()
+        else:
+            R = self.cfg.R_fixed
+
+        m, P, K = self.kf.step(r=r, R=R)
+        pred_var = P + R
+
+        p_exc = prob_return_exceeds_cost(m=m, V=pred_var, cost=self.cost)
+        target_w = decide_weight(m=m, V=pred_var, p=p_exc, cfg=self.cfg)
+
+        trade = port.rebalance_to_weight(target_w=target_w, price=close)
+        eq = port.mark_to_market(close)
+
+        return [
+            ts_ms,
+            close,
+            r,
+            R,
+            m,
+            P,
+            K,
+            pred_var,
+            p_exc,
+            target_w,
+            trade["trade_notional"],
+            trade["commission_paid"],
+            trade["delta_units"],
+            port.cash,
+            port.units,
+            eq,
+        ]
+
+
 def run_on_stream(
     stream: Iterable[Tuple[int, float]],
     out_csv: str,
@@ -334,77 +582,305 @@ def run_on_stream(
     commission: float,
     cfg: TraderConfig,
 ) -> None:
-    kf = Kalman1D(m=0.0, P=1e-6, q=cfg.q)
-    rv = RollingVar(cfg.R_window) if cfg.R_mode == "rolling" else None
+    trader = SymbolTrader(cfg, cash=cash, commission=commission)
+
+    with open(out_csv, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(LOG_HEADER)
 
+        for ts_ms, close in stream:
+            row = trader.on_candle(ts_ms, close)
+            if row is not None:
+                w.writerow(row)
+
+
+LOG_HEADER = [
+    "timestamp_ms",
+    "close",
+    "logret",
+    "R",
+    "kalman_m",
+    "kalman_P",
+    "kalman_K",
+    "pred_var",
+    "p_exceed_cost",
+    "target_w",
+    "trade_notional",
+    "commission_paid",
+    "delta_units",
+    "cash",
+    "units",
+    "equity",
+]
+
+
+# -----------------------------------------------------------------------------
+# Batch backtest (NumPy)
+# -----------------------------------------------------------------------------
+def rolling_var_array(r, window: int, floor: float = 1e-10):
+    """
+    RollingMoments(window, floor).var() after each push of r[i], for all i.
+    """
+    rm = RollingMoments(window, floor)
+    push, var = rm.push, rm.var
+    out = np.empty(len(r))
+    for i, x in enumerate(r.tolist()):
+        push(x)
+        out[i] = var()
+    return out
+
+
+def log_returns_array(close):
+    """safe_log(close[i] / close[i - 1]) for i >= 1."""
+    ratio = close[1:] / close[:-1]
+    if not (ratio > 0.0).all():
+        bad = float(ratio[~(ratio > 0.0)][0])
+        raise ValueError(f"log input must be > 0, got {bad}")
+    # math.log rather than np.log: NumPy's SIMD log may differ in the last ulp.
+    return np.fromiter(map(math.log, ratio.tolist()), dtype=np.float64, count=len(ratio))
+
+
+def observation_var_array(r, cfg: TraderConfig):
+    """R for every step (rolling or fixed), as run_on_stream() uses it."""
+    if cfg.R_mode == "rolling":
+        return rolling_var_array(r, cfg.R_window)
+    return np.full(len(r), cfg.R_fixed)
+
+
+def kalman_arrays(r, R, q: float):
+    """(m, P, K) after every step. Scalar and sequential, but independent of trading."""
+    step = Kalman1D(m=0.0, P=1e-6, q=q).step
+    mPK = [step(ri, Ri) for ri, Ri in zip(r.tolist(), R.tolist())]
+    return tuple(np.array(col) for col in zip(*mPK))
+
+
+def decision_arrays(m, pred_var, cfg: TraderConfig):
+    """prob_return_exceeds_cost() and decide_weight(), element-wise."""
+    cost = cfg.cost_bps / 10_000.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (cost - m) / np.sqrt(pred_var)
+        erf = np.fromiter(map(math.erf, (z / math.sqrt(2.0)).tolist()),
+                          dtype=np.float64, count=len(z))
+        p_exc = np.where(pred_var <= 0.0, 0.0, 1.0 - 0.5 * (1.0 + erf))
+        w = m / (cfg.risk_aversion * pred_var)
+    w = np.where(w < cfg.w_max, w, cfg.w_max)
+    w = np.where(w > 0.0, w, 0.0)
+    target_w = np.where((p_exc <= 1.0 - cfg.alpha) | (pred_var <= 0.0), 0.0, w)
+    return p_exc, target_w
+
+
+def simulate_portfolio(close, target_w, cash: float, commission: float) -> List[Tuple[float, ...]]:
+    """
+    Rebalance at every close after the first. Returns per step:
+    (trade_notional, commission_paid, delta_units, cash, units, equity).
+    """
     port = Portfolio(cash=cash, units=0.0, commission=commission)
-    last_close: Optional[float] = None
+    port.mark_to_market(float(close[0]))
+    rebalance, mark = port.rebalance_to_weight, port.mark_to_market
+    rows: List[Tuple[float, ...]] = []
+    for tw, price in zip(target_w.tolist(), close[1:].tolist()):
+        t = rebalance(target_w=tw, price=price)
+        eq = mark(price)
+        rows.append((t["trade_notional"], t["commission_paid"], t["delta_units"],
+                     port.cash, port.units, eq))
+    return rows
+
+
+def run_backtest_batch(
+    ts_ms: List[int],
+    closes: List[float],
+    out_csv: str,
+    cash: float,
+    commission: float,
+    cfg: TraderConfig,
+) -> None:
+    """
+    Same result as run_on_stream() over the same candles, computed in bulk.
+    """
+    if np is None:
+        raise RuntimeError("numpy not installed; use --engine stream.")
+    if len(closes) < 2:
+        with open(out_csv, "w", newline="") as f:
+            csv.writer(f).writerow(LOG_HEADER)
+        return
 
-    cost = cfg.cost_bps / 10_000.0  # bps -> decimal return
+    close = np.asarray(closes, dtype=np.float64)
+    r = log_returns_array(close)
+    R = observation_var_array(r, cfg)
+    m, P, K = kalman_arrays(r, R, cfg.q)
+    pred_var = P + R
+    p_exc, target_w = decision_arrays(m, pred_var, cfg)
+    trades = simulate_portfolio(close, target_w, cash, commission)
 
     with open(out_csv, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow([
-            "timestamp_ms",
-            "close",
-            "logret",
-            "R",
-            "kalman_m",
-            "kalman_P",
-            "kalman_K",
-            "pred_var",
-            "p_exceed_cost",
-            "target_w",
-            "trade_notional",
-            "commission_paid",
-            "delta_units",
-            "cash",
-            "units",
-            "equity",
-        ])
+        out = csv.writer(f)
+        out.writerow(LOG_HEADER)
+        out.writerows(
+            (ts, c, *row, *trade)
+            for ts, c, row, trade in zip(
+                ts_ms[1:], closes[1:],
+                zip(r.tolist(), R.tolist(), m.tolist(), P.tolist(), K.tolist(),
+                    pred_var.tolist(), p_exc.tolist(), target_w.tolist()),
+                trades,
+            )
+        )
 
-        for ts_ms, close in stream:
-            if last_close is None:
-                last_close = close
-                port.mark_to_market(close)
-                continue
 
-            r = safe_log(close / last_close)
-            last_close = close
+# -----------------------------------------------------------------------------
+# Parameter sweep (process pool over shared memory)
+# -----------------------------------------------------------------------------
+SWEEP_FIELDS = ("q", "alpha", "risk_aversion", "w_max", "cost_bps", "R_fixed", "R_window")
+SUMMARY_CONFIG = ["q", "R_mode", "R_window", "R_fixed", "cost_bps", "alpha",
+                  "risk_aversion", "w_max"]
+SUMMARY_HEADER = SUMMARY_CONFIG + ["final_equity", "return_pct", "max_drawdown_pct",
+                                   "turnover", "trades", "fees"]
 
-            if rv is not None:
-                rv.push(r)
-                R = rv.var()
-            else:
-                R = cfg.R_fixed
-
-            m, P, K = kf.step(r=r, R=R)
-            pred_var = P + R
-
-            p_exc = prob_return_exceeds_cost(m=m, V=pred_var, cost=cost)
-            target_w = decide_weight(m=m, V=pred_var, p=p_exc, cfg=cfg)
-
-            trade = port.rebalance_to_weight(target_w=target_w, price=close)
-            eq = port.mark_to_market(close)
-
-            w.writerow([
-                ts_ms,
-                close,
-                r,
-                R,
-                m,
-                P,
-                K,
-                pred_var,
-                p_exc,
-                target_w,
-                trade["trade_notional"],
-                trade["commission_paid"],
-                trade["delta_units"],
-                port.cash,
-                port.units,
-                eq,
-            ])
+_sweep_shm = None     # worker-side SharedMemory handle (kept alive)
+_sweep_close = None   # read-only view of the shared closes
+
+
+def parse_grid(specs: List[str], base: TraderConfig) -> List[TraderConfig]:
+    """
+    Expand --grid NAME=v1,v2,... options into the cartesian product of
+    configs, starting from `base`.
+    """
+    import itertools
+    from dataclasses import replace
+
+    axes: List[Tuple[str, List]] = []
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        if not sep or name not in SWEEP_FIELDS:
+            raise ValueError(f"bad --grid {spec!r}; expected NAME=v1,v2 with NAME in "
+                             + ", ".join(SWEEP_FIELDS))
+        conv = int if name == "R_window" else float
+        axes.append((name, [conv(v) for v in values.split(",") if v.strip()]))
+    names = [name for name, _ in axes]
+    return [replace(base, **dict(zip(names, combo)))
+            for combo in itertools.product(*(vals for _, vals in axes))]
+
+
+def _sweep_attach(shm_name: str, n: int) -> None:
+    """Pool initializer: map the parent's closes without copying them."""
+    global _sweep_shm, _sweep_close
+    from multiprocessing import shared_memory
+    _sweep_shm = shared_memory.SharedMemory(name=shm_name)
+    _sweep_close = np.ndarray((n,), dtype=np.float64, buffer=_sweep_shm.buf)
+    _sweep_close.flags.writeable = False
+
+
+def summarize(rows: List[Tuple[float, ...]], cash: float) -> Dict[str, float]:
+    """Final equity, max drawdown, turnover (traded notional / initial cash)."""
+    if not rows:
+        return {"final_equity": cash, "return_pct": 0.0, "max_drawdown_pct": 0.0,
+                "turnover": 0.0, "trades": 0, "fees": 0.0}
+    notional, fees, _du, _cash, _units, equity = (np.array(col) for col in zip(*rows))
+    peak = np.maximum.accumulate(np.concatenate(([cash], equity)))[1:]
+    return {
+        "final_equity": float(equity[-1]),
+        "return_pct": 100.0 * (float(equity[-1]) / cash - 1.0),
+        "max_drawdown_pct": 100.0 * float(((peak - equity) / peak).max()),
+        "turnover": float(np.abs(notional).sum()) / cash,
+        "trades": int(np.count_nonzero(notional)),
+        "fees": float(fees.sum()),
+    }
+
+
+def _sweep_group(cfgs: List[TraderConfig], cash: float, commission: float) -> List[Dict]:
+    """
+    Run a chunk of configs sharing one R setting: R is computed once per
+    chunk, the Kalman pass once per q.
+    """
+    close = _sweep_close
+    r = log_returns_array(close)
+    R = observation_var_array(r, cfgs[0])
+    kalman: Dict[float, tuple] = {}
+    out = []
+    for cfg in cfgs:
+        if cfg.q not in kalman:
+            m, P, _K = kalman_arrays(r, R, cfg.q)
+            kalman[cfg.q] = (m, P + R)
+        m, pred_var = kalman[cfg.q]
+        _p, target_w = decision_arrays(m, pred_var, cfg)
+        rows = simulate_portfolio(close, target_w, cash, commission)
+        out.append({**{k: getattr(cfg, k) for k in SUMMARY_CONFIG},
+                    **summarize(rows, cash)})
+    return out
+
+
+def run_sweep(
+    closes: List[float],
+    cfgs: List[TraderConfig],
+    cash: float,
+    commission: float,
+    jobs: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Backtest every config over the same candles in a process pool. The
+    closes are parsed once and shared read-only with the workers. Configs
+    are grouped by R setting, sorted by q and cut into up to `jobs` chunks
+    per group, so a grid that never varies R still uses every worker while
+    each chunk computes R (and each Kalman pass) only once.
+    Returns one summary dict per config, best final equity first.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
+
+    if np is None:
+        raise RuntimeError("numpy not installed; --mode sweep needs it.")
+    if len(closes) < 2:
+        raise ValueError("need at least two candles to sweep")
+    groups: Dict[tuple, List[TraderConfig]] = {}
+    for cfg in cfgs:
+        key = (cfg.R_mode, cfg.R_window if cfg.R_mode == "rolling" else cfg.R_fixed)
+        groups.setdefault(key, []).append(cfg)
+    workers = jobs or os.cpu_count() or 1
+    chunks: List[List[TraderConfig]] = []
+    for group in groups.values():
+        group.sort(key=lambda cfg: cfg.q)   # equal q stays in one chunk where possible
+        size = -(-len(group) // min(workers, len(group)))
+        chunks.extend(group[i:i + size] for i in range(0, len(group), size))
+
+    src = np.asarray(closes, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=src.nbytes)
+    try:
+        np.ndarray(src.shape, dtype=np.float64, buffer=shm.buf)[:] = src
+        by_cfg: Dict[int, Dict] = {}
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_sweep_attach,
+                                 initargs=(shm.name, len(src))) as pool:
+            futs = {pool.submit(_sweep_group, c, cash, commission): c for c in chunks}
+            for fut in as_completed(futs):
+                for cfg, row in zip(futs[fut], fut.result()):
+                    by_cfg[id(cfg)] = row
+    finally:
+        shm.close()
+        shm.unlink()
+    # Grid order first, so equal equity ranks the same however chunks finish.
+    results = [by_cfg[id(cfg)] for cfg in cfgs]
+    results.sort(key=lambda row: row["final_equity"], reverse=True)
+    return results
+
+
+def print_summary(results: List[Dict], top: Optional[int] = None) -> None:
+    cols = ["#"] + SUMMARY_HEADER
+    rows = [[str(i)] + [_fmt_cell(res[c]) for c in SUMMARY_HEADER]
+            for i, res in enumerate(results[:top] if top else results, 1)]
+    widths = [max(len(c), *(len(r[k]) for r in rows)) if rows else len(c)
+              for k, c in enumerate(cols)]
+    print("  ".join(c.rjust(w) for c, w in zip(cols, widths)))
+    for r in rows:
+        print("  ".join(v.rjust(w) for v, w in zip(r, widths)))
+
+
+def _fmt_cell(v) -> str:
+    if isinstance(v, str):
+        return v
+    if isinstance(v, int):
+        return str(v)
+    if v != 0.0 and (abs(v) < 1e-3 or abs(v) >= 1e6):
+        return f"{v:.3g}"
+    return f"{v:.2f}" if abs(v) >= 1.0 else f"{v:.4f}"
 
 
 def live_stream_binance(symbol: str, interval: str, poll_s: float) -> Iterable[Tuple[int, float]]:
@@ -423,16 +899,235 @@ def live_stream_binance(symbol: str, interval: str, poll_s: float) -> Iterable[T
         time.sleep(poll_s)
 
 
+# -----------------------------------------------------------------------------
+# Async multi-symbol live mode
+# -----------------------------------------------------------------------------
+def interval_ms(interval: str) -> Optional[int]:
+    """Length of a Binance kline interval ('1m', '4h', '1d', ...); None for '1M'."""
+    unit = interval[-1:]
+    if unit not in INTERVAL_MS or not interval[:-1].isdigit():
+        return None
+    return int(interval[:-1]) * INTERVAL_MS[unit]
+
+
+class KlineClient:
+    """
+    One pooled HTTP client for all symbols: httpx.AsyncClient when httpx is
+    installed, otherwise a requests.Session driven from worker threads.
+    """
+
+    def __init__(self, max_connections: int = 8) -> None:
+        self.max_connections = max_connections
+        self._client = None
+        self._session = None
+
+    async def __aenter__(self) -> "KlineClient":
+        try:
+            import httpx
+        except ImportError:
+            httpx = None
+        if httpx is not None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections))
+        elif requests is not None:
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(pool_maxsize=self.max_connections))
+        else:
+            raise RuntimeError("httpx or requests is required for --feed poll.")
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._session is not None:
+            self._session.close()
+
+    async def latest_closed(self, symbol: str, interval: str) -> Tuple[int, float]:
+        params = {"symbol": symbol.upper(), "interval": interval, "limit": 2}
+        if self._client is not None:
+            r = await self._client.get(BINANCE_KLINES_URL, params=params)
+            r.raise_for_status()
+            return parse_closed_kline(r.json())
+
+        def fetch():
+            r = self._session.get(BINANCE_KLINES_URL, params=params, timeout=10)
+            r.raise_for_status()
+            return r.json()
+        return parse_closed_kline(await asyncio.to_thread(fetch))
+
+
+async def poll_feed(symbols: List[str], interval: str, poll_s: float,
+                    queue: "asyncio.Queue") -> None:
+    """
+    Put (symbol, close_time_ms, close) on the queue for every newly closed
+    candle. All symbols are fetched concurrently over one client; once each
+    has reported the latest closed candle the loop sleeps until the next
+    interval boundary instead of polling through it.
+    """
+    step = interval_ms(interval)
+    last: Dict[str, int] = {}
+    async with KlineClient(max_connections=min(16, len(symbols))) as client:
+        while True:
+            results = await asyncio.gather(
+                *(client.latest_closed(sym, interval) for sym in symbols),
+                return_exceptions=True)
+            for sym, res in zip(symbols, results):
+                if isinstance(res, BaseException):
+                    print(f"[live] {sym}: error: {res}", file=sys.stderr)
+                    continue
+                ts_ms, close = res
+                if ts_ms > last.get(sym, -1):
+                    last[sym] = ts_ms
+                    await queue.put((sym, ts_ms, close))
+
+            now_ms = time.time() * 1000.0
+            if step is None:
+                delay = poll_s
+            else:
+                boundary = (now_ms // step) * step      # open time of the forming candle
+                if all(last.get(sym, -1) >= boundary - 1 for sym in symbols):
+                    delay = (boundary + step - now_ms) / 1000.0 + 1.0
+                else:
+                    delay = poll_s                      # someone is still behind
+            await asyncio.sleep(max(0.5, delay))
+
+
+async def websocket_feed(symbols: List[str], interval: str,
+                         queue: "asyncio.Queue") -> None:
+    """Combined Binance kline stream for all symbols; reconnects with backoff."""
+    import json
+    try:
+        import websockets
+    except ImportError:
+        raise RuntimeError("websockets is required for --feed ws (pip install websockets).")
+
+    url = BINANCE_WS_URL + "/".join(f"{sym.lower()}@kline_{interval}" for sym in symbols)
+    backoff = 1.0
+    while True:
+        try:
+            async with websockets.connect(url, ping_interval=20) as ws:
+                backoff = 1.0
+                async for msg in ws:
+                    k = json.loads(msg).get("data", {}).get("k") or {}
+                    if k.get("x"):   # kline closed
+                        await queue.put((k["s"], int(k["T"]), float(k["c"])))
+        except (OSError, websockets.WebSocketException) as e:
+            print(f"[live] websocket: {e}; reconnecting in {backoff:.0f}s", file=sys.stderr)
+            await asyncio.sleep(backoff)
+            backoff = min(60.0, backoff * 2)
+
+
+async def replay_feed(sources: Dict[str, str], delay: float,
+                      queue: "asyncio.Queue") -> None:
+    """
+    Local stand-in for the live feeds: replay candle CSVs, one per symbol,
+    interleaved and `delay` seconds apart per symbol.
+    """
+    async def one(sym: str, path: str) -> None:
+        for ts_ms, close in zip(*load_candles(path)):
+            await queue.put((sym, ts_ms, close))
+            await asyncio.sleep(delay)
+
+    await asyncio.gather(*(one(sym, path) for sym, path in sources.items()))
+
+
+def symbol_log_path(out_csv: str, symbol: str, multi: bool) -> str:
+    """paper_log.csv -> paper_log_BTCUSDT.csv when several symbols are traded."""
+    if not multi:
+        return out_csv
+    root, ext = os.path.splitext(out_csv)
+    return f"{root}_{symbol.upper()}{ext or '.csv'}"
+
+
+async def run_live_async(
+    feed,
+    symbols: List[str],
+    out_csv: str,
+    cash: float,
+    commission: float,
+    cfg: TraderConfig,
+    flush_s: float = 5.0,
+) -> None:
+    """
+    Trade every symbol with its own SymbolTrader from one feed coroutine
+    (`feed(queue)`). Log rows are buffered and written per symbol file in
+    batches every `flush_s` seconds. Returns when the feed ends.
+    """
+    multi = len(symbols) > 1
+    traders = {sym.upper(): SymbolTrader(cfg, cash=cash, commission=commission)
+               for sym in symbols}
+    files = {sym: open(symbol_log_path(out_csv, sym, multi), "w", newline="")
+             for sym in traders}
+    writers = {sym: csv.writer(f) for sym, f in files.items()}
+    for w in writers.values():
+        w.writerow(LOG_HEADER)
+    pending: Dict[str, List[list]] = {sym: [] for sym in traders}
+
+    def flush() -> None:
+        for sym, rows in pending.items():
+            if rows:
+                writers[sym].writerows(rows)
+                files[sym].flush()
+                rows.clear()
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+    task = asyncio.create_task(feed(queue))
+    next_flush = time.monotonic() + flush_s
+    try:
+        while True:
+            timeout = max(0.0, next_flush - time.monotonic())
+            try:
+                sym, ts_ms, close = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                if task.done() and queue.empty():
+                    task.result()   # re-raise a feed failure
+                    break
+            else:
+                trader = traders.get(sym.upper())
+                if trader is not None:
+                    row = trader.on_candle(ts_ms, close)
+                    if row is not None:
+                        pending[sym.upper()].append(row)
+            if time.monotonic() >= next_flush:
+                flush()
+                next_flush = time.monotonic() + flush_s
+    finally:
+        task.cancel()
+        flush()
+        for f in files.values():
+            f.close()
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Kalman state-space paper trader (educational)."
     )
 
-    p.add_argument("--mode", choices=["backtest", "live"], required=True)
+    p.add_argument("--mode", choices=["backtest", "live", "sweep"], required=True)
 
     # Data selection
     p.add_argument("--csv", help="CSV file for --mode backtest.")
+    p.add_argument("--engine", choices=["auto", "batch", "stream"], default="auto",
+                   help="Backtest engine: NumPy batch or candle-by-candle stream "
+                        "(auto: stream).")
+    p.add_argument("--no-candle-cache", action="store_true",
+                   help="Parse the CSV even if a binary candle cache exists.")
     p.add_argument("--symbol", default="BTCUSDT", help="Binance symbol for live.")
+    p.add_argument("--symbols",
+                   help="Comma-separated symbols to trade at once in live mode "
+                        "(one log per symbol: OUT_<SYMBOL>.csv).")
+    p.add_argument("--feed", choices=["poll", "ws", "replay"], default="poll",
+                   help="Live data source: REST polling over one pooled client, "
+                        "the Binance websocket kline stream, or --replay CSVs.")
+    p.add_argument("--replay", action="append", default=[], metavar="SYMBOL=CSV",
+                   help="Candle CSV to replay for a symbol with --feed replay (repeatable).")
+    p.add_argument("--replay-delay", type=float, default=0.0,
+                   help="Seconds between replayed candles per symbol.")
+    p.add_argument("--flush-seconds", type=float, default=5.0,
+                   help="How often live log rows are written out.")
     p.add_argument("--interval", default="1h", help="Binance kline interval.")
     p.add_argument("--poll-seconds", type=float, default=10.0, help="Live poll period.")
 
@@ -460,6 +1155,16 @@ def parse_args() -> argparse.Namespace:
                    help="Rolling window for R if --R-mode rolling.")
 
     p.add_argument("--out", default="paper_log.csv", help="Output CSV path.")
+
+    # Sweep
+    p.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                   help="Sweep axis for --mode sweep (repeatable); NAME is one of "
+                        + ", ".join(SWEEP_FIELDS) + ".")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Worker processes for --mode sweep (default: CPU count).")
+    p.add_argument("--top", type=int, default=None,
+                   help="Print only the best N configs of a sweep.")
+    p.add_argument("--summary-csv", help="Write the sweep summary to this CSV.")
     return p.parse_args()
 
 
@@ -480,7 +1185,23 @@ def main() -> None:
     if args.mode == "backtest":
         if not args.csv:
             raise SystemExit("--csv is required for --mode backtest.")
-        stream = read_csv_candles(args.csv)
+        engine = args.engine
+        if engine == "auto":
+            engine = "stream"
+        if engine == "batch":
+            if np is None:
+                raise SystemExit("numpy is required for --engine batch (pip install numpy).")
+            ts_ms, closes = load_candles(args.csv, use_cache=not args.no_candle_cache)
+            run_backtest_batch(
+                ts_ms=ts_ms,
+                closes=closes,
+                out_csv=args.out,
+                cash=args.cash,
+                commission=args.commission,
+                cfg=cfg,
+            )
+            return
+        stream = zip(*load_candles(args.csv, use_cache=not args.no_candle_cache))
         run_on_stream(
             stream=stream,
             out_csv=args.out,
@@ -490,21 +1211,58 @@ def main() -> None:
         )
         return
 
+    if args.mode == "sweep":
+        if not args.csv:
+            raise SystemExit("--csv is required for --mode sweep.")
+        if np is None:
+            raise SystemExit("numpy is required for --mode sweep (pip install numpy).")
+        try:
+            cfgs = parse_grid(args.grid, cfg)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        _ts, closes = load_candles(args.csv, use_cache=not args.no_candle_cache)
+        results = run_sweep(closes, cfgs, cash=args.cash,
+                            commission=args.commission, jobs=args.jobs)
+        print_summary(results, top=args.top)
+        if args.summary_csv:
+            with open(args.summary_csv, "w", newline="") as f:
+                w = csv.DictWriter(f, fieldnames=SUMMARY_HEADER)
+                w.writeheader()
+                w.writerows(results)
+        return
+
     # live
-    if requests is None:
-        raise SystemExit("requests is required for --mode live (pip install requests).")
-    stream = live_stream_binance(
-        symbol=args.symbol,
-        interval=args.interval,
-        poll_s=args.poll_seconds,
-    )
-    run_on_stream(
-        stream=stream,
-        out_csv=args.out,
-        cash=args.cash,
-        commission=args.commission,
-        cfg=cfg,
-    )
+    if args.feed == "replay":
+        sources = {}
+        for spec in args.replay:
+            sym, sep, path = spec.partition("=")
+            if not sep or not path:
+                raise SystemExit(f"bad --replay {spec!r}; expected SYMBOL=CSV")
+            sources[sym.upper()] = path
+        if not sources:
+            raise SystemExit("--feed replay needs at least one --replay SYMBOL=CSV.")
+        symbols = list(sources)
+        feed = lambda q: replay_feed(sources, args.replay_delay, q)
+    else:
+        symbols = [s.strip().upper() for s in (args.symbols or args.symbol).split(",") if s.strip()]
+        if args.feed == "ws":
+            feed = lambda q: websocket_feed(symbols, args.interval, q)
+        else:
+            feed = lambda q: poll_feed(symbols, args.interval, args.poll_seconds, q)
+    try:
+        asyncio.run(run_live_async(
+            feed,
+            symbols=symbols,
+            out_csv=args.out,
+            cash=args.cash,
+            commission=args.commission,
+            cfg=cfg,
+            flush_s=args.flush_seconds,
+        ))
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
@@ -2,7 +2,8 @@
 """
 lsblk_textual_inspector.py
 
-Interactive block-device inspector for Linux using lsblk JSON plus Textual.
+Interactive block-device inspector for Linux using an lsblk-style device tree
+plus Textual.
 
 Design goals
 ------------
@@ -12,7 +13,11 @@ Design goals
 - Show filesystem usage only where it is logically available, i.e. for mounted
   filesystems. This is gathered from the mounted path, not inferred from the
   raw block device.
-- Avoid scraping lsblk's terminal text. The application reads structured JSON.
+- Avoid scraping lsblk's terminal text. The device tree comes from
+  blockdev_snapshot.py, which reads sysfs, the udev database and mountinfo
+  directly (one lsblk JSON call where /sys is unavailable) and caches the
+  result until a mount or block uevent changes it. Refreshes therefore cost
+  nothing while the storage layout is unchanged.
 
 Notes on usage figures
 ----------------------
@@ -22,7 +27,8 @@ Summing usage across multiple mountpoints can double-count the same filesystem
 
 Requirements
 ------------
-- Linux with lsblk on PATH
+- Linux (lsblk on PATH only needed without /sys)
+- blockdev_snapshot.py next to this script
 - Python 3.9+
 - textual
 
@@ -37,9 +43,6 @@ Examples
 from __future__ import annotations
 
 import argparse
-import json
-import shutil
-import subprocess
 import sys
 from dataclasses import dataclass
 from typing import Any, Iterable
@@ -49,17 +52,13 @@ from textual.containers import Horizontal, Vertical
 from textual.reactive import reactive
 from textual.widgets import DataTable, Footer, Header, Static, Tree
 
+from blockdev_snapshot import DeviceSnapshot, snapshot
+
 
 # ---------------------------------------------------------------------------
-# lsblk acquisition and normalization
+# Device acquisition and normalization
 # ---------------------------------------------------------------------------
 
-LSBLK_COLUMNS = (
-  "NAME,KNAME,PKNAME,PATH,SIZE,TYPE,FSTYPE,FSVER,LABEL,PARTLABEL,UUID,"
-  "PARTUUID,MOUNTPOINTS,FSAVAIL,FSUSE%,MODEL,SERIAL,TRAN,ROTA,RM,RO,"
-  "HOTPLUG"
-)
-
 
 @dataclass(slots=True)
 class DeviceRecord:
@@ -149,36 +148,9 @@ class MountUsage:
   note: str = ""
 
 
-def run_lsblk() -> list[DeviceRecord]:
-  """Return the current lsblk tree as normalized records."""
-  cmd = [
-    "lsblk",
-    "--json",
-    "--bytes",
-    "--output",
-    LSBLK_COLUMNS,
-  ]
-
-  result = subprocess.run(
-    cmd,
-    capture_output=True,
-    text=True,
-    check=False,
-  )
-
-  if result.returncode != 0:
-    stderr = result.stderr.strip() or "lsblk failed"
-    raise RuntimeError(stderr)
-
-  try:
-    payload = json.loads(result.stdout)
-  except json.JSONDecodeError as exc:
-    raise RuntimeError(f"Failed to parse lsblk JSON: {exc}") from exc
-
-  return [
-    DeviceRecord.from_mapping(item)
-    for item in payload.get("blockdevices", [])
-  ]
+def load_devices(snap: DeviceSnapshot) -> list[DeviceRecord]:
+  """Return the snapshot's lsblk-style tree as normalized records."""
+  return [DeviceRecord.from_mapping(item) for item in snap.devices]
 
 
 # ---------------------------------------------------------------------------
@@ -274,23 +246,18 @@ def collect_mountpoints(device: DeviceRecord) -> list[str]:
 
 
 
-def get_mount_usage(mountpoint: str) -> MountUsage | None:
+def get_mount_usage(snap: DeviceSnapshot, mountpoint: str) -> MountUsage | None:
   """Return mounted filesystem usage for a mountpoint, if accessible."""
-  try:
-    usage = shutil.disk_usage(mountpoint)
-  except OSError:
+  usage = snap.usage(mountpoint)
+  if usage is None:
     return None
 
-  used_pct = 0.0
-  if usage.total > 0:
-    used_pct = 100.0 * usage.used / usage.total
-
   return MountUsage(
     mountpoint=mountpoint,
     total=usage.total,
     used=usage.used,
     free=usage.free,
-    used_pct=used_pct,
+    used_pct=usage.used_pct,
   )
 
 
@@ -329,7 +296,7 @@ class LsblkInspector(App[None]):
   """Interactive lsblk browser for storage inspection workflows."""
 
   TITLE = "lsblk Inspector"
-  SUB_TITLE = "Textual UI backed by lsblk JSON"
+  SUB_TITLE = "Textual UI backed by a cached sysfs/udev snapshot"
 
   CSS = """
   Screen {
@@ -401,6 +368,7 @@ class LsblkInspector(App[None]):
     self.refresh_seconds = refresh_seconds
     self.mounted_only = mounted_only
     self.show_loops = show_loops
+    self._snapshot: DeviceSnapshot | None = None
     self._devices: list[DeviceRecord] = []
     self._visible_devices: list[DeviceRecord] = []
     self._selected: DeviceRecord | None = None
@@ -416,14 +384,14 @@ class LsblkInspector(App[None]):
           yield DataTable(id="details_table")
         with Vertical(id="usage_box"):
           yield DataTable(id="usage_table")
-    yield Static("Loading lsblk data...", id="status")
+    yield Static("Loading block devices...", id="status")
     yield Footer()
 
   def on_mount(self) -> None:
     self._configure_tables()
     self.refresh_data()
     if self.refresh_seconds > 0:
-      self.set_interval(self.refresh_seconds, self.refresh_data)
+      self.set_interval(self.refresh_seconds, self.poll_changes)
 
   def _configure_tables(self) -> None:
     details = self.query_one("#details_table", DataTable)
@@ -453,7 +421,7 @@ class LsblkInspector(App[None]):
     )
 
   def action_refresh(self) -> None:
-    self.refresh_data()
+    self.refresh_data(force=True)
 
   def action_toggle_mounted(self) -> None:
     self.mounted_only = not self.mounted_only
@@ -463,16 +431,31 @@ class LsblkInspector(App[None]):
     self.show_loops = not self.show_loops
     self.refresh_data()
 
-  def refresh_data(self) -> None:
+  def poll_changes(self) -> None:
+    """Interval tick: redraw only if the device snapshot was rebuilt."""
+    try:
+      changed = snapshot() is not self._snapshot
+    except Exception:  # noqa: BLE001
+      changed = True  # let refresh_data report the error
+    if changed:
+      self.refresh_data()
+    elif self._selected is not None:
+      self._update_usage(self._selected)
+
+  def refresh_data(self, force: bool = False) -> None:
     tree = self.query_one("#device_tree", Tree)
     summary = self.query_one("#summary", Static)
     status = self.query_one("#status", Static)
 
     try:
-      self._devices = run_lsblk()
+      snap = snapshot(force=force)
+      if snap is not self._snapshot:
+        self._devices = load_devices(snap)
+        self._snapshot = snap
     except Exception as exc:  # noqa: BLE001
-      status.update(f"lsblk error: {exc}")
-      summary.update("Failed to load lsblk data.")
+      self._snapshot = None
+      status.update(f"Device snapshot error: {exc}")
+      summary.update("Failed to load block device data.")
       self._selected = None
       self._reset_details_table()
       self._reset_usage_table()
@@ -539,7 +522,7 @@ class LsblkInspector(App[None]):
       self._update_details(self._selected)
       self._update_usage(self._selected)
       status.update(
-        "Loaded lsblk successfully. "
+        f"Loaded {snap.source} snapshot. "
         "Use arrows to navigate the tree, Enter to inspect a node."
       )
     else:
@@ -599,7 +582,7 @@ class LsblkInspector(App[None]):
 
     any_ok = False
     for mountpoint in mountpoints:
-      item = get_mount_usage(mountpoint)
+      item = get_mount_usage(self._snapshot, mountpoint)
       if item is None:
         usage.add_row(
           mountpoint,
@@ -649,7 +632,8 @@ def build_parser() -> argparse.ArgumentParser:
   parser = argparse.ArgumentParser(
     prog="lsblk_textual_inspector.py",
     description=(
-      "Interactive block-device inspector using lsblk JSON and Textual."
+      "Interactive block-device inspector using a sysfs/udev snapshot "
+      "(lsblk JSON fallback) and Textual."
     ),
     epilog=(
       "Examples:\n"
@@ -677,7 +661,8 @@ def build_parser() -> argparse.ArgumentParser:
     default=0.0,
     metavar="N",
     help=(
-      "Auto-refresh interval in seconds. Default: 0 (manual refresh only)."
+      "Interval in seconds for checking for device or mount changes. "
+      "Default: 0 (manual refresh only)."
     ),
   )
 
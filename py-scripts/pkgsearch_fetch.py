@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+pkgsearch_fetch.py – Shared asyncio HTTP client for the metadata fan-out of
+the package search scripts (python-pkg-search.py, search-py-pkgs.py,
+pypi.py, npm-search-pkg.py, search-cargo-pkg.py).
+
+Keep it next to the scripts; Python puts a script's own directory on
+sys.path, so `from pkgsearch_fetch import ...` just works.
+
+Transport
+---------
+With httpx installed every request goes through one pooled AsyncClient
+(HTTP/2 when the `h2` package is present, so hundreds of requests share a
+handful of connections). Without it, a pooled requests.Session is driven
+from a thread pool; the concurrency control below is the same either way.
+
+Adaptive concurrency
+--------------------
+Each host gets its own AIMD limiter, the scheme TCP uses for its
+congestion window: every successful response grows the window by
+1/window (about +1 per round trip), while a 429, a 503 or a timeout halves
+it. Rejections of requests sent before the last cut are not counted again,
+so one burst of 429s halves the window once. A quiet registry quickly runs
+at the ceiling; a rate-limited one settles just below its limit instead of
+failing the whole batch.
+
+Retries
+-------
+429 and 5xx responses and transport errors are retried up to `tries`
+times with full-jitter exponential backoff, never waiting less than a
+Retry-After header asks for.
+
+Streaming
+---------
+`run_streaming(items, worker, on_result)` runs `await worker(fetcher, item)`
+for every item and calls `on_result(item, result)` as each one finishes,
+which lets the callers add rows to a Rich Live table while the rest are
+still in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ModuleNotFoundError:
+    httpx = None
+
+HTTP2 = httpx is not None and importlib.util.find_spec("h2") is not None
+
+USER_AGENT = "pkgsearch/1.0"
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+# Responses that mean "slow down" rather than "something broke".
+THROTTLE_STATUS = frozenset({429, 503})
+BACKOFF_BASE = 0.5    # seconds; doubled per attempt
+BACKOFF_CAP = 30.0
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FetchError(Exception):
+    """A request failed for good (non-retryable status or retries exhausted)."""
+
+    def __init__(self, url: str, status: int | None, reason: str):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.status = status
+
+
+# ---------------------------------------------------------------------------#
+# AIMD limiter                                                               #
+# ---------------------------------------------------------------------------#
+class AIMDLimiter:
+    """
+    Concurrency limit for one host: additive increase on success,
+    multiplicative decrease on throttling.
+    """
+
+    def __init__(self, initial: int = 8, floor: int = 1, ceiling: int = 64,
+                 decrease: float = 0.5):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.limit = float(min(max(initial, self.floor), self.ceiling))
+        self.decrease = decrease
+        self.inflight = 0
+        self.epoch = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def window(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> int:
+        """Wait for a free slot; returns the epoch to hand back to release()."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.inflight < self.window)
+            self.inflight += 1
+            return self.epoch
+
+    async def release(self, epoch: int, throttled: bool = False) -> None:
+        async with self._cond:
+            self.inflight -= 1
+            if throttled:
+                # Requests sent before the last cut saw the old window;
+                # their rejections must not shrink the new one again.
+                if epoch == self.epoch:
+                    self.limit = max(self.floor, self.limit * self.decrease)
+                    self.epoch += 1
+            else:
+                self.limit = min(self.ceiling, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+def retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, hint: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server hint."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    return min(BACKOFF_CAP, max(delay, hint or 0.0))
+
+
+# ---------------------------------------------------------------------------#
+# Fetcher                                                                    #
+# ---------------------------------------------------------------------------#
+class AsyncFetcher:
+    """
+    Pooled async GET client with per-host AIMD limits and retries.
+
+    Use as `async with AsyncFetcher(...) as fx: data = await fx.get_json(url)`.
+    `concurrency` is the starting window per host, `ceiling` its upper bound.
+    """
+
+    def __init__(self, concurrency: int = 16, ceiling: int | None = None,
+                 headers: dict | None = None, timeout: float = 20.0,
+                 tries: int = 5):
+        self.concurrency = max(1, concurrency)
+        self.ceiling = ceiling or max(64, self.concurrency * 4)
+        self.headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+        self.headers.update(headers or {})
+        self.timeout = timeout
+        self.tries = max(1, tries)
+        self.limiters: dict[str, AIMDLimiter] = {}
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self._client = None
+        self._session = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        if httpx is not None:
+            limits = httpx.Limits(max_connections=self.ceiling,
+                                  max_keepalive_connections=self.ceiling)
+            self._client = httpx.AsyncClient(
+                http2=HTTP2, headers=self.headers, limits=limits,
+                timeout=self.timeout, follow_redirects=True)
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.ceiling)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._session.headers.update(self.headers)
+            self._pool = ThreadPoolExecutor(max_workers=self.ceiling)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._session is not None:
+            self._session.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def limiter(self, url: str) -> AIMDLimiter:
+        host = urlsplit(url).netloc
+        lim = self.limiters.get(host)
+        if lim is None:
+            lim = self.limiters[host] = AIMDLimiter(self.concurrency,
+                                                    ceiling=self.ceiling)
+        return lim
+
+    async def _send(self, url: str, params: dict | None,
+                    headers: dict | None) -> tuple[int, Any, bytes]:
+        """One GET → (status, headers, body); raises on transport errors."""
+        if self._client is not None:
+            r = await self._client.get(url, params=params, headers=headers)
+            return r.status_code, r.headers, r.content
+        loop = asyncio.get_running_loop()
+        r = await loop.run_in_executor(
+            self._pool,
+            lambda: self._session.get(url, params=params, headers=headers,
+                                      timeout=self.timeout))
+        return r.status_code, r.headers, r.content
+
+    def _is_timeout(self, exc: BaseException) -> bool:
+        if httpx is not None and isinstance(exc, httpx.TimeoutException):
+            return True
+        try:
+            import requests
+        except ModuleNotFoundError:
+            return False
+        return isinstance(exc, requests.Timeout)
+
+    def _is_transport_error(self, exc: BaseException) -> bool:
+        if httpx is not None and isinstance(exc, httpx.TransportError):
+            return True
+        try:
+            import requests
+        except ModuleNotFoundError:
+            return False
+        return isinstance(exc, requests.RequestException)
+
+    async def get(self, url: str, params: dict | None = None,
+                  headers: dict | None = None) -> bytes:
+        """GET url and return the body of a 2xx response."""
+        lim = self.limiter(url)
+        status: int | None = None
+        reason = "no attempt"
+        for attempt in range(self.tries):
+            epoch = await lim.acquire()
+            hint = None
+            try:
+                self.requests += 1
+                status, hdrs, body = await self._send(url, params, headers)
+            except Exception as exc:
+                if not self._is_transport_error(exc):
+                    await lim.release(epoch)
+                    raise
+                congested = self._is_timeout(exc)
+                await lim.release(epoch, throttled=congested)
+                status, reason = None, type(exc).__name__
+                self.throttled += congested
+            else:
+                throttled = status in THROTTLE_STATUS
+                await lim.release(epoch, throttled=throttled)
+                if 200 <= status < 300:
+                    return body
+                reason = f"HTTP {status}"
+                if status not in RETRY_STATUS:
+                    raise FetchError(url, status, reason)
+                self.throttled += throttled
+                hint = retry_after(hdrs.get("Retry-After"))
+            if attempt + 1 < self.tries:
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, hint))
+        raise FetchError(url, status, f"{reason} after {self.tries} tries")
+
+    async def get_json(self, url: str, params: dict | None = None,
+                       headers: dict | None = None) -> Any:
+        body = await self.get(url, params=params, headers=headers)
+        try:
+            return json.loads(body)
+        except ValueError as exc:
+            raise FetchError(url, 200, f"invalid JSON: {exc}") from None
+
+
+# ---------------------------------------------------------------------------#
+# Streaming driver                                                           #
+# ---------------------------------------------------------------------------#
+def run_streaming(items: Iterable[T],
+                  worker: Callable[[AsyncFetcher, T], Awaitable[R]],
+                  on_result: Callable[[T, R], None] | None = None,
+                  **fetcher_kw) -> list[R]:
+    """
+    Run `worker(fetcher, item)` for every item on one event loop and return
+    the results in input order. `on_result(item, result)` is called in
+    completion order as results arrive. A worker that raises yields None.
+    Keyword arguments are passed to AsyncFetcher.
+    """
+    items = list(items)
+
+    async def one(fx: AsyncFetcher, i: int, item: T):
+        try:
+            return i, await worker(fx, item)
+        except Exception:
+            return i, None
+
+    async def drive() -> list[R]:
+        results: list = [None] * len(items)
+        async with AsyncFetcher(**fetcher_kw) as fx:
+            tasks = [asyncio.ensure_future(one(fx, i, it))
+                     for i, it in enumerate(items)]
+            try:
+                for fut in asyncio.as_completed(tasks):
+                    i, res = await fut
+                    results[i] = res
+                    if on_result is not None:
+                        on_result(items[i], res)
+            finally:
+                for t in tasks:
+                    t.cancel()
+        return results
+
+    return asyncio.run(drive())
+
@@ -13,7 +13,15 @@ Usage examples
                      --csv neuro.csv  --pdf neuro.pdf
 """
 from __future__ import annotations
-import argparse, csv, html, os, re, sys, time, json, pathlib, concurrent.futures
+# Hand the run to a warm pkgsearch_daemon.py if one is listening (no-op otherwise).
+if __name__ == "__main__":
+    try:
+        from pkgsearch_daemon import delegate
+    except ImportError:
+        pass
+    else:
+        delegate(__file__)
+import argparse, csv, html, os, re, sys, time, json, pathlib
 from collections import namedtuple
 from datetime import datetime, timezone
 
@@ -21,8 +29,11 @@ import requests
 from dateutil.parser import isoparse
 from rapidfuzz import fuzz, process
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 
+from pkgsearch_fetch import run_streaming
+
 # --------------------------------------------------------------------- #
 # Optional ReportLab (only needed for --pdf)                            #
 # --------------------------------------------------------------------- #
@@ -64,18 +75,19 @@ def best_pypi_matches(query: str, candidates: list[str], k: int = 400) -> list[s
     scored = process.extract(query, candidates, scorer=fuzz.QRatio, limit=k)
     return [n for n, s, _ in scored if s >= 30]
 
-def pypi_meta(name: str) -> PKG | None:
+async def pypi_meta(fx, name: str) -> PKG | None:
+    """Summary, latest release and 30-day downloads (0 if stats stay throttled)."""
+    meta   = await fx.get_json(JSON_URL.format(name=name))
+    info   = meta["info"]
+    dates  = [isoparse(f["upload_time_iso_8601"])
+              for files in meta["releases"].values() for f in files]
+    latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
     try:
-        meta   = requests.get(JSON_URL.format(name=name), timeout=15).json()
-        info   = meta["info"]
-        dates  = [isoparse(f["upload_time_iso_8601"])
-                  for files in meta["releases"].values() for f in files]
-        latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
-        stats  = requests.get(STATS_URL.format(name=name), timeout=15).json()
-        dl30   = stats.get("data", {}).get("last_month", 0)
-        return PKG(name, info.get("summary", "")[:60], latest, dl30, "")
+        stats = await fx.get_json(STATS_URL.format(name=name))
+        dl30  = stats.get("data", {}).get("last_month", 0)
     except Exception:
-        return None
+        dl30  = 0
+    return PKG(name, (info.get("summary") or "")[:60], latest, dl30, "")
 
 # --------------------------------------------------------------------- #
 # conda-forge helpers                                                   #
@@ -158,6 +170,32 @@ def write_pdf(path: str, query: str, criterion: str, records: list[PKG]) -> None
         y -= lh
     cvs.save()
 
+# --------------------------------------------------------------------- #
+# Rich table                                                            #
+# --------------------------------------------------------------------- #
+def sort_rows(rows: list[PKG], criterion: str) -> list[PKG]:
+    key = (lambda p: p.released) if criterion == "latest" else (lambda p: p.downloads)
+    return sorted(rows, key=key, reverse=True)
+
+def render_table(rows: list[PKG], query: str, with_conda: bool,
+                 caption: str | None = None) -> Table:
+    tbl = Table(title=f"PyPI search: “{query}”", caption=caption)
+    tbl.add_column("#", justify="right")
+    tbl.add_column("Package")
+    if with_conda:
+        tbl.add_column("micromamba", style="cyan")
+    tbl.add_column("Released (UTC)", justify="center")
+    tbl.add_column("30-day DLs", justify="right")
+    tbl.add_column("Summary")
+
+    for r, p in enumerate(rows, 1):
+        cells = [str(r), f"[bold]{p.name}[/]"]
+        if with_conda:
+            cells.append(p.conda or "—")
+        cells.extend([p.released.strftime("%Y-%m-%d"), f"{p.downloads:,}", p.summary])
+        tbl.add_row(*cells)
+    return tbl
+
 # --------------------------------------------------------------------- #
 # Main                                                                  #
 # --------------------------------------------------------------------- #
@@ -167,7 +205,8 @@ def main() -> None:
     ag.add_argument("query")
     ag.add_argument("--sort", choices=("latest", "downloads"), default="latest")
     ag.add_argument("--limit", type=int, default=20)
-    ag.add_argument("--threads", type=int, default=16)
+    ag.add_argument("--threads", type=int, default=16,
+                    help="initial parallel requests per host (adapts to rate limits)")
     ag.add_argument("--with-conda", action="store_true",
                     help="map to conda-forge names for micromamba")
     ag.add_argument("--csv", metavar="FILE", help="export to CSV")
@@ -178,9 +217,18 @@ def main() -> None:
     all_pkgs = fetch_pypi_index()
     cand = best_pypi_matches(args.query, all_pkgs, k=600)
 
-    console.status("[green bold]Downloading per-package metadata…")
-    with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as ex:
-        rows = list(filter(None, ex.map(pypi_meta, cand)))
+    # metadata, streamed into a live top --limit table ----------------------
+    rows: list[PKG] = []
+    with Live(render_table([], args.query, False), console=console,
+              refresh_per_second=8, transient=True) as live:
+        def on_result(name: str, pkg: PKG | None) -> None:
+            if pkg is not None:
+                rows.append(pkg)
+            live.update(render_table(
+                sort_rows(rows, args.sort)[: args.limit], args.query, False,
+                caption=f"fetched {len(rows)} of {len(cand)} candidates…"))
+
+        run_streaming(cand, pypi_meta, on_result, concurrency=args.threads)
 
     # optional conda mapping ------------------------------------------------
     conda_names: set[str] = set()
@@ -192,31 +240,14 @@ def main() -> None:
                 conda=map_to_conda(rows[i].name, conda_names))
 
     # sort + trim -----------------------------------------------------------
-    rows.sort(key=(lambda p: p.released) if args.sort == "latest"
-              else (lambda p: p.downloads), reverse=True)
-    rows = rows[: args.limit]
+    rows = sort_rows(rows, args.sort)[: args.limit]
 
     if not rows:
         console.print("[red]No matches.[/red]")
         sys.exit(1)
 
     # Rich table ------------------------------------------------------------
-    tbl = Table(title=f"PyPI search: “{args.query}”")
-    tbl.add_column("#", justify="right")
-    tbl.add_column("Package")
-    if args.with_conda:
-        tbl.add_column("micromamba", style="cyan")
-    tbl.add_column("Released (UTC)", justify="center")
-    tbl.add_column("30-day DLs", justify="right")
-    tbl.add_column("Summary")
-
-    for r, p in enumerate(rows, 1):
-        cells = [str(r), f"[bold]{p.name}[/]"]
-        if args.with_conda:
-            cells.append(p.conda or "—")
-        cells.extend([p.released.strftime("%Y-%m-%d"), f"{p.downloads:,}", p.summary])
-        tbl.add_row(*cells)
-    console.print(tbl)
+    console.print(render_table(rows, args.query, args.with_conda))
 
     # Exports ---------------------------------------------------------------
     if args.csv:
@@ -36,6 +36,9 @@ search-cargo-pkg.py zed --features 'some,feat' --locked --install
 # Exact-name bias (rank exact match first) and fetch more candidates from crates.io
 search-cargo-pkg.py cargo --size 200 --exact
 
+# Verify four candidates at a time, ignoring cached results
+search-cargo-pkg.py lsp --verify --jobs 4 --no-cache
+
 Columns
 -------
 - Crate:     crate name
@@ -44,6 +47,16 @@ Columns
 - DL30:      recent (last 90d) download proxy from crates.io (approximate)
 - Summary:   description (truncated)
 
+Paging and caching
+------------------
+Result pages are fetched from --page on until --limit installable (and, with
+--verify, verified) crates are found, --max-pages is reached or the results
+run out. Version lookups run concurrently and are cached in
+~/.cache/search-cargo-pkg/crates.json by (crate, version), since a published
+version never changes. Search pages are cached for an hour, dry-run verdicts
+for a week (keyed by crate, version and the cargo flags), so rerunning a
+search costs almost nothing.
+
 Exit codes
 ----------
 0 success; 1 no matches; 2 usage / network errors during search; non-zero from installer is propagated on failure.
@@ -52,12 +65,22 @@ Requirements
 ------------
 - Python 3.8+
 - `requests`, `python-dateutil`, optional `rich` for pretty tables
+- pkgsearch_fetch.py (shared async fetcher) next to this script; `httpx` optional
 - `cargo` present in PATH for --verify / --install
 
 """
 
 from __future__ import annotations
 
+# Hand the run to a warm pkgsearch_daemon.py if one is listening (no-op otherwise).
+if __name__ == "__main__":
+    try:
+        from pkgsearch_daemon import delegate
+    except ImportError:
+        pass
+    else:
+        delegate(__file__)
+
 import argparse
 import csv
 import json
@@ -67,13 +90,16 @@ import shlex
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, Optional
+from pathlib import Path
+from typing import Callable, Iterable, Optional
 
 # Optional niceties
 try:
     from rich.console import Console
+    from rich.live import Live
     from rich.table import Table
     RICH = True
     console = Console()
@@ -96,10 +122,21 @@ except Exception:
         # Basic fallback for Z/UTC iso strings
         return datetime.fromisoformat(s.replace("Z", "+00:00"))
 
+from pkgsearch_fetch import run_streaming
+
 # ----------------------------- Constants ---------------------------------
 
 CRATES_API = "https://crates.io/api/v1"
 UA = {"Accept": "application/json", "User-Agent": "search-cargo-pkg/1.1"}
+# crates.io asks API clients to go easy; the fetcher still backs off on 429.
+CRATES_CONCURRENCY = 4
+CRATES_CEILING = 8
+
+CACHE_DIR = Path.home() / ".cache" / "search-cargo-pkg"
+CACHE_FILE = CACHE_DIR / "crates.json"
+CACHE_VERSION = 1
+SEARCH_TTL = 3600             # search pages: download counts drift
+VERIFY_TTL = 7 * 24 * 3600    # dry-runs depend on the local toolchain
 
 # ----------------------------- Model -------------------------------------
 
@@ -112,6 +149,76 @@ class CrateRow:
     downloads_recent: int
     description: str
 
+# ----------------------------- Cache -------------------------------------
+
+class CrateCache:
+    """
+    On-disk memo of crates.io lookups and cargo dry-runs:
+      bins    "crate@version"          -> has a bin target   (never expires)
+      verify  "crate@version flags"    -> [time, ok, why]    (VERIFY_TTL)
+      search  "query|per_page|page"    -> [time, raw page]   (SEARCH_TTL)
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.dirty = False
+        self.data: dict = {"bins": {}, "verify": {}, "search": {}}
+        if enabled:
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+                if loaded.get("version") == CACHE_VERSION:
+                    for k in self.data:
+                        self.data[k] = loaded.get(k) or {}
+            except (OSError, ValueError):
+                pass
+
+    def get_bin(self, name: str, version: str) -> Optional[bool]:
+        return self.data["bins"].get(f"{name}@{version}")
+
+    def put_bin(self, name: str, version: str, has_bin: bool) -> None:
+        self.data["bins"][f"{name}@{version}"] = has_bin
+        self.dirty = True
+
+    def _get_timed(self, section: str, key: str, ttl: float):
+        hit = self.data[section].get(key)
+        if hit is not None and time.time() - hit[0] < ttl:
+            return hit[1:]
+        return None
+
+    def get_verify(self, key: str) -> Optional[tuple[bool, str]]:
+        hit = self._get_timed("verify", key, VERIFY_TTL)
+        return (hit[0], hit[1]) if hit else None
+
+    def put_verify(self, key: str, ok: bool, why: str) -> None:
+        self.data["verify"][key] = [time.time(), ok, why]
+        self.dirty = True
+
+    def get_search(self, key: str) -> Optional[dict]:
+        hit = self._get_timed("search", key, SEARCH_TTL)
+        return hit[0] if hit else None
+
+    def put_search(self, key: str, page: dict) -> None:
+        self.data["search"][key] = [time.time(), page]
+        self.dirty = True
+
+    def save(self) -> None:
+        if not (self.enabled and self.dirty):
+            return
+        now = time.time()
+        for section, ttl in (("verify", VERIFY_TTL), ("search", SEARCH_TTL)):
+            self.data[section] = {k: v for k, v in self.data[section].items()
+                                  if now - v[0] < ttl}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": CACHE_VERSION, **self.data},
+                                      separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only home must not break the search
+        self.dirty = False
+
 # ----------------------------- Helpers -----------------------------------
 
 def http_get_json(url: str, params: Optional[dict]=None, timeout: int=25) -> dict:
@@ -119,13 +226,17 @@ def http_get_json(url: str, params: Optional[dict]=None, timeout: int=25) -> dic
     r.raise_for_status()
     return r.json()
 
-def crates_search(query: str, size: int, page: int) -> list[CrateRow]:
+def crates_page(query: str, size: int, page: int, cache: CrateCache) -> tuple[list[CrateRow], int]:
     """
-    Pull a page of search results; then for each crate resolve its latest version
-    and inspect targets to determine if any 'bin' target exists.
+    One page of search results (has_bin not yet resolved) and the total
+    number of matches crates.io reports.
     """
-    params = {"q": query, "per_page": size, "page": page}
-    data = http_get_json(f"{CRATES_API}/crates", params=params)
+    key = f"{query}|{size}|{page}"
+    data = cache.get_search(key)
+    if data is None:
+        params = {"q": query, "per_page": size, "page": page}
+        data = http_get_json(f"{CRATES_API}/crates", params=params)
+        cache.put_search(key, data)
 
     results: list[CrateRow] = []
     for c in data.get("crates", []):
@@ -135,30 +246,60 @@ def crates_search(query: str, size: int, page: int) -> list[CrateRow]:
         updated = isoparse(c.get("updated_at") or "1970-01-01T00:00:00Z").astimezone(timezone.utc)
         dl = int(c.get("recent_downloads") or 0)
         desc = (c.get("description") or "").strip()
-
-        has_bin = crate_version_has_bin(name, version)
-        results.append(CrateRow(name=name, version=version, has_bin=has_bin,
+        results.append(CrateRow(name=name, version=version, has_bin=False,
                                 updated=updated, downloads_recent=dl, description=desc))
-    return results
+    total = int((data.get("meta") or {}).get("total") or 0)
+    return results, total
 
-def crate_version_has_bin(name: str, version: str) -> bool:
+def resolve_bins(rows: list[CrateRow], cache: CrateCache,
+                 on_row: Optional[Callable[[CrateRow], None]] = None) -> None:
+    """
+    Fill in has_bin for every row. Cached (crate, version) verdicts resolve
+    at once; the rest are looked up concurrently. on_row(row) is called as
+    each row resolves.
+    """
+    todo: list[CrateRow] = []
+    for row in rows:
+        hit = cache.get_bin(row.name, row.version)
+        if hit is None:
+            todo.append(row)
+            continue
+        row.has_bin = hit
+        if on_row:
+            on_row(row)
+    if not todo:
+        return
+
+    async def resolve(fx, row: CrateRow) -> CrateRow:
+        has_bin = await crate_version_has_bin(fx, row.name, row.version)
+        if has_bin is not None:
+            cache.put_bin(row.name, row.version, has_bin)
+        row.has_bin = bool(has_bin)
+        return row
+
+    run_streaming(todo, resolve, (lambda row, _: on_row(row)) if on_row else None,
+                  concurrency=CRATES_CONCURRENCY, ceiling=CRATES_CEILING, headers=UA)
+
+async def crate_version_has_bin(fx, name: str, version: str) -> Optional[bool]:
     """
     Ask crates.io for a specific version details and check its targets.
     Endpoint: /crates/{crate}/{version}
+    Returns None if the lookup fails (the verdict is then not cached).
     """
     try:
-        data = http_get_json(f"{CRATES_API}/crates/{name}/{version}")
-        vers = data.get("version") or {}
-        targets = vers.get("targets") or []
-        for t in targets:
-            # target example: {"kind": ["bin"], "name": "mybin", ...}
-            kinds = t.get("kind") or []
-            if "bin" in kinds:
-                return True
-        return False
+        data = await fx.get_json(f"{CRATES_API}/crates/{name}/{version}")
     except Exception:
-        # If version lookup fails for transient reasons, be conservative (not installable)
-        return False
+        return None
+    vers = data.get("version") or {}
+    if vers.get("bin_names"):
+        return True
+    targets = vers.get("targets") or []
+    for t in targets:
+        # target example: {"kind": ["bin"], "name": "mybin", ...}
+        kinds = t.get("kind") or []
+        if "bin" in kinds:
+            return True
+    return False
 
 def sort_rows(rows: list[CrateRow], key: str, exact: Optional[str]) -> list[CrateRow]:
     if exact:
@@ -219,25 +360,86 @@ def cargo_verify(name: str, args) -> tuple[bool, str]:
     except FileNotFoundError:
         return False, "cargo not found"
 
+def verify_key(row: CrateRow, args) -> str:
+    """Cache key for a dry-run: the crate version plus every flag that shapes it."""
+    flags = [args.toolchain or "", args.features or "", "locked" if args.locked else "", args.version or ""]
+    return f"{row.name}@{row.version} " + "|".join(flags)
+
+def verify_rows(rows: list[CrateRow], args, cache: CrateCache) -> list[CrateRow]:
+    """
+    Run cargo_verify on the rows, at most --jobs cargo processes at a time,
+    reusing cached verdicts. Returns the rows that pass, in input order.
+    """
+    verdicts: dict[int, bool] = {}
+    todo: list[int] = []
+    for i, r in enumerate(rows):
+        hit = cache.get_verify(verify_key(r, args))
+        if hit is None:
+            todo.append(i)
+        else:
+            verdicts[i] = hit[0]
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
+            results = ex.map(lambda i: cargo_verify(rows[i].name, args), todo)
+            for i, (ok, why) in zip(todo, results):
+                verdicts[i] = ok
+                # Missing cargo or a timeout says nothing about the crate
+                if why not in ("timeout", "cargo not found"):
+                    cache.put_verify(verify_key(rows[i], args), ok, why)
+    return [r for i, r in enumerate(rows) if verdicts[i]]
+
+def collect_installable(args, cache: CrateCache,
+                        on_row: Optional[Callable[[CrateRow], None]] = None) -> list[CrateRow]:
+    """
+    Walk result pages from --page on until --limit installable (with --verify:
+    verified) crates are found, --max-pages pages were read or crates.io runs
+    out of matches. A failure on the first page propagates; on a later page
+    it ends the walk with what was found so far.
+    """
+    found: list[CrateRow] = []
+    seen = 0
+    for page in range(args.page, args.page + max(1, args.max_pages)):
+        try:
+            rows, total = crates_page(args.query, args.size, page, cache)
+        except Exception as e:
+            if page == args.page:
+                raise
+            console.print(f"[yellow]Stopped at page {page}:[/yellow] {e}")
+            break
+        if not rows:
+            break
+        resolve_bins(rows, cache, on_row)
+        picks = [r for r in rows if r.has_bin]
+        if args.verify and picks:
+            picks = verify_rows(picks, args, cache)
+        found.extend(picks)
+        seen += len(rows)
+        if len(found) >= args.limit or len(rows) < args.size or (total and seen >= total):
+            break
+    return found
+
+def build_table(rows: list[CrateRow], query: str, caption: Optional[str] = None) -> "Table":
+    tab = Table(title=f"crates.io installable: “{query}”", caption=caption)
+    tab.add_column("#", justify="right")
+    tab.add_column("Crate")
+    tab.add_column("Version", justify="center")
+    tab.add_column("Updated (UTC)", justify="center")
+    tab.add_column("DL30", justify="right")
+    tab.add_column("Summary")
+    for i, r in enumerate(rows, 1):
+        tab.add_row(
+            str(i),
+            f"[bold]{r.name}[/]",
+            r.version or "—",
+            r.updated.strftime("%Y-%m-%d"),
+            f"{r.downloads_recent:,}",
+            (r.description or "")[:90],
+        )
+    return tab
+
 def print_table(rows: list[CrateRow], query: str) -> None:
     if RICH:
-        tab = Table(title=f"crates.io installable: “{query}”")
-        tab.add_column("#", justify="right")
-        tab.add_column("Crate")
-        tab.add_column("Version", justify="center")
-        tab.add_column("Updated (UTC)", justify="center")
-        tab.add_column("DL30", justify="right")
-        tab.add_column("Summary")
-        for i, r in enumerate(rows, 1):
-            tab.add_row(
-                str(i),
-                f"[bold]{r.name}[/]",
-                r.version or "—",
-                r.updated.strftime("%Y-%m-%d"),
-                f"{r.downloads_recent:,}",
-                (r.description or "")[:90],
-            )
-        console.print(tab)
+        console.print(build_table(rows, query))
     else:
         print(f'crates.io installable: "{query}"')
         for i, r in enumerate(rows, 1):
@@ -271,8 +473,13 @@ Sorting:
   name       → alphabetical
 
 Verification:
-  --verify runs `cargo install --dry-run` for each candidate under your flags.
-  Use --toolchain nightly to scope nightly only here. Your global default is unchanged.
+  --verify runs `cargo install --dry-run` for each candidate under your flags,
+  --jobs at a time. Use --toolchain nightly to scope nightly only here. Your
+  global default is unchanged.
+
+Paging:
+  Pages of --size results are read from --page on until --limit installable
+  crates are found (at most --max-pages pages).
 
 Selections:
   Use --yes "1 2 5-7" for non-interactive install, or --install to be prompted.
@@ -284,14 +491,16 @@ Selections:
     )
     ag.add_argument("query", help="search term")
     ag.add_argument("--limit", type=int, default=20, help="maximum rows to display")
-    ag.add_argument("--size", type=int, default=100, help="crates.io results to fetch before filtering")
-    ag.add_argument("--page", type=int, default=1, help="page number (1-based)")
+    ag.add_argument("--size", type=int, default=100, help="crates.io results per page (max 100)")
+    ag.add_argument("--page", type=int, default=1, help="first page number to fetch (1-based)")
+    ag.add_argument("--max-pages", type=int, default=10, help="stop paging after this many pages even if --limit is not reached")
     ag.add_argument("--sort", choices=("latest", "downloads", "name"), default="latest", help="sorting criterion")
     ag.add_argument("--exact", action="store_true", help="rank exact name match first if present")
 
     # Probe / install tuning
     ag.add_argument("--verify", action="store_true", help="confirm candidates with `cargo install --dry-run`")
     ag.add_argument("--timeout", type=int, default=25, help="seconds per verify run")
+    ag.add_argument("--jobs", type=int, default=4, help="concurrent `cargo install --dry-run` processes for --verify")
     ag.add_argument("--toolchain", help="cargo toolchain to use for verify/install (e.g., nightly, stable, 1.81.0)")
     ag.add_argument("--features", help="feature list to enable for verify/install")
     ag.add_argument("--locked", action="store_true", help="pass --locked to cargo for reproducible resolution")
@@ -301,40 +510,46 @@ Selections:
     ag.add_argument("--csv", metavar="FILE", help="export table to CSV")
     ag.add_argument("--install", action="store_true", help="prompt to install selected crates")
     ag.add_argument("--yes", metavar="SEL", help='non-interactive selection like "1 2 5-7"')
+    ag.add_argument("--no-cache", action="store_true", help="ignore and do not update ~/.cache/search-cargo-pkg")
 
     args = ag.parse_args()
 
-    # Query crates.io
+    # Query crates.io page by page; installable rows stream into a live table
+    cache = CrateCache(enabled=not args.no_cache)
+    exact = args.query if args.exact else None
     try:
-        rows = crates_search(args.query, size=args.size, page=args.page)
+        if RICH:
+            shown: list[CrateRow] = []
+            with Live(build_table([], args.query), console=console,
+                      refresh_per_second=8, transient=True) as live:
+                def on_row(row: CrateRow) -> None:
+                    if row.has_bin:
+                        shown.append(row)
+                    note = ", verifying" if args.verify else ""
+                    live.update(build_table(
+                        sort_rows(list(shown), key=args.sort, exact=exact)[: args.limit],
+                        args.query, caption=f"{len(shown)} installable so far{note}…"))
+
+                rows = collect_installable(args, cache, on_row)
+        else:
+            rows = collect_installable(args, cache)
     except requests.HTTPError as e:
         console.print(f"[red]HTTP error from crates.io:[/red] {e}")
         sys.exit(2)
     except Exception as e:
         console.print(f"[red]Failed to query crates.io:[/red] {e}")
         sys.exit(2)
-
-    # Keep only those with bin targets
-    rows = [r for r in rows if r.has_bin]
+    finally:
+        cache.save()
 
     if not rows:
-        console.print("[yellow]No installable crates matched your query (based on metadata).[/yellow]")
+        if args.verify:
+            console.print("[yellow]No candidates passed verification in your local environment.[/yellow]")
+        else:
+            console.print("[yellow]No installable crates matched your query (based on metadata).[/yellow]")
         sys.exit(1)
 
-    # Optional verify step to weed out environment issues
-    if args.verify:
-        verified: list[CrateRow] = []
-        for r in rows:
-            ok, why = cargo_verify(r.name, args)
-            if ok:
-                verified.append(r)
-        rows = verified
-        if not rows:
-            console.print("[yellow]All candidates failed verification in your local environment.[/yellow]")
-            sys.exit(1)
-
     # Sort / trim
-    exact = args.query if args.exact else None
     rows = sort_rows(rows, key=args.sort, exact=exact)
     rows = rows[: args.limit]
 
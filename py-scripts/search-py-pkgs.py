@@ -29,8 +29,11 @@ import requests
 from dateutil.parser import isoparse
 from rapidfuzz import fuzz, process
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 
+from pkgsearch_fetch import run_streaming
+
 # --------------------------------------------------------------------- #
 # Constants & endpoints                                                 #
 # --------------------------------------------------------------------- #
@@ -91,18 +94,22 @@ def best_pypi_matches(query: str, candidates: list[str], k: int = 400) -> list[s
     return [n for n, s, _ in scored if s >= 30]
 
 
-def pypi_meta(name: str) -> PKG | None:
+async def pypi_meta(fx, name: str) -> PKG | None:
+    """
+    Fetch summary, latest release and 30-day downloads through the shared
+    async fetcher. A package whose stats stay unavailable keeps 0 downloads.
+    """
+    meta = await fx.get_json(JSON_URL.format(name=name))
+    info = meta["info"]
+    dates = [isoparse(f["upload_time_iso_8601"])
+             for files in meta["releases"].values() for f in files]
+    latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
     try:
-        meta = requests.get(JSON_URL.format(name=name), timeout=15).json()
-        info = meta["info"]
-        dates = [isoparse(f["upload_time_iso_8601"])
-                 for files in meta["releases"].values() for f in files]
-        latest = max(dates) if dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
-        stats = requests.get(STATS_URL.format(name=name), timeout=15).json()
+        stats = await fx.get_json(STATS_URL.format(name=name))
         dl30 = stats.get("data", {}).get("last_month", 0)
-        return PKG(name, info.get("summary", "")[:60], latest, dl30, "")
     except Exception:
-        return None
+        dl30 = 0
+    return PKG(name, (info.get("summary") or "")[:60], latest, dl30, "")
 
 # --------------------------------------------------------------------- #
 # conda-forge helpers                                                   #
@@ -189,6 +196,33 @@ def write_pdf(path: str, query: str, criterion: str, records: list[PKG]) -> None
         y -= lh
     cvs.save()
 
+# --------------------------------------------------------------------- #
+# Rich table                                                            #
+# --------------------------------------------------------------------- #
+def sort_rows(rows: list[PKG], criterion: str) -> list[PKG]:
+    key = (lambda p: p.released) if criterion == "latest" else (lambda p: p.downloads)
+    return sorted(rows, key=key, reverse=True)
+
+
+def render_table(rows: list[PKG], title: str, with_conda: bool,
+                 caption: str | None = None) -> Table:
+    table = Table(title=title, caption=caption)
+    table.add_column("#", justify="right")
+    table.add_column("Package")
+    if with_conda:
+        table.add_column("micromamba", style="cyan")
+    table.add_column("Released (UTC)", justify="center")
+    table.add_column("30-day DLs", justify="right")
+    table.add_column("Summary")
+
+    for idx, pkg in enumerate(rows, 1):
+        cells = [str(idx), f"[bold]{pkg.name}[/]"]
+        if with_conda:
+            cells.append(pkg.conda or "—")
+        cells.extend([pkg.released.strftime("%Y-%m-%d"), f"{pkg.downloads:,}", pkg.summary])
+        table.add_row(*cells)
+    return table
+
 # --------------------------------------------------------------------- #
 # Main                                                                  #
 # --------------------------------------------------------------------- #
@@ -201,7 +235,8 @@ def main() -> None:
     ag.add_argument("--limit", type=int, default=20,
                     help="maximum number of packages to display")
     ag.add_argument("--threads", type=int, default=16,
-                    help="number of parallel threads for metadata fetch")
+                    help="initial parallel requests per host for metadata fetch "
+                         "(adapts to rate limits)")
     ag.add_argument("--with-conda", action="store_true",
                     help="map to conda-forge names for micromamba")
     ag.add_argument("--csv", metavar="FILE",
@@ -216,10 +251,19 @@ def main() -> None:
     all_pkgs = fetch_pypi_index()
     candidates = best_pypi_matches(args.query, all_pkgs, k=600)
 
-    console.status("[green bold]Downloading per-package metadata…")
-    from concurrent.futures import ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=args.threads) as executor:
-        rows = list(filter(None, executor.map(pypi_meta, candidates)))
+    # Stream rows into a live table (current top --limit) as they arrive
+    title = f"PyPI search: “{args.query}”"
+    rows: list[PKG] = []
+    with Live(render_table([], title, False), console=console,
+              refresh_per_second=8, transient=True) as live:
+        def on_result(name: str, pkg: PKG | None) -> None:
+            if pkg is not None:
+                rows.append(pkg)
+            live.update(render_table(
+                sort_rows(rows, args.sort)[: args.limit], title, False,
+                caption=f"fetched {len(rows)} of {len(candidates)} candidates…"))
+
+        run_streaming(candidates, pypi_meta, on_result, concurrency=args.threads)
 
     # Optional conda mapping
     if args.with_conda:
@@ -228,31 +272,13 @@ def main() -> None:
         rows = [p._replace(conda=map_to_conda(p.name, conda_names)) for p in rows]
 
     # Sort and trim
-    rows.sort(key=(lambda p: p.released) if args.sort == "latest"
-              else (lambda p: p.downloads), reverse=True)
-    rows = rows[: args.limit]
+    rows = sort_rows(rows, args.sort)[: args.limit]
 
     if not rows:
         console.print("[red]No matches.[/red]")
         sys.exit(1)
 
-    # Display table
-    table = Table(title=f"PyPI search: “{args.query}”")
-    table.add_column("#", justify="right")
-    table.add_column("Package")
-    if args.with_conda:
-        table.add_column("micromamba", style="cyan")
-    table.add_column("Released (UTC)", justify="center")
-    table.add_column("30-day DLs", justify="right")
-    table.add_column("Summary")
-
-    for idx, pkg in enumerate(rows, 1):
-        cells = [str(idx), f"[bold]{pkg.name}[/]"]
-        if args.with_conda:
-            cells.append(pkg.conda or "—")
-        cells.extend([pkg.released.strftime("%Y-%m-%d"), f"{pkg.downloads:,}", pkg.summary])
-        table.add_row(*cells)
-    console.print(table)
+    console.print(render_table(rows, title, args.with_conda))
 
     # Export if requested
     if args.csv:
@@ -2,11 +2,19 @@
 import os
 import re
 import argparse
+import hashlib
+import math
+import mmap
+import random
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from ast import literal_eval, parse, Expression
 from rich.progress import Progress, BarColumn, TransferSpeedColumn, TimeElapsedColumn, TimeRemainingColumn, TextColumn
 from rich.console import Console
+from rich.table import Table
 
 console = Console()
 
@@ -41,6 +49,17 @@ def parse_size(value: str) -> int:
     return number
 
 
+def parse_fraction(value: str) -> float:
+    """Parse a probability/fraction strictly between 0 and 1."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid fraction '{value}'")
+    if not 0 < number < 1:
+        raise argparse.ArgumentTypeError("Fraction must be between 0 and 1 (exclusive)")
+    return number
+
+
 def get_size(path: str) -> int:
     try:
         import fcntl, struct
@@ -74,6 +93,355 @@ def wipe_one(path: str, source: str, bs: int, passes: int):
             break
 
 
+# ---------------------------------------------------------------------------
+# Native overwrite engine: one writer thread per target, aligned buffers,
+# O_DIRECT where the target accepts it, and an in-process keystream for
+# random passes instead of dd reading /dev/urandom.
+# ---------------------------------------------------------------------------
+ALIGN = 4096
+KEYSTREAM_BLOCK = 1024 * 1024
+
+
+class Keystream:
+    """
+    Deterministic, seekable random stream derived from a 256-bit key.
+
+    Uses AES-256-CTR from `cryptography` when installed (counter = offset/16),
+    otherwise SHAKE-256 over (key, block index) in 1 MiB blocks. Any byte
+    range can be regenerated from the key alone, which lets a later pass
+    re-check what was written.
+    """
+
+    def __init__(self, key: bytes):
+        self.key = key
+        try:
+            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        except ImportError:
+            self._cipher = None
+            self.backend = "shake256"
+        else:
+            self._cipher = (Cipher, algorithms.AES(key), modes.CTR)
+            self.backend = "aes-256-ctr"
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        if self._cipher is not None:
+            cipher, algo, ctr = self._cipher
+            block, skip = divmod(offset, 16)
+            nonce = (block % (1 << 128)).to_bytes(16, "big")
+            enc = cipher(algo, ctr(nonce)).encryptor()
+            return enc.update(bytes(skip + length))[skip:]
+        out = bytearray()
+        first = offset // KEYSTREAM_BLOCK
+        last = (offset + length - 1) // KEYSTREAM_BLOCK
+        for idx in range(first, last + 1):
+            out += hashlib.shake_256(self.key + idx.to_bytes(8, "big")).digest(KEYSTREAM_BLOCK)
+        start = offset - first * KEYSTREAM_BLOCK
+        return bytes(out[start:start + length])
+
+
+def open_for_wipe(path: str):
+    """Open path for writing, with O_DIRECT if supported. Returns (fd, direct)."""
+    direct = getattr(os, "O_DIRECT", 0)
+    if direct:
+        try:
+            return os.open(path, os.O_WRONLY | direct), True
+        except OSError:
+            pass
+    return os.open(path, os.O_WRONLY), False
+
+
+def _drop_direct(fd: int):
+    """Clear O_DIRECT so an unaligned tail can still be written."""
+    import fcntl
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+
+
+def native_pass(fd: int, direct: bool, size: int, bs: int, keystream, on_bytes):
+    """
+    Overwrite [0, size) of fd with zeros (keystream=None) or keystream data,
+    using one page-aligned buffer of bs bytes. Returns whether O_DIRECT was
+    still in effect at the end.
+    """
+    buf = mmap.mmap(-1, bs)
+    view = memoryview(buf)
+    try:
+        offset = 0
+        while offset < size:
+            n = min(bs, size - offset)
+            if direct and n % ALIGN:
+                _drop_direct(fd)
+                direct = False
+            if keystream is not None:
+                view[:n] = keystream.read_at(offset, n)
+            done = 0
+            while done < n:
+                written = os.pwrite(fd, view[done:n], offset + done)
+                if written <= 0:
+                    raise OSError(f"short write at offset {offset + done}")
+                done += written
+            offset += n
+            on_bytes(n)
+        os.fsync(fd)
+    finally:
+        view.release()
+        buf.close()
+    return direct
+
+
+def native_wipe_target(path: str, random_data: bool, bs: int, passes: int,
+                       progress, task, result: dict):
+    """
+    Run every pass on one target (meant to run in its own thread) and fill
+    `result` with bytes written, elapsed time, O_DIRECT use and any error.
+    The key of the last random pass is kept in result['key'].
+    """
+    name = os.path.basename(path)
+    size = get_size(path)
+    bs = max(ALIGN, (bs + ALIGN - 1) // ALIGN * ALIGN)
+    result.update(path=path, size=size, written=0, seconds=0.0, error=None, key=None)
+    start = time.monotonic()
+
+    def on_bytes(n):
+        result["written"] += n
+        progress.update(task, advance=n)
+
+    try:
+        fd, direct = open_for_wipe(path)
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+        return
+    result["direct"] = direct
+    try:
+        for p in range(1, passes + 1):
+            progress.update(task, description=f"{name} pass {p}/{passes}")
+            keystream = None
+            if random_data:
+                keystream = Keystream(os.urandom(32))
+                result["key"] = keystream.key
+            direct = native_pass(fd, direct, size, bs, keystream, on_bytes)
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        os.close(fd)
+        result["seconds"] = time.monotonic() - start
+
+
+def native_wipe(paths, random_data: bool, bs: int, passes: int):
+    """
+    Wipe all paths concurrently, one thread per target, with a progress
+    bar per device. Returns the per-target result dicts in input order.
+    """
+    results = [{} for _ in paths]
+    progress = Progress(
+        TextColumn("[bold blue]{task.description}"),
+        BarColumn(bar_width=None),
+        TransferSpeedColumn(),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    )
+    with progress:
+        threads = []
+        for path, result in zip(paths, results):
+            task = progress.add_task(os.path.basename(path), total=get_size(path) * passes)
+            t = threading.Thread(
+                target=native_wipe_target,
+                args=(path, random_data, bs, passes, progress, task, result),
+                name=f"wipe-{os.path.basename(path)}",
+            )
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+    return results
+
+
+def print_wipe_summary(results):
+    """Print per-target throughput and status."""
+    table = Table(title="Wipe summary")
+    table.add_column("Target")
+    table.add_column("Written", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("MiB/s", justify="right")
+    table.add_column("O_DIRECT")
+    table.add_column("Status")
+    for r in results:
+        secs = r["seconds"] or 1e-9
+        status = f"[red]{r['error']}[/]" if r["error"] else "[green]ok[/]"
+        table.add_row(
+            r["path"],
+            f"{r['written'] / 1024**3:.2f} GiB",
+            f"{r['seconds']:.1f}s",
+            f"{r['written'] / 1024**2 / secs:.0f}",
+            "yes" if r.get("direct") else "no",
+            status,
+        )
+    console.print(table)
+    for r in results:
+        if r["key"] is not None:
+            console.print(f"Last-pass key for {r['path']}: {r['key'].hex()}"
+                          " (for a later --verify-only -r --key)")
+
+
+# ---------------------------------------------------------------------------
+# Sampled verification: read back randomly chosen blocks in parallel and
+# compare them with the expected pattern (zeros, or the keystream of the
+# last random pass).
+# ---------------------------------------------------------------------------
+def samples_for_confidence(confidence: float, defect: float) -> int:
+    """
+    Number of uniformly sampled blocks needed so that, if at least a
+    `defect` fraction of blocks were not overwritten, at least one bad
+    block is sampled with probability `confidence`.
+    """
+    return math.ceil(math.log(1 - confidence) / math.log(1 - defect))
+
+
+def defect_bound(samples: int, confidence: float) -> float:
+    """Largest bad-block fraction still compatible with `samples` clean reads."""
+    if samples == 0:
+        return 1.0
+    return 1 - (1 - confidence) ** (1 / samples)
+
+
+def sample_offsets(size: int, bs: int, samples: int):
+    """Pick `samples` distinct block offsets in [0, size), sorted ascending."""
+    nblocks = (size + bs - 1) // bs
+    picks = random.SystemRandom().sample(range(nblocks), min(samples, nblocks))
+    return sorted(b * bs for b in picks)
+
+
+def verify_target(path: str, key, bs: int, samples: int, fraction, jobs: int,
+                  progress, task, result: dict):
+    """
+    Verify one target (meant to run in its own thread) by reading sampled
+    blocks with `jobs` parallel readers, O_DIRECT when possible so the
+    page cache cannot mask what is on the media. key=None means zeros.
+
+    Any exception ends up in result['error']; result['done'] is only set
+    once every sample was read.
+    """
+    result.update(path=path, samples=0, read=0, mismatches=[], seconds=0.0,
+                  error=None, done=False)
+    start = time.monotonic()
+    fd = fd_direct = None
+    try:
+        size = get_size(path)
+        bs = max(ALIGN, (bs + ALIGN - 1) // ALIGN * ALIGN)
+        if fraction is not None:
+            samples = math.ceil(fraction * ((size + bs - 1) // bs))
+        offsets = sample_offsets(size, bs, samples)
+        keystream = Keystream(key) if key else None
+        zeros = bytes(bs)
+        result["samples"] = len(offsets)
+        progress.update(task, total=sum(min(bs, size - off) for off in offsets))
+
+        direct = getattr(os, "O_DIRECT", 0)
+        if direct:
+            try:
+                fd_direct = os.open(path, os.O_RDONLY | direct)
+            except OSError:
+                fd_direct = None
+        fd = os.open(path, os.O_RDONLY)
+
+        def check(offset):
+            n = min(bs, size - offset)
+            if fd_direct is not None and n % ALIGN == 0:
+                buf = mmap.mmap(-1, bs)
+                try:
+                    got = os.preadv(fd_direct, [memoryview(buf)[:n]], offset)
+                    data = buf[:got]
+                finally:
+                    buf.close()
+            else:
+                data = os.pread(fd, n, offset)
+            expected = keystream.read_at(offset, n) if keystream else zeros[:n]
+            progress.update(task, advance=n)
+            return offset, len(data), data == expected
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for offset, nread, ok in pool.map(check, offsets):
+                result["read"] += nread
+                if not ok:
+                    result["mismatches"].append(offset)
+        result["done"] = True
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        for handle in (fd_direct, fd):
+            if handle is not None:
+                os.close(handle)
+        result["seconds"] = time.monotonic() - start
+
+
+def verify_failed(r: dict) -> bool:
+    """A target passes only if its verify thread finished without an error or mismatch."""
+    return not r.get("done") or bool(r.get("error")) or bool(r.get("mismatches"))
+
+
+def verify_targets(paths, keys, bs: int, samples: int, fraction, jobs: int):
+    """
+    Verify all paths concurrently; keys[i] is the keystream key of the last
+    pass on paths[i] (None for zeros). Returns per-target result dicts.
+    """
+    results = [{} for _ in paths]
+    progress = Progress(
+        TextColumn("[bold magenta]verify {task.description}"),
+        BarColumn(bar_width=None),
+        TransferSpeedColumn(),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    )
+    with progress:
+        threads = []
+        for path, key, result in zip(paths, keys, results):
+            task = progress.add_task(os.path.basename(path), total=None)
+            t = threading.Thread(
+                target=verify_target,
+                args=(path, key, bs, samples, fraction, jobs, progress, task, result),
+                name=f"verify-{os.path.basename(path)}",
+            )
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+    return results
+
+
+def print_verify_summary(results, confidence: float):
+    """Print per-target sample counts, mismatches and the implied defect bound."""
+    table = Table(title=f"Verification ({confidence:.1%} confidence)")
+    table.add_column("Target")
+    table.add_column("Samples", justify="right")
+    table.add_column("Read", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Bad-block bound", justify="right")
+    table.add_column("Status")
+    for r in results:
+        mismatches = r.get("mismatches") or []
+        if r.get("error"):
+            status = f"[red]{r['error']}[/]"
+        elif mismatches:
+            first = ", ".join(str(o) for o in mismatches[:3])
+            status = f"[red]{len(mismatches)} mismatched (at {first})[/]"
+        elif not r.get("done"):
+            status = "[red]verification did not finish[/]"
+        else:
+            status = "[green]ok[/]"
+        bound = "-" if verify_failed(r) else f"< {defect_bound(r['samples'], confidence):.4%}"
+        table.add_row(
+            r.get("path", "?"),
+            str(r.get("samples", 0)),
+            f"{r.get('read', 0) / 1024**2:.0f} MiB",
+            f"{r.get('seconds', 0.0):.1f}s",
+            bound,
+            status,
+        )
+    console.print(table)
+
+
 def main_wipe():
     parser = argparse.ArgumentParser(prog="secure_wipe.py", description="Rich secure-wipe utility")
     group = parser.add_mutually_exclusive_group()
@@ -83,18 +451,75 @@ def main_wipe():
                         help='Number of overwrite passes, arithmetic OK')
     parser.add_argument('-b','--bs', type=parse_size, default=parse_size('1M'),
                         help='Block size (arithmetic & suffix OK)')
+    parser.add_argument('-e','--engine', choices=['native', 'dd'], default='native',
+                        help='native: concurrent in-process writer (default); dd: one dd per pass')
+    parser.add_argument('--verify', action='store_true',
+                        help='After wiping, read back sampled blocks and check the pattern')
+    parser.add_argument('--verify-only', action='store_true',
+                        help='Skip wiping; only verify (random data needs --key)')
+    parser.add_argument('--key', help='Hex keystream key of the last random pass (for --verify-only)')
+    parser.add_argument('--verify-confidence', type=parse_fraction, default=0.99,
+                        help='Detection confidence used to size the sample (default 0.99)')
+    parser.add_argument('--verify-defect', type=parse_fraction, default=0.001,
+                        help='Smallest bad-block fraction to detect (default 0.001)')
+    parser.add_argument('--verify-fraction', type=parse_fraction, default=None,
+                        help='Read this fraction of all blocks instead (e.g. 0.05)')
+    parser.add_argument('--verify-bs', type=parse_size, default=parse_size('1M'),
+                        help='Verification read size (default 1M)')
+    parser.add_argument('--verify-jobs', type=int, default=4,
+                        help='Parallel readers per target (default 4)')
     parser.add_argument('targets', nargs='+', help='Devices or files to erase')
     args = parser.parse_args()
 
     if os.geteuid() != 0:
         console.print("[red]ERROR[/] Must run as root.")
         sys.exit(1)
-    source = '/dev/urandom' if args.random else '/dev/zero'
+    targets = []
     for tgt in args.targets:
         if not os.path.exists(tgt):
             console.print(f"[red]ERROR[/] {tgt} not found.")
             continue
-        wipe_one(tgt, source, args.bs, args.passes)
+        targets.append(tgt)
+
+    if args.random and args.verify and args.engine == 'dd':
+        console.print("[red]ERROR[/] Verifying random data needs the native engine.")
+        sys.exit(1)
+
+    if args.verify_only:
+        if args.random and not args.key:
+            console.print("[red]ERROR[/] --verify-only with --random needs --key.")
+            sys.exit(1)
+        key = None
+        if args.random:
+            try:
+                key = bytes.fromhex(args.key)
+            except ValueError:
+                console.print("[red]ERROR[/] --key must be a hex string.")
+                sys.exit(1)
+            if len(key) != 32:
+                console.print(f"[red]ERROR[/] --key must be 32 bytes (64 hex digits), got {len(key)}.")
+                sys.exit(1)
+        keys = [key] * len(targets)
+    elif args.engine == 'native':
+        results = native_wipe(targets, args.random, args.bs, args.passes)
+        print_wipe_summary(results)
+        if any(r["error"] for r in results):
+            sys.exit(1)
+        keys = [r["key"] for r in results]
+    else:
+        source = '/dev/urandom' if args.random else '/dev/zero'
+        for tgt in targets:
+            wipe_one(tgt, source, args.bs, args.passes)
+        keys = [None] * len(targets)
+
+    if args.verify or args.verify_only:
+        samples = samples_for_confidence(args.verify_confidence, args.verify_defect)
+        vresults = verify_targets(targets, keys, args.verify_bs, samples,
+                                  args.verify_fraction, args.verify_jobs)
+        print_verify_summary(vresults, args.verify_confidence)
+        if any(verify_failed(r) for r in vresults):
+            console.print("[red]ERROR[/] Verification failed.")
+            sys.exit(1)
     console.print("[green]Secure wipe completed.[/]")
 
 if __name__ == '__main__':
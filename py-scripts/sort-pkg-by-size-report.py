@@ -29,13 +29,13 @@ $ sort_pkg_by_size --csv --verbose
 
 import argparse
 import csv
-import re
-import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple
 
+from pacman_localdb import read_local_db
+
 # Rich is optional; we fall back to plain text if unavailable.
 try:
     from rich.console import Console
@@ -49,66 +49,24 @@ except Exception:  # pragma: no cover - optional dependency
 
 
 # ---------------------------------------------------------------------------#
-# 1. Sub-process helper                                                       #
+# 1. Package database                                                         #
 # ---------------------------------------------------------------------------#
-def get_pacman_info() -> str:
+def get_package_sizes() -> List[Tuple[str, float]]:
     """
-    Run ``pacman -Qi`` and capture its full stdout.
+    Return (name, size_kib) for every installed package, read directly from
+    pacman's local database (see pacman_localdb.py).
 
-    Exits the script with code 1 if pacman returns a non-zero status.
+    Exits the script with code 1 if the database cannot be read.
     """
     try:
-        proc = subprocess.run(
-            ["pacman", "-Qi"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
-        print(
-            f"Error: failed to execute 'pacman -Qi':\n{e.stderr}",
-            file=sys.stderr,
-        )
+        return [(pkg.name, pkg.size / 1024) for pkg in read_local_db()]
+    except OSError as e:
+        print(f"Error: cannot read the pacman database: {e}", file=sys.stderr)
         sys.exit(1)
-    return proc.stdout
 
 
 # ---------------------------------------------------------------------------#
-# 2. Parsing                                                                  #
-# ---------------------------------------------------------------------------#
-_SIZE_RE = re.compile(r"Installed Size\s*:\s*([\d\.,]+)\s*(KiB|MiB|GiB)")
-
-
-def parse_info_block(block: str) -> Tuple[str, float]:
-    """
-    Extract package *name* and *size* (in KiB) from one ``pacman -Qi`` block.
-    """
-    name = "<unknown>"
-    size_kib = 0.0
-
-    for line in block.splitlines():
-        if line.startswith("Name"):
-            parts = line.split(":", 1)
-            name = parts[1].strip() if len(parts) == 2 else name
-
-        elif line.startswith("Installed Size"):
-            m = _SIZE_RE.search(line)
-            if m:
-                num_str, unit = m.groups()
-                num = float(num_str.replace(",", "."))  # localised decimals
-                if unit == "KiB":
-                    size_kib = num
-                elif unit == "MiB":
-                    size_kib = num * 1024
-                elif unit == "GiB":
-                    size_kib = num * 1024 * 1024
-
-    return name, size_kib
-
-
-# ---------------------------------------------------------------------------#
-# 3. Formatting helper                                                       #
+# 2. Formatting helper                                                       #
 # ---------------------------------------------------------------------------#
 def human_readable(kib: float) -> str:
     """
@@ -139,16 +97,13 @@ def default_csv_path() -> Path:
 
 
 # ---------------------------------------------------------------------------#
-# 4. Main logic                                                              #
+# 3. Main logic                                                              #
 # ---------------------------------------------------------------------------#
 def build_table(limit: int | None = None) -> List[Tuple[str, float]]:
     """
     Collect and sort package data, returning a list of (name, size_kib).
     """
-    raw = get_pacman_info()
-    blocks = raw.strip().split("\n\n")
-
-    pkgs = [parse_info_block(b) for b in blocks if b.strip()]
+    pkgs = get_package_sizes()
     pkgs.sort(key=lambda x: x[1], reverse=True)  # largest first
 
     if limit is not None:
@@ -252,7 +207,7 @@ def main() -> None:
 
     print_table(
         table,
-        use_rich=not args.no - rich,
+        use_rich=not args.no_rich,
         verbose=args.verbose,
         csv_path=csv_path,
     )
@@ -12,79 +12,45 @@ Usage:
 
   # After listing, prompt to select and remove packages by index/range:
   ./sort_pkg_by_size_v3.py -n 10 --delete
+
+  # Rank packages by what removing them (with their orphaned deps) frees:
+  ./sort_pkg_by_size_v3.py --reclaim -n 20 --delete
+
+The "Frees" column is what `pacman -Rs <pkg>` would free: the package plus
+the dependencies nothing else needs, or "needed by N" when other packages
+depend on it. A selection is planned as a whole (dependency graph from the
+local database) and removed in a single `pacman -Rns` transaction; selected
+packages that something outside the selection still needs are left out and
+reported.
 """
 
 import argparse
-import re
 import subprocess
 import sys
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
 
 from rich.console import Console
 from rich.table import Table
 
-# ---------------------------------------------------------------------------#
-# 1. Constants and Regex                                                     #
-# ---------------------------------------------------------------------------#
-_SIZE_RE = re.compile(r"Installed Size\s*:\s*([\d\.,]+)\s*(KiB|MiB|GiB)")
+from pacman_localdb import DepGraph, RemovalPlan, read_local_db
 
 # ---------------------------------------------------------------------------#
-# 2. Pacman Data Gathering                                                   #
+# 1. Package Data (read straight from pacman's local database)               #
 # ---------------------------------------------------------------------------#
 
-def get_pacman_info() -> str:
+def load_graph() -> DepGraph:
     """
-    Run `pacman -Qi` and return its stdout. Exit on error.
+    Dependency graph over every installed package, read from
+    /var/lib/pacman/local via pacman_localdb. Exit on error.
     """
     try:
-        proc = subprocess.run(
-            ["pacman", "-Qi"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-        return proc.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error: failed to run `pacman -Qi`:\n{e.stderr}", file=sys.stderr)
+        return DepGraph(read_local_db())
+    except OSError as e:
+        print(f"Error: cannot read the pacman database: {e}", file=sys.stderr)
         sys.exit(1)
 
 # ---------------------------------------------------------------------------#
-# 3. Parsing Logic                                                           #
-# ---------------------------------------------------------------------------#
-
-def parse_info_block(block: str) -> Tuple[str, float]:
-    """
-    From one `pacman -Qi` block, extract:
-      – name (str)
-      – size in KiB (float)
-
-    Falls back to "<unknown>" or 0.0 if parsing fails.
-    """
-    name = "<unknown>"
-    size_kib = 0.0
-
-    for line in block.splitlines():
-        if line.startswith("Name"):
-            _, val = line.split(":", 1)
-            name = val.strip() or name
-
-        elif line.startswith("Installed Size"):
-            m = _SIZE_RE.search(line)
-            if m:
-                num_str, unit = m.groups()
-                num = float(num_str.replace(",", "."))
-                if unit == "KiB":
-                    size_kib = num
-                elif unit == "MiB":
-                    size_kib = num * 1024
-                elif unit == "GiB":
-                    size_kib = num * 1024 * 1024
-
-    return name, size_kib
-
-# ---------------------------------------------------------------------------#
-# 4. Human-readable Formatter                                                 #
+# 2. Human-readable Formatter                                                 #
 # ---------------------------------------------------------------------------#
 
 def human_readable(kib: float) -> str:
@@ -100,41 +66,80 @@ def human_readable(kib: float) -> str:
         return f"{(mib/1024):.2f} GiB"
 
 # ---------------------------------------------------------------------------#
-# 5. Build & Sort Package List                                               #
+# 3. Build & Sort Package List                                               #
 # ---------------------------------------------------------------------------#
 
-def build_package_list(limit: int = None) -> List[Tuple[str, float]]:
+def build_package_list(graph: DepGraph, limit: int = None) -> List[Tuple[str, float]]:
     """
     Return a list of (name, size_kib), sorted descending by size.
     If `limit` is given, truncate to the top-N packages.
     """
-    raw = get_pacman_info()
-    blocks = raw.strip().split("\n\n")
-    pkgs = [parse_info_block(b) for b in blocks]
+    pkgs = [(pkg.name, pkg.size / 1024) for pkg in graph.packages.values()]
     pkgs.sort(key=lambda x: x[1], reverse=True)
     return pkgs if limit is None else pkgs[:limit]
 
+
+def build_reclaim_list(graph: DepGraph, limit: int = None) -> List[Tuple[str, float]]:
+    """
+    Return (name, size_kib) for the packages nothing depends on, sorted by
+    what `pacman -Rs` on each would free.
+    """
+    return [(pkg.name, pkg.size / 1024) for pkg, _freed, _n in graph.reclaimable(limit)]
+
 # ---------------------------------------------------------------------------#
-# 6. Table Output                                                             #
+# 4. Table Output                                                             #
 # ---------------------------------------------------------------------------#
 
-def print_table(rows: List[Tuple[str, float]], console: Console) -> None:
+def print_table(rows: List[Tuple[str, float]], console: Console,
+                graph: Optional[DepGraph] = None) -> None:
     """
-    Render a Rich table of (index, package, size) to the given console.
+    Render a Rich table of (index, package, size) to the given console,
+    plus what `pacman -Rs` would free for each row when a graph is given.
     """
     table = Table(show_header=True, header_style="bold cyan")
     table.add_column("#", style="dim", justify="right")
     table.add_column("Package", style="dim", no_wrap=True)
     table.add_column("Installed Size", justify="right")
+    if graph is not None:
+        table.add_column("Frees (-Rs)", justify="right")
 
     for idx, (name, size_kib) in enumerate(rows, start=1):
         size_text = human_readable(size_kib) if size_kib > 0 else "N/A"
-        table.add_row(str(idx), name, size_text)
+        if graph is None:
+            table.add_row(str(idx), name, size_text)
+            continue
+        freed = graph.freed(name)
+        if freed is None:
+            freed_text = f"[dim]needed by {len(graph.required_by[name])}[/dim]"
+        else:
+            freed_text = human_readable(freed / 1024)
+        table.add_row(str(idx), name, size_text, freed_text)
 
     console.print(table)
 
+
+def print_plan(plan: RemovalPlan, console: Console) -> None:
+    """
+    Show what the removal transaction will do and what was left out.
+    """
+    for name, needed_by in plan.blocked.items():
+        shown = ", ".join(needed_by[:5]) + (" …" if len(needed_by) > 5 else "")
+        console.print(f"  [yellow]skipped[/yellow] {name} (needed by {shown})")
+    if not plan.targets:
+        return
+    console.print(
+        f"\nRemoving {len(plan.targets)} selected packages"
+        f" and {len(plan.removes) - len(plan.targets)} orphaned dependencies:",
+        style="bold red"
+    )
+    for name in plan.targets:
+        console.print(f"  • {name}")
+    for name in plan.removes[len(plan.targets):]:
+        console.print(f"  [dim]+ {name}[/dim]")
+    console.print(f"Space freed: {human_readable(plan.freed / 1024)}", style="bold")
+
 # ---------------------------------------------------------------------------#
-# 7. Parse User Selection                                                     #
+# 5. Parse User Selection                                                     #
 # ---------------------------------------------------------------------------#
 
 def parse_selection(selection: str, max_index: int) -> Set[int]:
@@ -162,7 +167,7 @@ def parse_selection(selection: str, max_index: int) -> Set[int]:
     return chosen
 
 # ---------------------------------------------------------------------------#
-# 8. Main Logic & Deletion                                                    #
+# 6. Main Logic & Deletion                                                    #
 # ---------------------------------------------------------------------------#
 
 def main() -> None:
@@ -177,15 +182,23 @@ def main() -> None:
         "-d", "--delete", action="store_true",
         help="after listing, prompt to select and delete packages by index"
     )
+    parser.add_argument(
+        "-r", "--reclaim", action="store_true",
+        help="rank removable packages by the space `pacman -Rs` would free"
+    )
     args = parser.parse_args()
 
     console = Console()
-    rows = build_package_list(limit=args.limit)
+    graph = load_graph()
+    if args.reclaim:
+        rows = build_reclaim_list(graph, limit=args.limit)
+    else:
+        rows = build_package_list(graph, limit=args.limit)
     if not rows:
         console.print("No packages found.", style="bold yellow")
         sys.exit(0)
 
-    print_table(rows, console)
+    print_table(rows, console, graph)
 
     if args.delete:
         max_idx = len(rows)
@@ -208,21 +221,21 @@ def main() -> None:
             console.print("No valid packages selected.", style="bold yellow")
             sys.exit(0)
 
-        console.print(
-            f"\nSelected {len(pkg_names)} packages for removal:", style="bold red"
-        )
-        for name in pkg_names:
-            console.print(f"  • {name}")
+        plan = graph.plan_removal(pkg_names)
+        print_plan(plan, console)
+        if not plan.targets:
+            console.print("Nothing can be removed.", style="bold yellow")
+            sys.exit(0)
 
         confirm = input("Proceed with removal? [y/N] ").strip().lower()
         if confirm not in ('y', 'yes'):
             console.print("Aborted. No packages were removed.", style="bold yellow")
             sys.exit(0)
 
-        # Execute removal
+        # Execute removal as one transaction
         try:
             subprocess.run(
-                ["sudo", "pacman", "-Rns", *pkg_names],
+                ["sudo", "pacman", "-Rns", *plan.targets],
                 check=True
             )
             console.print("\nPackages successfully removed.", style="bold green")
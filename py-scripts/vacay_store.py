@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+# ──────────────────────────────────────────────────────────────────────────────
+# vacay_store.py — SQLite flight store shared by the vacay scripts
+# ──────────────────────────────────────────────────────────────────────────────
+"""
+Flight store for vacation.py, vacation-plans.py, vacation-info.py and
+vacay-info.py.
+
+Keep it next to the scripts; Python puts a script's own directory on
+sys.path, so `from vacay_store import FlightStore` just works.
+
+Data file (default):
+  ~/.local/share/vacay/flights.sqlite3
+
+Records go in and come out as plain dicts shaped like
+`dataclasses.asdict(FlightOption)`:
+
+  {"id", "label", "price", "currency", "is_return", "provider", "notes",
+   "out": {"depart_iso", "arrive_iso", "stops", ["depart_tz", "arrive_tz"]},
+   "back": {...} or None}
+
+Besides the raw fields every row carries a few derived columns (UTC
+departure, outbound and total travel time in seconds, most stops on any
+leg, first and last local calendar day touched). They are indexed, so
+`query()` filters and sorts in SQLite instead of loading the whole file.
+Legs without time zones are treated as naive local times, as vacay-info.py
+does.
+
+Every insert is its own transaction (WAL journal), so a crash never leaves
+a half-written database and ids stay unique when two scripts add at once.
+
+An existing flights.json next to the database is imported once, keeping
+its ids.
+
+Fare files
+----------
+`iter_fare_file()` streams CSV, JSON Lines or JSON fare dumps as flat
+field dicts named like the `add` options (label, price, currency,
+out_depart, out_arrive, out_stops, out_depart_tz, ..., return_depart,
+return_arrive, return_stops, ..., provider, notes). JSON records may also
+use the stored nested shape above. `add_many()` inserts a whole import in
+one transaction.
+
+Pareto front
+------------
+`best()` returns the trips no other trip beats on both price and total
+travel time: one sort by (price, time) and a single sweep keeping each
+trip faster than everything cheaper. Round trips include return tickets
+and pairs of one-way tickets (an outbound from the home time zone and a
+later return); outbounds are added to a running front in arrival order,
+so each return is only paired with outbounds that are Pareto-optimal among
+those it can follow.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+DATA_FILE = Path.home() / ".local" / "share" / "vacay" / "flights.sqlite3"
+
+SCHEMA_VERSION = 2  # 2: flights_pareto index
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id             INTEGER PRIMARY KEY,
+    label          TEXT    NOT NULL,
+    price          REAL    NOT NULL,
+    currency       TEXT    NOT NULL,
+    is_return      INTEGER NOT NULL,
+    provider       TEXT    NOT NULL DEFAULT '',
+    notes          TEXT    NOT NULL DEFAULT '',
+    out_depart     TEXT    NOT NULL,
+    out_arrive     TEXT    NOT NULL,
+    out_stops      INTEGER NOT NULL,
+    out_depart_tz  TEXT,
+    out_arrive_tz  TEXT,
+    back_depart    TEXT,
+    back_arrive    TEXT,
+    back_stops     INTEGER,
+    back_depart_tz TEXT,
+    back_arrive_tz TEXT,
+    -- derived, for indexed filtering and sorting
+    depart_ts      INTEGER NOT NULL,  -- outbound departure, UTC epoch seconds
+    out_seconds    INTEGER NOT NULL,
+    total_seconds  INTEGER NOT NULL,
+    max_stops      INTEGER NOT NULL,
+    first_day      TEXT    NOT NULL,  -- earliest local date of any leg end
+    last_day       TEXT    NOT NULL   -- latest local date of any leg end
+);
+CREATE INDEX IF NOT EXISTS flights_price   ON flights (price, id);
+CREATE INDEX IF NOT EXISTS flights_depart  ON flights (depart_ts, id);
+CREATE INDEX IF NOT EXISTS flights_out_dur ON flights (out_seconds, id);
+CREATE INDEX IF NOT EXISTS flights_total   ON flights (total_seconds, id);
+CREATE INDEX IF NOT EXISTS flights_window  ON flights (first_day, last_day);
+CREATE INDEX IF NOT EXISTS flights_pareto  ON flights (currency, price, total_seconds);
+"""
+
+# `list --sort` choices → indexed column
+SORT_COLUMNS = {
+    "price": "price",
+    "out-duration": "out_seconds",
+    "total-duration": "total_seconds",
+    "out-depart": "depart_ts",
+}
+
+# Flat field names used by fare files (same as the `add` option names)
+FARE_FIELDS = (
+    "label", "price", "currency", "provider", "notes",
+    "out_depart", "out_arrive", "out_stops", "out_depart_tz", "out_arrive_tz",
+    "return_depart", "return_arrive", "return_stops", "return_depart_tz",
+    "return_arrive_tz",
+)
+
+LEG_FIELDS = ("depart", "arrive", "stops", "depart_tz", "arrive_tz")
+COLUMNS = (
+    "id", "label", "price", "currency", "is_return", "provider", "notes",
+    *(f"out_{f}" for f in LEG_FIELDS),
+    *(f"back_{f}" for f in LEG_FIELDS),
+    "depart_ts", "out_seconds", "total_seconds", "max_stops",
+    "first_day", "last_day",
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Record <-> row
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _leg_dt(iso: str, tz: Optional[str]) -> datetime:
+    naive = datetime.fromisoformat(iso)
+    return naive.replace(tzinfo=ZoneInfo(tz)) if tz else naive
+
+
+def _epoch(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _leg_times(leg: Dict) -> Tuple[datetime, datetime]:
+    return (
+        _leg_dt(leg["depart_iso"], leg.get("depart_tz")),
+        _leg_dt(leg["arrive_iso"], leg.get("arrive_tz")),
+    )
+
+
+def record_to_row(record: Dict) -> Tuple:
+    """Flatten a FlightOption dict into a `flights` row (id may be None)."""
+    out = record["out"]
+    back = record.get("back")
+    legs = [out] + ([back] if back else [])
+
+    times = [_leg_times(leg) for leg in legs]
+    out_seconds = int((times[0][1] - times[0][0]).total_seconds())
+    total_seconds = sum(int((arr - dep).total_seconds()) for dep, arr in times)
+    days = [dt.date() for pair in times for dt in pair]
+
+    def leg_cols(leg: Optional[Dict]) -> Tuple:
+        if not leg:
+            return (None,) * len(LEG_FIELDS)
+        return (
+            leg["depart_iso"],
+            leg["arrive_iso"],
+            int(leg["stops"]),
+            leg.get("depart_tz"),
+            leg.get("arrive_tz"),
+        )
+
+    return (
+        record.get("id"),
+        record["label"],
+        float(record["price"]),
+        record["currency"],
+        int(bool(record["is_return"])),
+        record.get("provider") or "",
+        record.get("notes") or "",
+        *leg_cols(out),
+        *leg_cols(back),
+        _epoch(times[0][0]),
+        out_seconds,
+        total_seconds,
+        max(int(leg["stops"]) for leg in legs),
+        min(days).isoformat(),
+        max(days).isoformat(),
+    )
+
+
+def row_to_record(row: sqlite3.Row) -> Dict:
+    """Inverse of record_to_row; tz keys are only present when stored."""
+
+    def leg(prefix: str) -> Optional[Dict]:
+        if row[f"{prefix}_depart"] is None:
+            return None
+        d = {
+            "depart_iso": row[f"{prefix}_depart"],
+            "arrive_iso": row[f"{prefix}_arrive"],
+            "stops": row[f"{prefix}_stops"],
+        }
+        for key in ("depart_tz", "arrive_tz"):
+            if row[f"{prefix}_{key}"] is not None:
+                d[key] = row[f"{prefix}_{key}"]
+        return d
+
+    return {
+        "id": row["id"],
+        "label": row["label"],
+        "price": row["price"],
+        "currency": row["currency"],
+        "is_return": bool(row["is_return"]),
+        "provider": row["provider"],
+        "notes": row["notes"],
+        "out": leg("out"),
+        "back": leg("back"),
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fare files
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def flatten_record(record: Dict) -> Dict:
+    """Nested FlightOption dict → flat fare fields; flat dicts pass through."""
+    if not isinstance(record.get("out"), dict):
+        return record
+    flat = {k: record.get(k) for k in ("label", "price", "currency", "provider", "notes")}
+    for prefix, leg in (("out", record["out"]), ("return", record.get("back"))):
+        if not leg:
+            continue
+        flat[f"{prefix}_depart"] = leg.get("depart_iso")
+        flat[f"{prefix}_arrive"] = leg.get("arrive_iso")
+        flat[f"{prefix}_stops"] = leg.get("stops")
+        flat[f"{prefix}_depart_tz"] = leg.get("depart_tz")
+        flat[f"{prefix}_arrive_tz"] = leg.get("arrive_tz")
+    return flat
+
+
+def _fare_key(name: str) -> str:
+    return name.strip().lower().replace("-", "_").replace(" ", "_")
+
+
+def iter_fare_file(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield ("file:line", fields) for every fare in a .csv, .jsonl/.ndjson or
+    .json file. CSV and JSON Lines are read one row at a time; a .json file
+    holds one array of records. Empty values and unknown columns are dropped.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        if suffix == ".csv":
+            reader = csv.DictReader(f)
+            rows = ((reader.line_num, row) for row in reader)
+        elif suffix in (".jsonl", ".ndjson"):
+            rows = ((n, json.loads(line)) for n, line in enumerate(f, 1) if line.strip())
+        elif suffix == ".json":
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = [data]
+            rows = enumerate(data, 1)
+        else:
+            raise ValueError(f"{path}: unsupported fare file type (use .csv, .jsonl or .json)")
+
+        for n, row in rows:
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{n}: expected an object, got {type(row).__name__}")
+            fields = {}
+            for k, v in flatten_record(row).items():
+                if k is None or v in (None, ""):
+                    continue
+                key = _fare_key(k)
+                if key in FARE_FIELDS:
+                    fields[key] = v
+            yield f"{path}:{n}", fields
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Pareto front
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class Trip(NamedTuple):
+    price: float
+    seconds: int
+    ids: Tuple[int, ...]  # one return option, or (outbound id, return id)
+
+
+def pareto_front(trips: Iterable[Trip]) -> List[Trip]:
+    """Trips not beaten on both price and time, cheapest first."""
+    front: List[Trip] = []
+    for trip in sorted(trips):
+        if not front or trip.seconds < front[-1].seconds:
+            front.append(trip)
+    return front
+
+
+class _Front:
+    """Incremental price/time front: prices ascending, times strictly descending."""
+
+    def __init__(self) -> None:
+        self.keys: List[Tuple[float, int]] = []
+        self.ids: List[int] = []
+
+    def add(self, price: float, seconds: int, id_: int) -> None:
+        key = (price, seconds)
+        pos = bisect_left(self.keys, key)
+        if pos > 0 and self.keys[pos - 1][1] <= seconds:
+            return  # something cheaper is at least as fast
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return
+        end = pos
+        while end < len(self.keys) and self.keys[end][1] >= seconds:
+            end += 1  # now dominated by the new point
+        self.keys[pos:end] = [key]
+        self.ids[pos:end] = [id_]
+
+
+def round_trip_front(
+    returns: Iterable[Trip],
+    outbound: List[Tuple[int, float, int, int, int]],
+    inbound: List[Tuple[int, float, int, int, int]],
+) -> List[Trip]:
+    """
+    Pareto front over return tickets and one-way pairs. `outbound` and
+    `inbound` hold (id, price, seconds, depart_ts, arrive_ts) tuples; a
+    pair is feasible when the return departs after the outbound arrives.
+    """
+    candidates = list(returns)
+    outbound = sorted(outbound, key=lambda o: o[4])
+    front = _Front()
+    i = 0
+    for rid, rprice, rsec, rdep, _ in sorted(inbound, key=lambda r: r[3]):
+        while i < len(outbound) and outbound[i][4] <= rdep:
+            oid, oprice, osec, _, _ = outbound[i]
+            front.add(oprice, osec, oid)
+            i += 1
+        for (oprice, osec), oid in zip(front.keys, front.ids):
+            candidates.append(Trip(oprice + rprice, osec + rsec, (oid, rid)))
+    return pareto_front(candidates)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Store
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class FlightStore:
+    """
+    Indexed flight database. Use as a context manager:
+
+        with FlightStore(DATA_FILE) as store:
+            new_id = store.add(asdict(flight))
+    """
+
+    def __init__(self, path: Path = DATA_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def __enter__(self) -> "FlightStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _init_schema(self) -> None:
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            # Re-check under the write lock: another script may have won.
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            fresh = version == 0
+            for stmt in SCHEMA.split(";"):
+                if stmt.strip():
+                    self.db.execute(stmt)
+            if fresh:
+                self._import_legacy_json(self.path.with_suffix(".json"))
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _import_legacy_json(self, legacy: Path) -> None:
+        if not legacy.exists():
+            return
+        with legacy.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+        self._insert(raw)
+
+    def _insert(self, records) -> List[int]:
+        placeholders = ", ".join("?" * len(COLUMNS))
+        sql = f"INSERT INTO flights ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+        ids = []
+        for record in records:
+            cur = self.db.execute(sql, record_to_row(record))
+            ids.append(cur.lastrowid)
+        return ids
+
+    # ---- writes --------------------------------------------------------------
+
+    def add(self, record: Dict) -> int:
+        """Insert one flight (its "id" is ignored) and return the new id."""
+        record = dict(record, id=None)
+        with self.db:
+            return self._insert([record])[0]
+
+    def add_many(self, records: Iterable[Dict]) -> List[int]:
+        """
+        Insert many flights in one transaction and return their ids.
+        `records` may be a generator; if it raises, nothing is stored.
+        """
+        with self.db:
+            return self._insert(dict(r, id=None) for r in records)
+
+    # ---- reads ---------------------------------------------------------------
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+
+    def get(self, ids: Iterable[int]) -> Dict[int, Dict]:
+        """Records by id."""
+        ids = sorted(set(ids))
+        out: Dict[int, Dict] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            sql = f"SELECT * FROM flights WHERE id IN ({', '.join('?' * len(chunk))})"
+            for row in self.db.execute(sql, chunk):
+                out[row["id"]] = row_to_record(row)
+        return out
+
+    @staticmethod
+    def _filters(
+        direct_only: bool, window: Optional[Tuple[date, date]]
+    ) -> Tuple[List[str], List]:
+        where, params = [], []
+        if direct_only:
+            where.append("max_stops = 0")
+        if window is not None:
+            where.append("first_day >= ? AND last_day <= ?")
+            params += [window[0].isoformat(), window[1].isoformat()]
+        return where, params
+
+    def query(
+        self,
+        sort: str = "price",
+        direct_only: bool = False,
+        window: Optional[Tuple[date, date]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Flights matching the filters, ordered by `sort` (a SORT_COLUMNS key)
+        and then by id. `window=(start, end)` keeps only flights whose legs
+        all depart and arrive on local dates within [start, end].
+        """
+        where, params = self._filters(direct_only, window)
+        sql = "SELECT * FROM flights"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {SORT_COLUMNS[sort]}, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [row_to_record(row) for row in self.db.execute(sql, params)]
+
+    def best(
+        self,
+        currency: str,
+        round_trip: bool = True,
+        home_tz: Optional[str] = None,
+        direct_only: bool = False,
+        window: Optional[Tuple[date, date]] = None,
+    ) -> List[Trip]:
+        """
+        Price × total travel time Pareto front in one currency.
+
+        round_trip=True: return tickets, plus one-way pairs when `home_tz`
+        tells outbound (departing in home_tz) from return one-ways.
+        round_trip=False: one-way tickets (only outbounds when home_tz is set).
+        """
+        where, params = self._filters(direct_only, window)
+        where.insert(0, "currency = ?")
+        params.insert(0, currency)
+        sql = (
+            "SELECT id, price, total_seconds, depart_ts, out_seconds, is_return,"
+            " out_depart_tz FROM flights WHERE " + " AND ".join(where)
+            + " ORDER BY price, total_seconds, id"
+        )
+
+        returns: List[Trip] = []
+        outbound, inbound = [], []
+        for id_, price, secs, dep, out_secs, is_return, dep_tz in self.db.execute(sql, params):
+            if is_return:
+                returns.append(Trip(price, secs, (id_,)))
+                continue
+            leg = (id_, price, secs, dep, dep + out_secs)
+            if home_tz is None or dep_tz == home_tz:
+                outbound.append(leg)
+            elif dep_tz is not None:
+                inbound.append(leg)
+
+        if not round_trip:
+            return pareto_front(Trip(p, s, (i,)) for i, p, s, _, _ in outbound)
+        if home_tz is None:
+            return pareto_front(returns)
+        return round_trip_front(returns, outbound, inbound)
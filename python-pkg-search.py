@@ -46,8 +46,11 @@ import requests
 from dateutil.parser import isoparse
 from rapidfuzz import fuzz, process
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 
+from pkgsearch_fetch import run_streaming
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Constants & endpoints
 # ──────────────────────────────────────────────────────────────────────────────
@@ -125,31 +128,32 @@ def best_pypi_matches(query: str,
     return [n for n, s, _ in scored if s >= 30]
 
 
-def pypi_meta(name: str,
-              recent_key: str = "last_month",
-              override_downloads: int | None = None) -> PKG | None:
+async def pypi_meta(fx,
+                    name: str,
+                    recent_key: str = "last_month",
+                    override_downloads: int | None = None) -> PKG | None:
     """
   Fetch summary, latest release timestamp, and downloads (recent_key).
   If override_downloads is given, skip the stats call and use that value.
+  Stats that stay unavailable after retries count as 0 downloads.
   """
-    try:
-        meta = requests.get(JSON_URL.format(name=name), timeout=15).json()
-        info = meta["info"]
-        dates = [
-            isoparse(f["upload_time_iso_8601"])
-            for files in meta["releases"].values() for f in files
-        ]
-        latest = max(dates) if dates else datetime(
-            1970, 1, 1, tzinfo=timezone.utc)
-        if override_downloads is None:
-            stats = requests.get(STATS_URL.format(name=name),
-                                 timeout=15).json()
+    meta = await fx.get_json(JSON_URL.format(name=name))
+    info = meta["info"]
+    dates = [
+        isoparse(f["upload_time_iso_8601"])
+        for files in meta["releases"].values() for f in files
+    ]
+    latest = max(dates) if dates else datetime(
+        1970, 1, 1, tzinfo=timezone.utc)
+    if override_downloads is None:
+        try:
+            stats = await fx.get_json(STATS_URL.format(name=name))
             dl = stats.get("data", {}).get(recent_key, 0)
-        else:
-            dl = int(override_downloads)
-        return PKG(name, info.get("summary", "")[:60], latest, dl, "")
-    except Exception:
-        return None
+        except Exception:
+            dl = 0
+    else:
+        dl = int(override_downloads)
+    return PKG(name, (info.get("summary") or "")[:60], latest, dl, "")
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -292,6 +296,65 @@ def write_pdf(path: str, title: str, criterion: str,
     cvs.save()
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Rich table
+# ──────────────────────────────────────────────────────────────────────────────
+def sort_rows(rows: list[PKG], criterion: str) -> list[PKG]:
+    key = (lambda p: p.released) if criterion == "latest" else (
+        lambda p: p.downloads)
+    return sorted(rows, key=key, reverse=True)
+
+
+def render_table(rows: list[PKG],
+                 title: str,
+                 with_conda: bool,
+                 recent: str = "month",
+                 caption: str | None = None) -> Table:
+    table = Table(title=title, caption=caption)
+    table.add_column("#", justify="right")
+    table.add_column("Package")
+    if with_conda:
+        table.add_column("micromamba", style="cyan")
+    table.add_column("Released (UTC)", justify="center")
+    table.add_column(f"DLs ({recent})", justify="right")
+    table.add_column("Summary")
+    for idx, pkg in enumerate(rows, 1):
+        cells = [str(idx), f"[bold]{pkg.name}[/]"]
+        if with_conda:
+            cells.append(pkg.conda or "—")
+        cells.extend([
+            pkg.released.strftime("%Y-%m-%d"), f"{pkg.downloads:,}",
+            pkg.summary
+        ])
+        table.add_row(*cells)
+    return table
+
+
+def fetch_streaming(jobs: list, worker, title: str, args) -> list[PKG]:
+    """
+  Run worker(fx, job) for every job through the shared async fetcher and
+  show the current top --limit rows in a live table while they arrive.
+  """
+    rows: list[PKG] = []
+    with Live(render_table([], title, False, args.recent),
+              console=console,
+              refresh_per_second=8,
+              transient=True) as live:
+
+        def on_result(job, pkg: PKG | None) -> None:
+            if pkg is not None:
+                rows.append(pkg)
+            live.update(
+                render_table(sort_rows(rows, args.sort)[:args.limit],
+                             title,
+                             False,
+                             args.recent,
+                             caption=f"fetched {len(rows)} of {len(jobs)}…"))
+
+        run_streaming(jobs, worker, on_result, concurrency=args.threads)
+    return rows
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Main
 # ──────────────────────────────────────────────────────────────────────────────
@@ -319,7 +382,8 @@ def main() -> None:
     ag.add_argument("--threads",
                     type=int,
                     default=16,
-                    help="max parallel threads for metadata fetch")
+                    help="initial parallel requests per host for metadata "
+                    "fetch (adapts to rate limits)")
     ag.add_argument("--with-conda",
                     action="store_true",
                     help="map to conda-forge names for micromamba")
@@ -344,15 +408,11 @@ def main() -> None:
         with console.status("[green bold]Fetching PyPI index…"):
             all_pkgs = fetch_pypi_index()
             candidates = best_pypi_matches(args.query, all_pkgs, k=600)
-        with console.status("[green bold]Downloading per-package metadata…"):
-            from concurrent.futures import ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=args.threads) as ex:
-                rows = list(
-                    filter(
-                        None,
-                        ex.map(lambda n: pypi_meta(n, recent_key=recent_key),
-                               candidates)))
         title = f"PyPI search: “{args.query}”"
+        rows = fetch_streaming(
+            candidates,
+            lambda fx, n: pypi_meta(fx, n, recent_key=recent_key),
+            title, args)
     else:
         with console.status("[green bold]Loading Top PyPI packages…"):
             doc = load_top_dump()
@@ -361,18 +421,14 @@ def main() -> None:
             # We fetch metadata only for the first N*1.5 to allow post-filters.
             pre_cap = max(args.limit, 1) * 3 // 2
             top_pairs = top_pairs[:max(pre_cap, args.limit)]
-        with console.status("[green bold]Fetching metadata for Top packages…"):
-            from concurrent.futures import ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=args.threads) as ex:
-                rows = list(
-                    filter(
-                        None,
-                        ex.map(
-                            lambda tup: pypi_meta(tup[0],
-                                                  recent_key=recent_key,
-                                                  override_downloads=tup[1]),
-                            top_pairs)))
         title = "Top PyPI packages (monthly dump)"
+        rows = fetch_streaming(
+            top_pairs,
+            lambda fx, tup: pypi_meta(fx,
+                                      tup[0],
+                                      recent_key=recent_key,
+                                      override_downloads=tup[1]),
+            title, args)
 
     # Optional conda mapping
     if args.with_conda and rows:
@@ -383,5 +439,48 @@ def main() -> None:
         ]
 
     # Optional recency filter (by latest release date)
-    if args.released - since is not None:  # dashed name not valid in code; see below
-        pass
+    if args.released_since is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.released_since)
+        rows = [p for p in rows if p.released >= cutoff]
+
+    # Sort and trim
+    rows = sort_rows(rows, args.sort)[:args.limit]
+
+    if not rows:
+        console.print("[red]No matches.[/red]")
+        sys.exit(1)
+
+    console.print(render_table(rows, title, args.with_conda, args.recent))
+
+    # Export if requested
+    if args.csv:
+        write_csv(args.csv, rows)
+        console.print(f"[green]CSV saved →[/green] {args.csv}")
+    if args.pdf:
+        try:
+            write_pdf(args.pdf, title, args.sort, rows)
+            console.print(f"[green]PDF saved →[/green] {args.pdf}")
+        except RuntimeError as e:
+            console.print(f"[red]PDF not written:[/red] {e}")
+
+    # Prompt installation
+    if args.install:
+        prompt = "Enter package numbers to install (e.g. 1 2 5 10-12): "
+        try:
+            selection = input(prompt)
+            chosen = parse_selection(selection, max_index=len(rows))
+            to_install = [rows[i - 1].name for i in chosen]
+            if to_install:
+                console.print(f"Installing: {', '.join(to_install)}")
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", *to_install],
+                    check=True)
+            else:
+                console.print(
+                    "[yellow]No packages selected. Nothing to install.[/]")
+        except Exception as ex:
+            console.print(f"[red]Installation aborted: {ex}[/red]")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,9 @@
 Script: query_package_sizes.py
 Description:
     For each package provided as command line argument, or from a default list if no
-    arguments are provided, this script calls 'pacman -Si <package>',
-    extracts the "Installed Size" value, converts it to a baseline in KiB and then
+    arguments are provided, this script looks up the "Installed Size" in pacman's
+    sync databases (read once, directly, via pacman_localdb.py; a single
+    'pacman -Si' call is the fallback), converts it to a baseline in KiB and then
     dynamically formats and prints the size in KiB, MiB, or GiB.
     
 Usage:
@@ -17,63 +18,25 @@ Usage:
 Requirements:
     - Python 3.x
     - pacman (available on Arch Linux systems)
-    - The pacman command must be available in the system PATH.
+    - pacman_localdb.py (next to this script)
 """
 
 import re
 import subprocess
 import sys
 
-def query_installed_size(pkg: str) -> str:
+from pacman_localdb import read_sync_db
+
+_SIZE_RE = re.compile(r"Installed Size\s*:\s*([\d\.,]+)\s*(KiB|MiB|GiB)")
+_UNIT_KIB = {"KiB": 1, "MiB": 1024, "GiB": 1024 * 1024}
+
+def format_kib(size_kib: float) -> str:
     """
-    Queries pacman for package info and extracts the Installed Size.
-    
-    Args:
-        pkg: Package name as a string.
-    
-    Returns:
-        A formatted string with the size and unit (e.g., "48.28 MiB"),
-        or "Not found" if the package is not available.
+    Format a size in KiB for display:
+    - If size_kib < 1024, display in KiB.
+    - If size_kib < 1024*1024 (i.e. less than 1 GiB), display in MiB.
+    - Otherwise, display in GiB.
     """
-    try:
-        # Run the pacman -Si command and decode its output.
-        result = subprocess.run(['pacman', '-Si', pkg],
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.DEVNULL,
-                                text=True,
-                                check=True)
-        output = result.stdout
-    except subprocess.CalledProcessError:
-        return "Not found"
-    
-    # Look for the line that begins with "Installed Size"
-    match = re.search(r"Installed Size\s*:\s*([\d\.,]+)\s*(KiB|MiB|GiB)", output)
-    if not match:
-        return "Not found"
-
-    num_str, unit = match.groups()
-    # Replace comma with a period for proper float conversion (locale issues).
-    num_str = num_str.replace(",", ".")
-    
-    try:
-        size_val = float(num_str)
-    except ValueError:
-        return "Error"
-    
-    # Convert the size to KiB:
-    if unit == "KiB":
-        size_kib = size_val
-    elif unit == "MiB":
-        size_kib = size_val * 1024
-    elif unit == "GiB":
-        size_kib = size_val * 1024 * 1024
-    else:
-        size_kib = size_val
-
-    # Determine the display unit based on size in KiB:
-    # - If size_kib < 1024, display in KiB.
-    # - If size_kib < 1024*1024 (i.e. less than 1 GiB), display in MiB.
-    # - Otherwise, display in GiB.
     if size_kib < 1024:
         display_val = size_kib
         display_unit = "KiB"
@@ -83,9 +46,58 @@ def query_installed_size(pkg: str) -> str:
     else:
         display_val = size_kib / (1024 * 1024)
         display_unit = "GiB"
-        
+
     return f"{display_val:.2f} {display_unit}"
 
+def query_sizes_pacman(packages: list) -> dict:
+    """
+    Fallback for sync databases Python cannot open: one `pacman -Si` call
+    for all packages, parsed block by block.
+
+    Returns:
+        {package: size_kib} for every package pacman knows about.
+    """
+    result = subprocess.run(['pacman', '-Si', *packages],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL,
+                            text=True,
+                            check=False)
+    sizes = {}
+    for block in result.stdout.strip().split("\n\n"):
+        name = re.search(r"^Name\s*:\s*(\S+)", block, re.MULTILINE)
+        match = _SIZE_RE.search(block)
+        if name and match:
+            num_str, unit = match.groups()
+            # Replace comma with a period for proper float conversion (locale issues).
+            sizes[name.group(1)] = float(num_str.replace(",", ".")) * _UNIT_KIB[unit]
+    return sizes
+
+def query_installed_sizes(packages: list) -> dict:
+    """
+    Look up the repository "Installed Size" of every package in one pass
+    over pacman's sync databases (via pacman_localdb.py).
+
+    Args:
+        packages: Package names.
+
+    Returns:
+        {package: formatted size (e.g. "48.28 MiB") or "Not found"}.
+    """
+    try:
+        sync = read_sync_db()
+    except OSError:
+        sync = {}
+    sizes = {name: sync[name].size / 1024 for name in packages if name in sync}
+
+    # read_sync_db() skips repo databases it cannot read, so anything still
+    # missing may live in one of those; let pacman answer for it.
+    missing = [name for name in dict.fromkeys(packages) if name not in sizes]
+    if missing:
+        sizes.update(query_sizes_pacman(missing))
+
+    return {name: format_kib(sizes[name]) if name in sizes else "Not found"
+            for name in packages}
+
 def main():
     # Check if packages are provided as command-line arguments.
     if len(sys.argv) > 1:
@@ -114,9 +126,10 @@ def main():
     print(f"{header_pkg:<30} {header_size:<20}")
     print("-" * 50)
     
-    # Process each package and print the size information.
+    # Look every package up at once, then print the size information.
+    sizes = query_installed_sizes(packages)
     for pkg in packages:
-        size_formatted = query_installed_size(pkg)
+        size_formatted = sizes[pkg]
         print(f"{pkg:<30} {size_formatted:<20}")
 
 if __name__ == "__main__":
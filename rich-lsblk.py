@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-import json
-import subprocess
 import sys
 from typing import Any
 
@@ -10,51 +8,35 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.tree import Tree
 
-
-# -----------------------------------------------------------------------------
-# Configuration
-# -----------------------------------------------------------------------------
-
-LSBLK_COLUMNS = (
-  "NAME,PATH,SIZE,TYPE,FSTYPE,LABEL,UUID,MOUNTPOINTS,MODEL,TRAN,ROTA,RM,RO"
-)
+from blockdev_snapshot import DeviceSnapshot, human_size, snapshot
 
 
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 
-def run_lsblk_json() -> dict[str, Any]:
+def read_snapshot() -> DeviceSnapshot:
   """
-  Run lsblk and return parsed JSON.
+  Read the device tree from the shared snapshot (sysfs + udev + mountinfo,
+  or one lsblk call where /sys is not available).
 
   Raises:
-    SystemExit: If lsblk fails or returns invalid JSON.
+    SystemExit: If neither source can be read.
   """
-  cmd = [
-    "lsblk",
-    "-J",
-    "-o",
-    LSBLK_COLUMNS,
-  ]
-
   try:
-    result = subprocess.run(
-      cmd,
-      check=True,
-      capture_output=True,
-      text=True,
-    )
-  except subprocess.CalledProcessError as exc:
-    print(f"Error: lsblk failed with exit code {exc.returncode}.", file=sys.stderr)
-    print(exc.stderr, file=sys.stderr)
+    return snapshot()
+  except (OSError, RuntimeError) as exc:
+    print(f"Error: could not read block devices: {exc}", file=sys.stderr)
     raise SystemExit(1)
 
-  try:
-    return json.loads(result.stdout)
-  except json.JSONDecodeError as exc:
-    print(f"Error: failed to parse lsblk JSON: {exc}", file=sys.stderr)
-    raise SystemExit(1)
+
+def fmt_size(value: Any) -> str:
+  """
+  Render a byte count the way plain lsblk does (931.5G).
+  """
+  if isinstance(value, int):
+    return human_size(value)
+  return str(value) if value is not None else "?"
 
 
 def fmt_boolish(value: Any, true_text: str, false_text: str) -> str:
@@ -97,7 +79,7 @@ def make_label(device: dict[str, Any]) -> str:
   """
   name = device.get("name", "?")
   devtype = device.get("type", "?")
-  size = device.get("size", "?")
+  size = fmt_size(device.get("size"))
   fstype = device.get("fstype") or "-"
   mounts = safe_mounts(device)
 
@@ -159,7 +141,7 @@ def build_summary_table(data: dict[str, Any]) -> Table:
     table.add_row(
       str(device.get("name", "-")),
       str(device.get("type", "-")),
-      str(device.get("size", "-")),
+      fmt_size(device.get("size")),
       str(device.get("tran") or "-"),
       fmt_boolish(device.get("rota"), "yes", "no"),
       fmt_boolish(device.get("rm"), "yes", "no"),
@@ -180,11 +162,12 @@ def main() -> None:
   Entry point.
   """
   console = Console()
-  data = run_lsblk_json()
+  snap = read_snapshot()
+  data = snap.as_lsblk_json()
 
   console.print(
     Panel.fit(
-      "[bold]lsblk[/bold] rendered from structured JSON with [bold]Rich[/bold]",
+      f"[bold]lsblk[/bold] view ({snap.source}) rendered with [bold]Rich[/bold]",
       border_style="cyan",
     )
   )
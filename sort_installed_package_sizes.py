@@ -3,9 +3,10 @@
 Script: sort_installed_package_sizes.py
 
 Description:
-    Parses the output of `pacman -Qi` to extract each installed package’s
-    “Installed Size,” normalizes sizes to KiB, sorts all packages by descending
-    size, and prints a neatly formatted table.
+    Reads each installed package’s “Installed Size” straight from pacman’s
+    local database (/var/lib/pacman/local, via pacman_localdb.py), normalizes
+    sizes to KiB, sorts all packages by descending size, and prints a neatly
+    formatted table.
 
 Usage:
     # Make executable and run:
@@ -16,66 +17,24 @@ Usage:
     $ python3 sort_installed_package_sizes.py
 
 Requirements:
-    - Python 3.6+
-    - pacman (in your PATH)
+    - Python 3.7+
+    - pacman_localdb.py (next to this script)
 """
 
-import re
-import subprocess
 import sys
 
-def get_pacman_info() -> str:
+from pacman_localdb import read_local_db
+
+def get_package_sizes():
     """
-    Run `pacman -Qi` and return its full stdout as text.
-    Exits on error.
+    Read every installed package's name and installed size (in KiB) from
+    pacman's local database in one pass. Exits on error.
     """
     try:
-        proc = subprocess.run(
-            ["pacman", "-Qi"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        print(f"Error: failed to run pacman -Qi:\n{e.stderr}", file=sys.stderr)
+        return [(pkg.name, pkg.size / 1024) for pkg in read_local_db()]
+    except OSError as e:
+        print(f"Error: cannot read the pacman database: {e}", file=sys.stderr)
         sys.exit(1)
-    return proc.stdout
-
-def parse_info_block(block: str):
-    """
-    Given a block of text for one package (lines separated by '\n'),
-    extract the package name and installed size.
-    Returns:
-        (name: str, size_kib: float) or (None, None) if parsing fails.
-    """
-    name = None
-    size_kib = None
-
-    # Regex to match "Installed Size :  1 234,56 MiB" (comma or dot decimal)
-    size_re = re.compile(r"Installed Size\s*:\s*([\d\.,]+)\s*(KiB|MiB|GiB)")
-
-    for line in block.splitlines():
-        if line.startswith("Name"):
-            # e.g. "Name           : bash"
-            parts = line.split(":", 1)
-            name = parts[1].strip() if len(parts) == 2 else None
-
-        elif line.startswith("Installed Size"):
-            m = size_re.search(line)
-            if m:
-                num_str, unit = m.groups()
-                # Normalize decimal comma → dot
-                num = float(num_str.replace(",", "."))
-                # Convert to KiB
-                if unit == "KiB":
-                    size_kib = num
-                elif unit == "MiB":
-                    size_kib = num * 1024
-                elif unit == "GiB":
-                    size_kib = num * 1024 * 1024
-
-    return name, size_kib
 
 def human_readable(kib: float) -> str:
     """
@@ -89,24 +48,13 @@ def human_readable(kib: float) -> str:
         return f"{(kib / (1024 * 1024)):.2f} GiB"
 
 def main():
-    # 1) Get raw pacman output
-    data = get_pacman_info()
-
-    # 2) Split into blocks (each package is separated by a blank line)
-    blocks = data.strip().split("\n\n")
-
-    # 3) Parse each block, collect (name, size_kib)
-    pkg_list = []
-    for block in blocks:
-        name, size_kib = parse_info_block(block)
-        if name:
-            # Treat missing size as 0 so it sorts at the end
-            pkg_list.append((name, size_kib if size_kib is not None else 0.0))
+    # 1) Collect (name, size_kib) from the local package database
+    pkg_list = get_package_sizes()
 
-    # 4) Sort descending by size_kib
+    # 2) Sort descending by size_kib
     pkg_list.sort(key=lambda x: x[1], reverse=True)
 
-    # 5) Print table
+    # 3) Print table
     header_pkg = "Package"
     header_size = "Installed Size"
     print(f"{header_pkg:<30} {header_size:>15}")
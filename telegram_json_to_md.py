@@ -6,16 +6,38 @@ Usage
 -----
   telegram_json_to_md.py result.json
   telegram_json_to_md.py result.json -o chat-log.md
+  telegram_json_to_md.py result.json --since 2023-01-01 --until 2023-06-30
+  telegram_json_to_md.py result.json --split-month     # result-2023-01.md, ...
 
 Then, to get a PDF:
   pandoc chat-log.md -o chat-log.pdf
+
+Large exports
+-------------
+The export is never loaded as a whole: the `messages` array is parsed one
+message at a time and every line goes straight to a buffered output file,
+so memory stays flat for multi-GB group exports. ijson is used when it is
+installed (its C backend is much faster); otherwise a built-in chunked
+parser built on json.JSONDecoder.raw_decode does the same job.
+
+Telegram writes messages in chronological order, so --until stops reading
+as soon as it has passed the end of the range.
 """
 
 import argparse
 import datetime as dt
 import json
+import re
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+READ_CHUNK = 1 << 20      # bytes / chars per read
+WRITE_BUFFER = 1 << 20
 
 
 # ───────────────────────────── Helpers ─────────────────────────────
@@ -103,6 +125,220 @@ def format_message(msg: Dict[str, Any]) -> str:
     return f"{ts} — {sender}: {body}"
 
 
+# ───────────────────────────── Streaming ─────────────────────────────
+
+
+class _ChunkedJson:
+    """
+    Minimal pull parser over a text stream: reads READ_CHUNK characters at a
+    time and decodes one JSON value at a time with raw_decode, so only the
+    value being decoded (one message) has to fit in memory.
+    """
+
+    _WS = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, f: IO[str]):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(READ_CHUNK)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = self._WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r} in JSON, got {got or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that ends exactly at the buffer end may continue.
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator[Any]:
+        """Elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or ']' in JSON array, got {sep!r}")
+
+
+def _stream_builtin(f: IO[str], meta: Dict[str, Any]) -> Iterator[Any]:
+    """Yield message dicts; top-level scalars seen before them go to meta."""
+    p = _ChunkedJson(f)
+    p.expect("{")
+    path: List[str] = []
+    while True:
+        if p.peek() == "}":
+            if not path:
+                return
+            p.pos += 1
+            path.pop()
+            if p.peek() == ",":
+                p.pos += 1
+            continue
+        key = p.value()
+        p.expect(":")
+        if not path and key == "messages":
+            meta["_variant"] = "messages"
+            yield from p.items()
+            return
+        if not path and key == "chats" and p.peek() == "{":
+            # Some variants embed chats in 'chats' → 'list'
+            p.pos += 1
+            path.append(key)
+        elif path == ["chats"] and key == "list":
+            meta["_variant"] = "chats"
+            yield from p.items()
+            return
+        else:
+            value = p.value()
+            if not path and not isinstance(value, (dict, list)):
+                meta[key] = value
+        if p.peek() == ",":
+            p.pos += 1
+
+
+def _stream_ijson(f: IO[bytes], meta: Dict[str, Any]) -> Iterator[Any]:
+    events = ijson.parse(f, use_float=True)
+    for prefix, event, value in events:
+        if event == "start_array" and prefix in ("messages", "chats.list"):
+            meta["_variant"] = "messages" if prefix == "messages" else "chats"
+            head = [(prefix, event, value)]
+
+            def rest():
+                yield from head
+                yield from events
+
+            yield from ijson.items(rest(), prefix + ".item")
+            return
+        if "." not in prefix and event in ("string", "number", "boolean"):
+            meta[prefix] = value
+
+
+def stream_messages(in_path: Path, meta: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Yield the entries of the export's `messages` array (or chats → list)
+    one at a time. Top-level scalar fields that precede it (name, type, id)
+    are stored in `meta` by the time the first entry is yielded.
+    """
+    if ijson is not None:
+        with in_path.open("rb") as f:
+            yield from _stream_ijson(f, meta)
+    else:
+        with in_path.open("r", encoding="utf-8") as f:
+            yield from _stream_builtin(f, meta)
+
+
+def in_range(raw_date: str, since: Optional[str], until: Optional[str]) -> Tuple[bool, bool]:
+    """
+    (inside, past_end) for an ISO date string. Bounds may be dates or
+    datetimes and are compared on the same number of characters, so
+    --until 2023-06-30 includes the whole day.
+    """
+    if since and raw_date[: len(since)] < since:
+        return False, False
+    if until and raw_date[: len(until)] > until:
+        return False, True
+    return True, False
+
+
+def iso_bound(value: str) -> str:
+    try:
+        if len(value) <= 10:
+            return dt.date.fromisoformat(value).isoformat()
+        return dt.datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}, expected YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS]"
+        ) from None
+
+
+def export_title(meta: Dict[str, Any], in_path: Path) -> str:
+    return meta.get("name") or meta.get("title") or in_path.stem
+
+
+def header_text(title: str, in_path: Path, suffix: str = "") -> str:
+    lines = [
+        f"# Telegram chat export: {title}{suffix}",
+        "",
+        f"_Source JSON_: `{in_path.resolve()}`",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+class SplitWriter:
+    """
+    One output file per calendar month (<stem>-YYYY-MM<suffix>). Only one
+    file is open at a time; a month that shows up again is appended to.
+    """
+
+    def __init__(self, base: Path, title: str, in_path: Path):
+        self.base = base
+        self.title = title
+        self.in_path = in_path
+        self.month: Optional[str] = None
+        self.out: Optional[IO[str]] = None
+        self.paths: Dict[str, Path] = {}
+        base.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, month: str, line: str) -> None:
+        if month != self.month:
+            self.close()
+            path = self.base.with_name(f"{self.base.stem}-{month}{self.base.suffix}")
+            fresh = month not in self.paths
+            self.out = path.open("w" if fresh else "a", encoding="utf-8", buffering=WRITE_BUFFER)
+            if fresh:
+                self.out.write(header_text(self.title, self.in_path, f" ({month})"))
+            self.paths[month] = path
+            self.month = month
+        self.out.write(line)
+
+    def close(self) -> None:
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+
+
 # ───────────────────────────── Main ─────────────────────────────
 
 
@@ -114,44 +350,88 @@ def main() -> None:
     ap.add_argument(
         "-o",
         "--output",
-        help="Output markdown file (default: same name with .md extension).",
+        help="Output markdown file (default: same name with .md extension). "
+        "With --split-month this is the name pattern: chat.md → chat-YYYY-MM.md.",
+    )
+    ap.add_argument(
+        "--since",
+        type=iso_bound,
+        help="Only messages on or after this date (YYYY-MM-DD or ISO datetime).",
+    )
+    ap.add_argument(
+        "--until",
+        type=iso_bound,
+        help="Only messages on or before this date (YYYY-MM-DD or ISO datetime).",
+    )
+    ap.add_argument(
+        "--split-month",
+        action="store_true",
+        help="Write one markdown file per calendar month.",
     )
     args = ap.parse_args()
 
     in_path = Path(args.input)
-    data = json.loads(in_path.read_text(encoding="utf-8"))
-
-    # Telegram exports typically use 'messages' at the top level
-    messages = data.get("messages")
-    if messages is None:
-        # Some variants embed chats in 'chats' → 'list'
-        messages = data.get("chats", {}).get("list", [])
-
-    title = data.get("name") or data.get("title") or in_path.stem
-
-    lines: List[str] = []
-    lines.append(f"# Telegram chat export: {title}")
-    lines.append("")
-    lines.append(f"_Source JSON_: `{in_path.resolve()}`")
-    lines.append("")
-
-    for msg in messages:
-        if not isinstance(msg, dict):
-            continue
-
-        # Filter only "message"-like entries; ignore weird system entries if desired
-        mtype = msg.get("type")
-        if mtype not in (None, "message", "service"):
-            continue
-
-        lines.append("- " + format_message(msg))
-
-    out_text = "\n".join(lines)
-
     out_path = Path(args.output) if args.output else in_path.with_suffix(".md")
-    out_path.write_text(out_text, encoding="utf-8")
+    filtering = bool(args.since or args.until)
+
+    meta: Dict[str, Any] = {}
+    messages = stream_messages(in_path, meta)
 
-    print(f"Wrote markdown log to: {out_path.resolve()}")
+    out: Optional[IO[str]] = None
+    split: Optional[SplitWriter] = None
+    written = 0
+    try:
+        for msg in messages:
+            if not isinstance(msg, dict):
+                continue
+
+            # Filter only "message"-like entries; ignore weird system entries if desired
+            mtype = msg.get("type")
+            if mtype not in (None, "message", "service"):
+                continue
+
+            raw_date = str(msg.get("date") or "")
+            if filtering:
+                inside, past_end = in_range(raw_date, args.since, args.until)
+                if past_end and meta.get("_variant") == "messages":
+                    break
+                if not inside:
+                    continue
+
+            # Each line is preceded by its newline, as "\n".join() did.
+            line = "\n- " + format_message(msg)
+            if args.split_month:
+                if split is None:
+                    title = export_title(meta, in_path)
+                    split = SplitWriter(out_path, title, in_path)
+                split.write(raw_date[:7] or "unknown", line)
+            else:
+                if out is None:
+                    title = export_title(meta, in_path)
+                    out = out_path.open("w", encoding="utf-8", buffering=WRITE_BUFFER)
+                    out.write(header_text(title, in_path))
+                out.write(line)
+            written += 1
+
+        if not args.split_month and out is None:
+            # No messages in range: still write the header.
+            title = export_title(meta, in_path)
+            out = out_path.open("w", encoding="utf-8")
+            out.write(header_text(title, in_path))
+    finally:
+        messages.close()
+        if out is not None:
+            out.close()
+        if split is not None:
+            split.close()
+
+    if args.split_month:
+        paths = split.paths if split is not None else {}
+        print(f"Wrote {written} message(s) to {len(paths)} monthly file(s):")
+        for month in sorted(paths):
+            print(f"  {paths[month].resolve()}")
+    else:
+        print(f"Wrote markdown log to: {out_path.resolve()}")
 
 
 if __name__ == "__main__":
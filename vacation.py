@@ -7,23 +7,27 @@ Store candidate flights for a given vacation period and list/sort them by
 price and travel time.
 
 Data file (default):
-  ~/.local/share/vacay/flights.json
+  ~/.local/share/vacay/flights.sqlite3   (see vacay_store.py; an older
+  flights.json next to it is imported on first use)
 
 Subcommands:
-  add   — add a new flight option
-  list  — list stored flight options with computed durations
+  add    — add a new flight option
+  import — bulk-add fares from CSV / JSON Lines / JSON files
+  list   — list stored flight options with computed durations
+  best   — price × travel-time Pareto front (incl. one-way pairs)
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from dataclasses import dataclass, asdict
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
-from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from vacay_store import FlightStore, Trip, iter_fare_file
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -33,7 +37,7 @@ from zoneinfo import ZoneInfo
 VACATION_START = date(2025, 1, 19)
 VACATION_END = date(2025, 1, 31)
 
-DATA_FILE = Path.home() / ".local" / "share" / "vacay" / "flights.json"
+DATA_FILE = Path.home() / ".local" / "share" / "vacay" / "flights.sqlite3"
 
 # Home / destination time zones (edit these if your main trip changes)
 HOME_TZ = "Europe/Copenhagen"
@@ -108,45 +112,23 @@ class FlightOption:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def _ensure_data_dir() -> None:
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
-def load_db() -> List[FlightOption]:
-    if not DATA_FILE.exists():
-        return []
-    with DATA_FILE.open("r", encoding="utf-8") as f:
-        raw = json.load(f)
-
-    flights: List[FlightOption] = []
-    for item in raw:
-        out = Direction(**item["out"])
-        back_raw = item.get("back")
-        back = Direction(**back_raw) if back_raw else None
-        flights.append(
-            FlightOption(
-                id=item["id"],
-                label=item["label"],
-                price=item["price"],
-                currency=item["currency"],
-                is_return=bool(item["is_return"]),
-                out=out,
-                back=back,
-                provider=item.get("provider", ""),
-                notes=item.get("notes", ""),
-            )
-        )
-    return flights
+def open_store() -> FlightStore:
+    return FlightStore(DATA_FILE)
 
 
-def save_db(flights: List[FlightOption]) -> None:
-    _ensure_data_dir()
-    serializable = []
-    for f in flights:
-        d = asdict(f)
-        serializable.append(d)
-    with DATA_FILE.open("w", encoding="utf-8") as out:
-        json.dump(serializable, out, indent=2, sort_keys=True)
+def flight_from_record(item: dict) -> FlightOption:
+    back_raw = item.get("back")
+    return FlightOption(
+        id=item["id"],
+        label=item["label"],
+        price=item["price"],
+        currency=item["currency"],
+        is_return=bool(item["is_return"]),
+        out=Direction(**item["out"]),
+        back=Direction(**back_raw) if back_raw else None,
+        provider=item.get("provider", ""),
+        notes=item.get("notes", ""),
+    )
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -154,12 +136,6 @@ def save_db(flights: List[FlightOption]) -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def new_id(flights: List[FlightOption]) -> int:
-    if not flights:
-        return 1
-    return max(f.id for f in flights) + 1
-
-
 def parse_iso_datetime(value: str) -> datetime:
     """
     Parse "YYYY-MM-DDTHH:MM" into naive datetime (no tz).
@@ -211,22 +187,28 @@ def in_vacation_window(dt: datetime) -> bool:
     return VACATION_START <= dt.date() <= VACATION_END
 
 
+def first_outside_window(*dts: Optional[datetime]) -> Optional[datetime]:
+    """First datetime outside the vacation window (None entries are skipped)."""
+    for dt in dts:
+        if dt is not None and not in_vacation_window(dt):
+            return dt
+    return None
+
+
 def reject_outside_window(
-    *dts: datetime,
+    *dts: Optional[datetime],
     force: bool,
 ) -> None:
     if force:
         return
-    for dt in dts:
-        if dt is None:
-            continue
-        if not in_vacation_window(dt):
-            msg = (
-                f"Error: datetime {dt.isoformat()} is outside vacation window "
-                f"{VACATION_START}–{VACATION_END}. Use --force to override."
-            )
-            print(msg, file=sys.stderr)
-            sys.exit(1)
+    dt = first_outside_window(*dts)
+    if dt is not None:
+        msg = (
+            f"Error: datetime {dt.isoformat()} is outside vacation window "
+            f"{VACATION_START}–{VACATION_END}. Use --force to override."
+        )
+        print(msg, file=sys.stderr)
+        sys.exit(1)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -234,25 +216,33 @@ def reject_outside_window(
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def cmd_add(args: argparse.Namespace) -> None:
-    flights = load_db()
-
-    out_depart = parse_iso_datetime(args.out_depart)
-    out_arrive = parse_iso_datetime(args.out_arrive)
+def flight_from_fields(
+    fields: Dict,
+) -> Tuple[FlightOption, List[Optional[datetime]]]:
+    """
+    Build an (unsaved) option from `add` option values or a fare-file row
+    (same names, values may be strings). Also returns the four leg
+    datetimes for the vacation-window check. Raises ZoneInfoNotFoundError
+    for a time zone name the system does not know.
+    """
+    out_depart = parse_iso_datetime(fields["out_depart"])
+    out_arrive = parse_iso_datetime(fields["out_arrive"])
 
-    back_depart = parse_iso_datetime(args.return_depart) if args.return_depart else None
-    back_arrive = parse_iso_datetime(args.return_arrive) if args.return_arrive else None
+    return_depart = fields.get("return_depart")
+    return_arrive = fields.get("return_arrive")
+    back_depart = parse_iso_datetime(return_depart) if return_depart else None
+    back_arrive = parse_iso_datetime(return_arrive) if return_arrive else None
 
-    reject_outside_window(
-        out_depart, out_arrive, back_depart, back_arrive, force=args.force
-    )
+    for key in ("out_depart_tz", "out_arrive_tz", "return_depart_tz", "return_arrive_tz"):
+        if fields.get(key):
+            ZoneInfo(fields[key])  # fail here, not later inside the store
 
     out_dir = Direction(
         depart_iso=out_depart.isoformat(timespec="minutes"),
         arrive_iso=out_arrive.isoformat(timespec="minutes"),
-        stops=args.out_stops,
-        depart_tz=args.out_depart_tz,
-        arrive_tz=args.out_arrive_tz,
+        stops=int(fields.get("out_stops") or 0),
+        depart_tz=fields.get("out_depart_tz") or HOME_TZ,
+        arrive_tz=fields.get("out_arrive_tz") or DEST_TZ,
     )
 
     back_dir = None
@@ -261,70 +251,102 @@ def cmd_add(args: argparse.Namespace) -> None:
         back_dir = Direction(
             depart_iso=back_depart.isoformat(timespec="minutes"),
             arrive_iso=back_arrive.isoformat(timespec="minutes"),
-            stops=args.return_stops,
-            depart_tz=args.return_depart_tz,
-            arrive_tz=args.return_arrive_tz,
+            stops=int(fields.get("return_stops") or 0),
+            depart_tz=fields.get("return_depart_tz") or DEST_TZ,
+            arrive_tz=fields.get("return_arrive_tz") or HOME_TZ,
         )
 
     flight = FlightOption(
-        id=new_id(flights),
-        label=args.label,
-        price=args.price,
-        currency=args.currency,
+        id=0,  # assigned by the store
+        label=str(fields["label"]),
+        price=float(fields["price"]),
+        currency=str(fields.get("currency") or "DKK"),
         is_return=is_return,
         out=out_dir,
         back=back_dir,
-        provider=args.provider or "",
-        notes=args.notes or "",
+        provider=str(fields.get("provider") or ""),
+        notes=str(fields.get("notes") or ""),
     )
+    return flight, [out_depart, out_arrive, back_depart, back_arrive]
 
-    flights.append(flight)
-    save_db(flights)
 
-    print(f"Added option #{flight.id}: {flight.label}")
-
-
-def cmd_list(args: argparse.Namespace) -> None:
-    flights = load_db()
-    if not flights:
-        print("No flights stored yet.")
-        return
+def cmd_add(args: argparse.Namespace) -> None:
+    try:
+        flight, dts = flight_from_fields(vars(args))
+    except ZoneInfoNotFoundError as exc:
+        print(f"Error: {exc.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    reject_outside_window(*dts, force=args.force)
 
-    # filter
-    if args.direct_only:
-        flights = [
-            f
-            for f in flights
-            if f.out.stops == 0 and (not f.is_return or (f.back and f.back.stops == 0))
-        ]
+    with open_store() as store:
+        flight.id = store.add(asdict(flight))
 
-    if args.within_window:
+    print(f"Added option #{flight.id}: {flight.label}")
 
-        def leg_in_window(dir_: Direction) -> bool:
-            return in_vacation_window(dir_.depart_dt()) and in_vacation_window(
-                dir_.arrive_dt()
-            )
 
-        flights = [
-            f
-            for f in flights
-            if leg_in_window(f.out)
-            and (not f.is_return or (f.back and leg_in_window(f.back)))
-        ]
+def cmd_import(args: argparse.Namespace) -> None:
+    skipped = 0
+
+    def fail(msg: str) -> None:
+        print(f"Error: {msg} (nothing imported)", file=sys.stderr)
+        sys.exit(1)
+
+    def records():
+        nonlocal skipped
+        for path in args.files:
+            try:
+                for where, fields in iter_fare_file(path):
+                    try:
+                        flight, dts = flight_from_fields(fields)
+                    except ZoneInfoNotFoundError as exc:  # a KeyError subclass
+                        fail(f"{where}: {exc.args[0]}")
+                    except KeyError as exc:
+                        fail(f"{where}: missing field {exc}")
+                    except (ValueError, TypeError, argparse.ArgumentTypeError) as exc:
+                        fail(f"{where}: {exc}")
+
+                    dt = first_outside_window(*dts)
+                    if dt is not None and not args.force:
+                        print(
+                            f"Skipping {where}: {dt.isoformat()} is outside "
+                            f"vacation window {VACATION_START}–{VACATION_END}",
+                            file=sys.stderr,
+                        )
+                        skipped += 1
+                        continue
+                    yield asdict(flight)
+            except (OSError, ValueError) as exc:
+                fail(str(exc))
+
+    # One transaction for all files: an error anywhere stores nothing.
+    with open_store() as store:
+        ids = store.add_many(records())
+
+    msg = f"Imported {len(ids)} option(s)"
+    if ids:
+        msg += f" (#{ids[0]}–#{ids[-1]})"
+    if skipped:
+        msg += f", skipped {skipped} outside the vacation window"
+    print(msg + ".")
 
-    if not flights:
-        print("No flights match the given filters.")
-        return
 
-    # sort
-    if args.sort == "price":
-        flights.sort(key=lambda f: f.price)
-    elif args.sort == "out-duration":
-        flights.sort(key=lambda f: f.out_duration())
-    elif args.sort == "total-duration":
-        flights.sort(key=lambda f: f.total_duration())
-    elif args.sort == "out-depart":
-        flights.sort(key=lambda f: f.out.depart_dt())
+def cmd_list(args: argparse.Namespace) -> None:
+    window = (VACATION_START, VACATION_END) if args.within_window else None
+    with open_store() as store:
+        # filter + sort run as one indexed query
+        records = store.query(
+            sort=args.sort,
+            direct_only=args.direct_only,
+            window=window,
+            limit=args.limit,
+        )
+        if not records:
+            if store.count() == 0:
+                print("No flights stored yet.")
+            else:
+                print("No flights match the given filters.")
+            return
+    flights = [flight_from_record(r) for r in records]
 
     # print
     for f in flights:
@@ -387,6 +409,69 @@ def cmd_list(args: argparse.Namespace) -> None:
     print(f"{len(flights)} option(s) listed.")
 
 
+def _leg_summary(dir_: Direction) -> str:
+    dep, arr = dir_.depart_dt(), dir_.arrive_dt()
+    return (
+        f"{format_dt_with_offset(dep)} → {format_dt_with_offset(arr)}  "
+        f"({format_duration(arr - dep)}, {dir_.stops} stops)"
+    )
+
+
+def _trip_legs(trip: Trip, flights: Dict[int, FlightOption]) -> List[Tuple[str, Direction]]:
+    """(option tag, leg) pairs of a trip, outbound first."""
+    legs = []
+    for fid in trip.ids:
+        f = flights[fid]
+        tag = f"#{f.id} {f.label}" + (f" [{f.provider}]" if f.provider else "")
+        legs.append((tag, f.out))
+        if f.back is not None:
+            legs.append((tag, f.back))
+    return legs
+
+
+def _trip_kind(trip: Trip, flights: Dict[int, FlightOption]) -> str:
+    if len(trip.ids) == 2:
+        return "2× one-way"
+    return "return" if flights[trip.ids[0]].is_return else "one-way"
+
+
+def _render_trips_plain(
+    trips: List[Trip], flights: Dict[int, FlightOption], currency: str
+) -> None:
+    for trip in trips:
+        print("=" * 72)
+        print(
+            f"{price_str_with_try(trip.price, currency)} | "
+            f"{format_duration(timedelta(seconds=trip.seconds))} travel | "
+            f"{_trip_kind(trip, flights)}"
+        )
+        for tag, leg in _trip_legs(trip, flights):
+            print(f"  {tag}")
+            print(f"      {_leg_summary(leg)}")
+    print("=" * 72)
+    print(f"{len(trips)} trip(s) on the price / travel-time front.")
+
+
+def cmd_best(args: argparse.Namespace) -> None:
+    window = (VACATION_START, VACATION_END) if args.within_window else None
+    with open_store() as store:
+        trips = store.best(
+            args.currency,
+            round_trip=not args.one_way,
+            home_tz=HOME_TZ,
+            direct_only=args.direct_only,
+            window=window,
+        )
+        records = store.get(fid for trip in trips for fid in trip.ids)
+
+    if not trips:
+        print("No flights match the given filters.")
+        return
+
+    flights = {fid: flight_from_record(r) for fid, r in records.items()}
+    _render_trips_plain(trips, flights, args.currency)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # CLI
 # ──────────────────────────────────────────────────────────────────────────────
@@ -505,6 +590,29 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_add.set_defaults(func=cmd_add)
 
+    # import
+    p_import = sub.add_parser(
+        "import",
+        help="Bulk-add fares from CSV / JSON Lines / JSON files",
+        description=(
+            "Import fare dumps in one transaction. Fields are named like the "
+            "add options (label, price, currency, out_depart, out_arrive, "
+            "out_stops, return_depart, ...); CSV headers may use - or _."
+        ),
+    )
+    p_import.add_argument(
+        "files",
+        nargs="+",
+        type=Path,
+        help="Fare files (.csv, .jsonl/.ndjson or .json)",
+    )
+    p_import.add_argument(
+        "--force",
+        action="store_true",
+        help="Keep fares outside the vacation window instead of skipping them",
+    )
+    p_import.set_defaults(func=cmd_import)
+
     # list
     p_list = sub.add_parser(
         "list",
@@ -526,8 +634,40 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Only show options fully within vacation window",
     )
+    p_list.add_argument(
+        "--limit",
+        type=int,
+        help="Show at most this many options (after sorting)",
+    )
     p_list.set_defaults(func=cmd_list)
 
+    # best
+    p_best = sub.add_parser(
+        "best",
+        help="Show the price × travel-time Pareto front",
+    )
+    p_best.add_argument(
+        "--one-way",
+        action="store_true",
+        help="Compare one-way tickets instead of complete round trips",
+    )
+    p_best.add_argument(
+        "--currency",
+        default="DKK",
+        help="Only compare prices in this currency (default: DKK)",
+    )
+    p_best.add_argument(
+        "--direct-only",
+        action="store_true",
+        help="Only use options where every leg is direct (0 stops)",
+    )
+    p_best.add_argument(
+        "--within-window",
+        action="store_true",
+        help="Only use options fully within vacation window",
+    )
+    p_best.set_defaults(func=cmd_best)
+
     return parser
 
 